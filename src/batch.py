@@ -0,0 +1,220 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from headless import json_default, load_scenario, run_scenario
+
+# --- Batch Runs Over Household Profiles ---
+#
+# Runs the full plan and export for every household profile under a directory:
+#
+#     python src/batch.py profiles/ --scenario base_scenario.json --workers 8
+#
+# A profile is a directory holding a bills.json. If it also holds a scenario.json, that
+# scenario is used; otherwise the --scenario file (or the pay options given on the command
+# line) is applied to the profile's bills, and the spreadsheet is written into the profile
+# directory. Summary lines stream out as profiles finish, in completion order, and a
+# failing profile is reported without stopping the batch, even one that kills its worker.
+
+PROFILE_BILLS_FILE = 'bills.json'
+PROFILE_SCENARIO_FILE = 'scenario.json'
+PROFILE_SPREADSHEET_FILE = 'financial_plan.xlsx'
+
+def discover_profiles(profiles_dir):
+    """
+    Returns the sorted profile directories (those holding a bills.json) under profiles_dir.
+    """
+    profiles = []
+    for root, dirs, files in os.walk(profiles_dir):
+        dirs.sort()
+        if PROFILE_BILLS_FILE in files:
+            profiles.append(root)
+    return profiles
+
+def _profile_scenario(profile_dir, base_scenario):
+    """
+    Builds the scenario to run for one profile directory.
+    """
+    scenario_path = os.path.join(profile_dir, PROFILE_SCENARIO_FILE)
+    if os.path.exists(scenario_path):
+        return load_scenario(scenario_path)
+    return {
+        **base_scenario,
+        'name': os.path.basename(os.path.normpath(profile_dir)),
+        'bills': os.path.join(profile_dir, PROFILE_BILLS_FILE),
+        'output': {'spreadsheet': os.path.join(profile_dir, PROFILE_SPREADSHEET_FILE), 'summary': None}
+    }
+
+def run_profile(profile_dir, base_scenario, export=True):
+    """
+    Runs one profile in a worker process and returns a compact summary dict. Any failure is
+    caught and returned as {'profile', 'error'} so it cannot stop the batch.
+    """
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()): # Keep per-run chatter out of the batch output
+            result = run_scenario(_profile_scenario(profile_dir, base_scenario), export=export)
+    except Exception as e:
+        return {
+            'profile': profile_dir,
+            'error': f"{type(e).__name__}: {e}",
+            'traceback': traceback.format_exc()
+        }
+
+    utilizations = [debt.utilization for debt in result.debts if debt.utilization is not None]
+    return {
+        'profile': profile_dir,
+        'name': result.name,
+        'paychecks': len(result.paychecks),
+        'lowest_remaining_balance': result.lowest_remaining_balance,
+        'shortfall_paychecks': result.shortfall_paychecks,
+        'carried_over_bills': sum(len(paycheck.carried_over_bills) for paycheck in result.paychecks),
+        'unpaid_bills': len(result.unpaid_bills),
+        'unpaid_amount': round(sum(bill.amount for bill in result.unpaid_bills), 2),
+        'payoff_dates': {debt.name: debt.payoff_date for debt in result.debts},
+        'remaining_debt': round(sum(debt.current_balance for debt in result.debts), 2),
+        'max_utilization': max(utilizations, default=None),
+        'output_file': result.output_file,
+        'seconds': round(time.perf_counter() - started, 3)
+    }
+
+def _worker_died_summary(profile_dir):
+    return {
+        'profile': profile_dir,
+        'error': "BrokenProcessPool: the worker process died while running this profile (e.g. out of memory).",
+        'traceback': ''
+    }
+
+def _iter_pool_results(profiles, base_scenario, workers, max_pending, export, broken):
+    """
+    Runs profiles (an iterator) on one process pool and yields their summaries as they
+    complete. A worker that dies breaks the whole pool, so the profiles it had in flight
+    are added to broken and the generator stops; profiles not submitted yet are left in
+    the iterator for the next pool.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {} # future -> profile directory
+        while True:
+            if not broken:
+                for profile_dir in profiles:
+                    pending[pool.submit(run_profile, profile_dir, base_scenario, export)] = profile_dir
+                    if len(pending) >= max_pending:
+                        break
+            if not pending:
+                return
+            # Once the pool is broken nothing more is submitted; what is still in flight
+            # is collected, as some of it may have finished before the worker died
+            done, _ = wait(pending, return_when=ALL_COMPLETED if broken else FIRST_COMPLETED)
+            for future in done:
+                profile_dir = pending.pop(future)
+                try:
+                    yield future.result()
+                except BrokenProcessPool:
+                    broken.append(profile_dir)
+
+def iter_batch_results(profiles, base_scenario, workers=None, max_pending=None, export=True):
+    """
+    Runs profiles across a process pool and yields their summaries as they complete.
+    At most max_pending profiles (default: twice the worker count) are queued at once,
+    so memory stays flat however many profiles there are.
+
+    If a worker process dies, the profile it was running is reported as failed and the
+    remaining profiles go to a new pool. When several profiles were in flight, each is
+    rerun on its own to find the one that kills its worker.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    profiles = iter(profiles)
+    while True:
+        broken = []
+        yield from _iter_pool_results(profiles, base_scenario, workers, max_pending, export, broken)
+        if not broken:
+            return
+        if len(broken) == 1:
+            yield _worker_died_summary(broken[0])
+            continue
+        for profile_dir in broken:
+            died = []
+            yield from _iter_pool_results(iter([profile_dir]), base_scenario, 1, 1, export, died)
+            if died:
+                yield _worker_died_summary(profile_dir)
+
+def _format_summary_line(summary):
+    if 'error' in summary:
+        return f"  FAILED  {summary['profile']}: {summary['error']}"
+    payoffs = ', '.join(
+        f"{name} {payoff_date.strftime('%Y-%m') if payoff_date else 'not paid off'}"
+        for name, payoff_date in summary['payoff_dates'].items()
+    ) or 'no debts'
+    utilization = f"{summary['max_utilization']:.0%}" if summary['max_utilization'] is not None else 'n/a'
+    return (f"  OK      {summary['name']}: lowest balance ${summary['lowest_remaining_balance']:.2f}, "
+            f"short paychecks {summary['shortfall_paychecks']} ({summary['carried_over_bills']} bills carried over), "
+            f"unpaid bills {summary['unpaid_bills']} (${summary['unpaid_amount']:.2f}), "
+            f"max utilization {utilization}, payoff: {payoffs}")
+
+def run_batch(profiles_dir, base_scenario, workers=None, summary_file=None, export=True):
+    """
+    Runs every profile under profiles_dir, printing a line per profile as it finishes and
+    appending each summary to summary_file (JSON lines) if given.
+
+    Returns:
+        dict: Counts of profiles run and failed, elapsed seconds and profiles per second.
+    """
+    profiles = discover_profiles(profiles_dir)
+    print(f"\n--- Batch Run: {len(profiles)} profiles in {profiles_dir} ---")
+    started = time.perf_counter()
+    completed = failed = 0
+
+    summary_out = open(summary_file, 'w') if summary_file else None
+    try:
+        for summary in iter_batch_results(profiles, base_scenario, workers, export=export):
+            completed += 1
+            failed += 'error' in summary
+            print(_format_summary_line(summary))
+            if summary_out:
+                summary_out.write(json.dumps({k: v for k, v in summary.items() if k != 'traceback'}, default=json_default) + '\n')
+                summary_out.flush()
+    finally:
+        if summary_out:
+            summary_out.close()
+
+    elapsed = time.perf_counter() - started
+    totals = {
+        'profiles': completed,
+        'failed': failed,
+        'seconds': round(elapsed, 2),
+        'profiles_per_second': round(completed / elapsed, 2) if elapsed > 0 else None
+    }
+    print(f"\nBatch complete: {completed - failed} succeeded, {failed} failed in {totals['seconds']}s ({totals['profiles_per_second']} profiles/s).")
+    return totals
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run MonteBuster plans for a directory of household profiles.")
+    parser.add_argument('profiles_dir', help="Directory of profile directories, each holding a bills.json.")
+    parser.add_argument('--scenario', help="Base scenario file applied to profiles without their own scenario.json.")
+    parser.add_argument('--num-paychecks', type=int, default=26)
+    parser.add_argument('--net-pay', type=float)
+    parser.add_argument('--start-date', help="First payday (YYYY-MM-DD).")
+    parser.add_argument('--pay-frequency', default='bi-weekly')
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument('--summary', help="Write per-profile summaries to this JSON lines file.")
+    parser.add_argument('--no-export', action='store_true', help="Skip writing spreadsheets.")
+    args = parser.parse_args()
+
+    if args.scenario:
+        base_scenario = load_scenario(args.scenario)
+    elif args.net_pay is not None and args.start_date:
+        base_scenario = {'pay': {'num_paychecks': args.num_paychecks, 'net_pay': args.net_pay,
+                                 'start_date': args.start_date, 'pay_frequency': args.pay_frequency}}
+    else:
+        parser.error("Give a --scenario file, or --net-pay and --start-date.")
+
+    totals = run_batch(args.profiles_dir, base_scenario, args.workers, args.summary, export=not args.no_export)
+    sys.exit(1 if totals['failed'] else 0)
@@ -0,0 +1,206 @@
+import bisect
+import itertools
+import re
+import uuid
+from collections import defaultdict
+
+# --- Bill Template Index ---
+#
+# An in-memory index over bill templates, so finding a bill among thousands doesn't mean
+# printing them all. Queries combine any of:
+#
+#     search      words that must each start a word of the bill's name ("vis car" finds "Visa Card")
+#     category    exact category, ignoring case
+#     due_day     day of the month of the due date
+#     is_debt     debts only (True) or non-debts only (False)
+#     min_amount, max_amount   amount range in dollars, inclusive
+#
+# The same query can be typed as text, e.g. "visa category:debt due:15 debt:yes amount:50-200"
+# (see parse_bill_query).
+
+QUERY_FILTERS = {'category': 'category', 'cat': 'category', 'due': 'due_day', 'debt': 'is_debt', 'amount': 'amount'}
+
+def _name_words(name):
+    return re.findall(r'\w+', (name or '').lower())
+
+def parse_bill_query(text):
+    """
+    Parses a typed bill query into keyword arguments for BillIndex.find().
+    Raises ValueError for invalid filter values.
+    """
+    query, words = {}, []
+    for part in text.split():
+        key, sep, value = part.partition(':')
+        field = QUERY_FILTERS.get(key.lower()) if sep else None
+        if field is None:
+            words.append(part)
+        elif field == 'category':
+            query['category'] = value.replace('_', ' ')
+        elif field == 'due_day':
+            if not value.isdigit() or not 1 <= int(value) <= 31:
+                raise ValueError(f"Invalid due day: {value!r}. Use a day of the month (1-31).")
+            query['due_day'] = int(value)
+        elif field == 'is_debt':
+            if value.lower() not in ('yes', 'no', 'true', 'false'):
+                raise ValueError(f"Invalid debt filter: {value!r}. Use debt:yes or debt:no.")
+            query['is_debt'] = value.lower() in ('yes', 'true')
+        else:
+            low, dash, high = value.partition('-')
+            try:
+                if low:
+                    query['min_amount'] = float(low)
+                if high:
+                    query['max_amount'] = float(high)
+                elif not dash: # amount:50 is an exact amount
+                    query['max_amount'] = float(low)
+            except ValueError:
+                raise ValueError(f"Invalid amount range: {value!r}. Use amount:50-200, amount:50- or amount:-200.")
+    if words:
+        query['search'] = ' '.join(words)
+    return query
+
+class BillIndex:
+    """
+    Indexes a list of bill templates by id, name words, category, due day, debt flag and
+    amount. Results always come back in the list's order.
+
+    Id, category, due day and debt lookups are dict and set operations. Name prefixes and
+    amount ranges are binary searches over sorted lists, which are rebuilt on the next
+    query after bills change. Call update() after editing a bill in place.
+    """
+
+    def __init__(self, bills):
+        self.bills = bills
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Indexes every bill in the list again.
+        """
+        self._by_id = {}
+        self._position = {}
+        self._keys = {} # id -> (category, due day, is_debt) the bill is filed under
+        self._by_category = defaultdict(set)
+        self._by_due_day = defaultdict(set)
+        self._debts = set()
+        for position, bill in enumerate(self.bills):
+            self._add(bill, position)
+        self._sorted = None
+
+    def _add(self, bill, position):
+        bill_id = bill.setdefault('id', str(uuid.uuid4())) # Bills saved before ids existed get one
+        category, due_day, is_debt = (bill.get('category') or '').lower(), bill['due_date'].day, bool(bill.get('is_debt'))
+        self._by_id[bill_id] = bill
+        self._position[bill_id] = position
+        self._keys[bill_id] = (category, due_day, is_debt)
+        self._by_category[category].add(bill_id)
+        self._by_due_day[due_day].add(bill_id)
+        if is_debt:
+            self._debts.add(bill_id)
+
+    def _discard(self, bill_id):
+        category, due_day, _ = self._keys.pop(bill_id)
+        self._by_category[category].discard(bill_id)
+        self._by_due_day[due_day].discard(bill_id)
+        self._debts.discard(bill_id)
+
+    def _sorted_fields(self):
+        """
+        Returns (name words as sorted (word, id) pairs, amounts, ids by amount), rebuilt
+        if bills have changed since they were last built.
+        """
+        if self._sorted is None:
+            words = sorted((word, bill['id']) for bill in self.bills for word in _name_words(bill['name']))
+            by_amount = sorted((float(bill.get('amount') or 0.0), bill['id']) for bill in self.bills)
+            self._sorted = (words, [amount for amount, _ in by_amount], [bill_id for _, bill_id in by_amount])
+        return self._sorted
+
+    def __len__(self):
+        return len(self.bills)
+
+    def get(self, bill_id):
+        """
+        Returns the bill with an id, or None.
+        """
+        return self._by_id.get(bill_id)
+
+    def add(self, bill):
+        """
+        Appends a new bill to the list and indexes it.
+        """
+        self.bills.append(bill)
+        self._add(bill, len(self.bills) - 1)
+        self._sorted = None
+
+    def update(self, bill):
+        """
+        Re-indexes a bill after its fields were edited in place, or replaces the bill with
+        the same id by a new dict.
+        """
+        position = self._position[bill['id']]
+        self.bills[position] = bill
+        self._discard(bill['id'])
+        self._add(bill, position)
+        self._sorted = None
+
+    def remove(self, bill_id):
+        """
+        Removes a bill from the list and the index. Returns the removed bill.
+        """
+        bill = self._by_id[bill_id]
+        del self.bills[self._position[bill_id]]
+        self.rebuild() # Positions after the removed bill shift
+        return bill
+
+    def _search_ids(self, text):
+        words, _, _ = self._sorted_fields()
+        matches = None
+        for query_word in _name_words(text):
+            start = bisect.bisect_left(words, (query_word,))
+            found = set()
+            for word, bill_id in itertools.islice(words, start, None):
+                if not word.startswith(query_word):
+                    break
+                found.add(bill_id)
+            matches = found if matches is None else matches & found
+        return matches
+
+    def _amount_ids(self, min_amount, max_amount):
+        _, amounts, ids = self._sorted_fields()
+        start = bisect.bisect_left(amounts, min_amount) if min_amount is not None else 0
+        end = bisect.bisect_right(amounts, max_amount) if max_amount is not None else len(amounts)
+        return set(ids[start:end])
+
+    def find(self, search=None, category=None, due_day=None, is_debt=None, min_amount=None, max_amount=None):
+        """
+        Returns the bills matching every given filter (all bills if none are given), in list order.
+        """
+        candidate_sets = []
+        if category is not None:
+            candidate_sets.append(self._by_category.get(category.strip().lower(), set()))
+        if due_day is not None:
+            candidate_sets.append(self._by_due_day.get(due_day, set()))
+        if is_debt is True:
+            candidate_sets.append(self._debts)
+        if search:
+            candidate_sets.append(self._search_ids(search) or set())
+        if min_amount is not None or max_amount is not None:
+            candidate_sets.append(self._amount_ids(min_amount, max_amount))
+
+        if candidate_sets:
+            candidate_sets.sort(key=len) # Intersect starting from the smallest set
+            ids = set(candidate_sets[0]).intersection(*candidate_sets[1:])
+        else:
+            ids = self._by_id.keys()
+        if is_debt is False:
+            ids = [bill_id for bill_id in ids if bill_id not in self._debts]
+        return [self._by_id[bill_id] for bill_id in sorted(ids, key=self._position.__getitem__)]
+
+def page_of(items, page, page_size):
+    """
+    Returns (the items on a 1-based page, the page, number of pages), clamping page to the
+    pages there are.
+    """
+    pages = max(1, -(-len(items) // page_size))
+    page = min(max(page, 1), pages)
+    return items[(page - 1) * page_size:page * page_size], page, pages
@@ -0,0 +1,254 @@
+import argparse
+import os
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+
+from headless import build_pay_calendar, load_scenario
+from main import expand_debt_history, iter_plan_engine, load_bills
+from money import from_cents
+from recurrence import iter_due_dates_in_chunks
+
+# --- Calendar (.ics) Export ---
+#
+# Writes a plan as an iCalendar file that calendar apps can import:
+#
+#     python src/calendar_export.py scenario.json plan.ics
+#
+# The calendar has paydays, bill due dates, one "Pay bills" event per paycheck listing
+# the bills it pays, unpaid bills and debt payoff milestones. Regular paydays and
+# recurring bills are written once each with an RRULE instead of one event per date.
+# Lines are generated as the plan engine streams its results, so the calendar is never
+# held in memory, however many years the plan covers.
+
+ICS_MILESTONES = [0.25, 0.5, 0.75] # Shares of a debt's starting balance paid off that get an event
+_RRULE_BILL_FREQUENCIES = {'monthly': 'FREQ=MONTHLY', 'bi-weekly': 'FREQ=WEEKLY;INTERVAL=2', 'annually': 'FREQ=YEARLY'}
+
+def _escape(text):
+    return str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+def _fold(line):
+    """
+    Folds a content line to 75 octets per physical line, as RFC 5545 requires.
+    """
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74 # Continuation lines start with a space
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80: # Don't split a UTF-8 character
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+    return '\r\n '.join(parts) + '\r\n'
+
+def _uid_part(text):
+    return re.sub(r'[^A-Za-z0-9]+', '-', str(text)).strip('-').lower()
+
+def _ics_date(value):
+    return value.strftime('%Y%m%d')
+
+def _vevent(uid, stamp, start, summary, description=None, categories=None, rrule=None):
+    """
+    Yields the folded lines of one all-day event.
+    """
+    yield _fold('BEGIN:VEVENT')
+    yield _fold(f'UID:{uid}@montebuster')
+    yield _fold(f'DTSTAMP:{stamp}')
+    yield _fold(f'DTSTART;VALUE=DATE:{_ics_date(start)}')
+    yield _fold(f'DTEND;VALUE=DATE:{_ics_date(start + timedelta(days=1))}')
+    if rrule:
+        yield _fold(f'RRULE:{rrule}')
+    yield _fold(f'SUMMARY:{_escape(summary)}')
+    if description:
+        yield _fold(f'DESCRIPTION:{_escape(description)}')
+    if categories:
+        yield _fold(f'CATEGORIES:{_escape(categories)}')
+    yield _fold('END:VEVENT')
+
+def _payday_rrule(pay_calendar):
+    """
+    Returns an RRULE matching every payday of a calendar, or None when the paydays
+    aren't a plain weekly, bi-weekly or monthly series (shifted paydays, income streams).
+    """
+    pay_dates = pay_calendar.pay_dates
+    if pay_calendar.deposits is not None or len(pay_dates) < 2:
+        return None
+    gaps = {(later - earlier).days for earlier, later in zip(pay_dates, pay_dates[1:])}
+    if gaps == {7}:
+        return f'FREQ=WEEKLY;COUNT={len(pay_dates)}'
+    if gaps == {14}:
+        return f'FREQ=WEEKLY;INTERVAL=2;COUNT={len(pay_dates)}'
+    first = pay_dates[0]
+    if first.day <= 28 and all(
+        pay_date.day == first.day and (pay_date.year * 12 + pay_date.month) - (first.year * 12 + first.month) == index
+        for index, pay_date in enumerate(pay_dates)
+    ):
+        return f'FREQ=MONTHLY;COUNT={len(pay_dates)}'
+    return None
+
+def _bill_rrule(template, first_due_date, until):
+    """
+    Returns an RRULE for a recurring template's due dates from first_due_date, or None when
+    its dates can't be expressed exactly as one (e.g. monthly bills due after the 28th).
+    """
+    frequency = template.get('recurrence_frequency')
+    if not template.get('is_recurring') or frequency not in _RRULE_BILL_FREQUENCIES:
+        return None
+    # Due days past the 28th are clamped to shorter months (see recurrence.py), which an RRULE can't express
+    if frequency == 'monthly' and template['due_date'].day > 28:
+        return None
+    if frequency == 'annually' and (template['due_date'].month, template['due_date'].day) == (2, 29):
+        return None
+    return f"{_RRULE_BILL_FREQUENCIES[frequency]};UNTIL={_ics_date(until)}"
+
+def iter_ics_lines(plan_events, bill_templates, pay_calendar, net_pay=0.0, calendar_name='MonteBuster Plan'):
+    """
+    Yields the lines of an iCalendar file for a plan, as the plan's results stream in.
+
+    Args:
+        plan_events (iterable): Results from iter_plan_engine() (or iter_result_events()).
+        bill_templates (list): The bill templates the plan was built from.
+        pay_calendar (PayCalendar): The plan's pay calendar.
+        net_pay (float): Pay per paycheck in dollars, for calendars without income streams.
+        calendar_name (str): Name shown by calendar apps.
+    """
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    plan_start, last_pay_window_end = pay_calendar[0], pay_calendar.following_pay_date
+
+    yield _fold('BEGIN:VCALENDAR')
+    yield _fold('VERSION:2.0')
+    yield _fold('PRODID:-//MonteBuster//Plan Calendar//EN')
+    yield _fold('CALSCALE:GREGORIAN')
+    yield _fold(f'X-WR-CALNAME:{_escape(calendar_name)}')
+
+    # --- Series known before the plan runs: regular paydays and recurring bills ---
+    payday_rrule = _payday_rrule(pay_calendar)
+    if payday_rrule:
+        yield from _vevent('payday-series', stamp, plan_start, f"Payday (${net_pay:.2f})", categories='Payday', rrule=payday_rrule)
+
+    template_names = [template['name'] for template in bill_templates]
+    series_names = set() # Bills whose due dates are covered by an RRULE series
+    for template in bill_templates:
+        first_due_date = next(iter_due_dates_in_chunks(template, plan_start, last_pay_window_end), None)
+        rrule = _bill_rrule(template, first_due_date, last_pay_window_end) if first_due_date else None
+        if rrule and template_names.count(template['name']) == 1:
+            series_names.add(template['name'])
+            yield from _vevent(f"bill-{_uid_part(template.get('id') or template['name'])}", stamp, first_due_date,
+                               f"{template['name']} due (${template['amount']:.2f})",
+                               f"Category: {template.get('category') or 'Uncategorized'}. The Pay bills event on each payday lists the bills that paycheck pays.",
+                               categories='Bill', rrule=rrule)
+
+    # --- Events streamed from the plan ---
+    pending_bills = {} # Instance id -> instance, for bills not paid yet
+    debt_progress = {} # Debt name -> [starting balance, milestones reached]
+    for result in plan_events:
+        if result[0] == 'bill':
+            pending_bills[result[1]['id']] = result[1]
+
+        elif result[0] == 'paycheck':
+            paycheck_info = result[1]
+            pay_date = paycheck_info['pay_date']
+            source = paycheck_info.get('source')
+            source_str = f" from {source}" if source else ""
+            if not payday_rrule:
+                yield from _vevent(f"payday-{_ics_date(pay_date)}-{_uid_part(source or 'paycheck')}", stamp, pay_date,
+                                   f"Payday{source_str} (${from_cents(paycheck_info['net_pay']):.2f})", categories='Payday')
+            assigned_bills = paycheck_info['assigned_bills']
+            for bill in assigned_bills:
+                pending_bills.pop(bill['id'], None)
+                if bill['name'] not in series_names:
+                    yield from _vevent(f"bill-{_uid_part(bill['name'])}-{_ics_date(bill['due_date'])}", stamp, bill['due_date'],
+                                       f"{bill['name']} due (${from_cents(bill['amount']):.2f})",
+                                       f"Paid from the {pay_date.strftime('%m-%d-%Y')} paycheck{source_str}.", categories='Bill')
+            if assigned_bills:
+                lines = [f"- {bill['name']} (due {bill['due_date'].strftime('%m-%d-%Y')}): ${from_cents(bill['amount']):.2f}" for bill in assigned_bills]
+                lines.append(f"Left after bills: ${from_cents(paycheck_info['remaining_balance']):.2f}")
+                yield from _vevent(f"pay-bills-{_ics_date(pay_date)}-{_uid_part(source or 'paycheck')}", stamp, pay_date,
+                                   f"Pay {len(assigned_bills)} bill{'s' if len(assigned_bills) != 1 else ''}{source_str} "
+                                   f"(${from_cents(sum(bill['amount'] for bill in assigned_bills)):.2f})",
+                                   '\n'.join(lines), categories='Bill Payment')
+
+        elif result[0] == 'debt_month':
+            _, debt_name, snapshot = result
+            progress = debt_progress.setdefault(debt_name, [snapshot['balance_start_of_month'], 0])
+            starting_balance = progress[0]
+            if snapshot['balance_end_of_month'] <= 0:
+                yield from _vevent(f"debt-{_uid_part(debt_name)}-paid-off", stamp, snapshot['date'],
+                                   f"{debt_name} paid off!", categories='Debt Milestone')
+                progress[1] = len(ICS_MILESTONES)
+                continue
+            while progress[1] < len(ICS_MILESTONES) and starting_balance > 0 and \
+                    starting_balance - snapshot['balance_end_of_month'] >= ICS_MILESTONES[progress[1]] * starting_balance:
+                share = ICS_MILESTONES[progress[1]]
+                yield from _vevent(f"debt-{_uid_part(debt_name)}-{int(share * 100)}", stamp, snapshot['date'],
+                                   f"{debt_name} {int(share * 100)}% paid off",
+                                   f"Balance ${from_cents(snapshot['balance_end_of_month']):.2f} of ${from_cents(starting_balance):.2f}.",
+                                   categories='Debt Milestone')
+                progress[1] += 1
+
+    # Bills still unpaid when the plan ends (due within the plan, but no paycheck could cover them)
+    for bill in pending_bills.values():
+        if bill['due_date'] <= last_pay_window_end:
+            yield from _vevent(f"unpaid-{_uid_part(bill['name'])}-{_ics_date(bill['due_date'])}", stamp, bill['due_date'],
+                               f"UNPAID: {bill['name']} (${from_cents(bill['amount']):.2f})",
+                               "No paycheck in the plan can cover this bill.", categories='Unpaid Bill')
+
+    yield _fold('END:VCALENDAR')
+
+def iter_result_events(bill_instances, final_pay_periods, debt_progress_report):
+    """
+    Replays finished plan results (as returned by run_plan_engine()) as plan engine
+    events, for writing a calendar from a plan that was already run.
+    """
+    for instance in bill_instances:
+        yield ('bill', instance)
+    for paycheck_info in final_pay_periods:
+        yield ('paycheck', paycheck_info)
+    for debt_name, debt_data in debt_progress_report.items():
+        for snapshot in expand_debt_history(debt_data):
+            yield ('debt_month', debt_name, snapshot)
+
+def write_ics(lines, output_file):
+    """
+    Writes calendar lines to a file as they are generated. Returns the number of events.
+    """
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    events = 0
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        for line in lines:
+            f.write(line)
+            if line == 'BEGIN:VEVENT\r\n':
+                events += 1
+    return events
+
+def export_scenario_calendar(scenario, output_file, bills=None):
+    """
+    Streams a scenario's plan straight from the plan engine into an .ics file.
+    """
+    if bills is None:
+        bills = load_bills(scenario['bills'])
+    pay = scenario.get('pay', {})
+    pay_calendar = build_pay_calendar(pay)
+    net_pay = float(pay.get('net_pay', 0.0))
+    plan_events = iter_plan_engine(bills, len(pay_calendar), net_pay, pay_calendar[0], pay_calendar,
+                                   max_debt_months=None, keep_history=False, verbose=False)
+    lines = iter_ics_lines(plan_events, bills, pay_calendar, net_pay, scenario.get('name') or 'MonteBuster Plan')
+    events = write_ics(lines, output_file)
+    print(f"Calendar with {events} events written to: {output_file}")
+    return events
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a MonteBuster plan as an iCalendar (.ics) file.")
+    parser.add_argument('scenario', help="Scenario file (see headless.py).")
+    parser.add_argument('output_file', nargs='?', help="Calendar file to write (default: the scenario's output.calendar, or plan.ics).")
+    args = parser.parse_args()
+
+    try:
+        scenario = load_scenario(args.scenario)
+        export_scenario_calendar(scenario, args.output_file or scenario['output'].get('calendar') or 'plan.ics')
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error exporting calendar: {e}")
+        sys.exit(1)
@@ -0,0 +1,221 @@
+import bisect
+from datetime import date, datetime
+
+import numpy as np
+
+from money import to_cents_array
+
+# --- Rate Schedules ---
+#
+# A debt template may carry a piecewise rate schedule next to its interest_rate:
+#
+#     "interest_rate": 0.0,
+#     "rate_schedule": [{"start": "2027-07", "rate": 0.2499}, {"start": "2029-01", "rate": 0.2799}]
+#
+# interest_rate applies until the first entry; each entry's annual rate applies from the
+# month it starts (YYYY-MM or YYYY-MM-DD) until the next one. That covers 0% promos,
+# rate resets and variable-rate loans. Months are the running month numbers used by the
+# debt simulation (year * 12 + month - 1).
+
+def month_number(d):
+    """
+    Returns the running month number of a date.
+    """
+    return d.year * 12 + d.month - 1
+
+def _schedule_month(value):
+    if isinstance(value, date):
+        return month_number(value)
+    for date_format in ("%Y-%m", "%Y-%m-%d"):
+        try:
+            return month_number(datetime.strptime(str(value), date_format))
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid rate schedule start: {value!r}. Please use YYYY-MM or YYYY-MM-DD.")
+
+def parse_rate_schedule(entries):
+    """
+    Converts a template's rate_schedule entries to a sorted list of (month, annual rate).
+    Raises ValueError for invalid entries or two entries starting in the same month.
+    """
+    schedule = []
+    for entry in entries or []:
+        try:
+            rate = float(entry['rate'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Invalid rate schedule entry: {entry!r}. Expected {{'start': 'YYYY-MM', 'rate': 0.1999}}.")
+        if rate < 0:
+            raise ValueError(f"Rate schedule rates cannot be negative: {entry!r}")
+        schedule.append((_schedule_month(entry.get('start')), rate))
+    schedule.sort()
+    for (month, _), (next_month, _) in zip(schedule, schedule[1:]):
+        if month == next_month:
+            raise ValueError("Two rate schedule entries start in the same month.")
+    return schedule
+
+def annual_rate_for_month(schedule, base_rate, month):
+    """
+    Returns the annual rate in effect in a month for a parsed schedule.
+    """
+    index = bisect.bisect_right(schedule, (month, float('inf'))) - 1
+    return schedule[index][1] if index >= 0 else base_rate
+
+def rate_change_months(schedule, first_month, end_month):
+    """
+    Returns the months in [first_month, end_month) where a schedule changes the rate.
+    """
+    return [month for month, _ in schedule if first_month <= month < end_month]
+
+def monthly_rate_vector(schedule, base_rate, first_month, months):
+    """
+    Returns the monthly interest rate (annual / 12) for each of `months` months from
+    first_month as a float64 array, looked up for all months at once.
+    """
+    rates = np.array([base_rate] + [rate for _, rate in schedule], dtype=np.float64)
+    starts = np.array([month for month, _ in schedule], dtype=np.int64)
+    month_numbers = first_month + np.arange(months, dtype=np.int64)
+    return rates[np.searchsorted(starts, month_numbers, side='right')] / 12.0
+
+def monthly_fee_vector(debt_template, first_month, months):
+    """
+    Returns the fees charged in each of `months` months from first_month: the monthly fee
+    plus the annual fee in its month.
+    """
+    fees = np.full(months, float(debt_template.get('monthly_fee') or 0.0))
+    annual_fee, annual_fee_month = float(debt_template.get('annual_fee') or 0.0), debt_template.get('annual_fee_month')
+    if annual_fee > 0 and annual_fee_month:
+        month_numbers = first_month + np.arange(months)
+        fees[month_numbers % 12 + 1 == int(annual_fee_month)] += annual_fee
+    return fees
+
+# --- Batched Debt Simulation ---
+
+def debt_month_step_batch(balance, monthly_rate, fees, payment, minimum_payment):
+    """
+    Applies one month to arrays of debts, like _debt_month_step() does to one: interest on
+    the starting balance, fees, then the payment, or the minimum payment when that is
+    larger (never more than is owed). Rows with no balance are left alone.
+
+    Returns:
+        tuple of arrays: (interest, fees, payment, new_balance)
+    """
+    active = balance > 0
+    interest = np.where(active, balance * monthly_rate, 0.0)
+    fees = np.where(active, fees, 0.0)
+    owed = balance + interest + fees
+    payment = np.where(active, np.minimum(np.maximum(payment, minimum_payment), owed), 0.0)
+    new_balance = np.where(active, owed - payment, balance)
+    new_balance[new_balance < 1e-9] = 0.0 # Float dust left after paying exactly what is owed
+    return interest, fees, payment, new_balance
+
+def simulate_debt_batch(balances, monthly_rates, minimum_payments, payments=0.0, fees=0.0, keep_balances=False):
+    """
+    Simulates many debts (or many variants of one debt) side by side, one array operation
+    per month across all rows (see debt_month_step_batch).
+
+    Args:
+        balances (array): Starting balance per row, shape (N,).
+        monthly_rates (array): Monthly interest rate per row and month, shape (N, M), or (M,)
+            for rates shared by every row. M is the number of months simulated.
+        minimum_payments (array or float): Minimum payment per row.
+        payments (array or float): Planned payment per row (below the minimum, the minimum is paid).
+            Also accepts shape (N, M) for payments that change by month.
+        fees (array or float): Fees per row and month, broadcastable to (N, M).
+        keep_balances (bool): Also return the end-of-month balance and the payment of every row and month.
+
+    Returns:
+        dict of arrays: 'total_interest', 'total_fees', 'total_paid', 'final_balance' (N,),
+        'total_interest_cents' (N,, each month's interest rounded to cents, as plan reports sum it),
+        'payoff_month' (N,, the 1-based month a row was paid off, 0 if it wasn't) and, with
+        keep_balances, 'balances' and 'payments' (N, M).
+    """
+    balance = np.array(balances, dtype=np.float64)
+    rows = len(balance)
+    monthly_rates = np.asarray(monthly_rates, dtype=np.float64)
+    months = monthly_rates.shape[-1]
+    monthly_rates = np.broadcast_to(monthly_rates, (rows, months))
+    fees = np.broadcast_to(np.asarray(fees, dtype=np.float64), (rows, months))
+    payments = np.asarray(payments, dtype=np.float64)
+    payments = np.broadcast_to(payments if payments.ndim == 2 else payments.reshape(-1, 1), (rows, months))
+    minimum_payments = np.broadcast_to(np.asarray(minimum_payments, dtype=np.float64), (rows,))
+
+    total_interest = np.zeros(rows)
+    total_interest_cents = np.zeros(rows, dtype=np.int64)
+    total_fees = np.zeros(rows)
+    total_paid = np.zeros(rows)
+    payoff_month = np.zeros(rows, dtype=np.int64)
+    history = np.zeros((rows, months)) if keep_balances else None
+    payment_history = np.zeros((rows, months)) if keep_balances else None
+
+    for month in range(months):
+        active = balance > 0
+        if not active.any():
+            if keep_balances:
+                history[:, month:] = balance[:, None]
+            break
+        interest, month_fees, payment, balance = debt_month_step_batch(
+            balance, monthly_rates[:, month], fees[:, month], payments[:, month], minimum_payments
+        )
+
+        total_interest += interest
+        total_interest_cents += to_cents_array(interest)
+        total_fees += month_fees
+        total_paid += payment
+        payoff_month[active & (balance <= 0)] = month + 1
+        if keep_balances:
+            history[:, month] = balance
+            payment_history[:, month] = payment
+
+    result = {
+        'total_interest': total_interest,
+        'total_interest_cents': total_interest_cents,
+        'total_fees': total_fees,
+        'total_paid': total_paid,
+        'final_balance': balance,
+        'payoff_month': payoff_month
+    }
+    if keep_balances:
+        result['balances'] = history
+        result['payments'] = payment_history
+    return result
+
+def evaluate_rate_schedules(debt_template, schedules, first_month, months=360, payment=None):
+    """
+    Runs one debt under many rate schedules in a single batched simulation, e.g. to see
+    what a rate shock or a promo ending early would cost.
+
+    Args:
+        debt_template (dict): The debt's template (initial_balance, minimum_payment,
+            interest_rate, fees and its own rate_schedule).
+        schedules (list): Dicts with a 'name' and the rates to use: 'rate_schedule' entries
+            (see above) replace the template's schedule and 'interest_rate' its base rate.
+            Whatever a dict leaves out comes from the template.
+        first_month (int): Running month number to start in.
+        months (int): Months to simulate.
+        payment (float): Monthly payment (defaults to the minimum payment).
+
+    Returns:
+        list: One dict per schedule with 'name', 'total_interest', 'total_fees',
+              'payoff_month' (months from first_month, None if not paid off) and 'final_balance'.
+    """
+    rate_matrix = np.vstack([
+        monthly_rate_vector(parse_rate_schedule(schedule.get('rate_schedule', debt_template.get('rate_schedule'))),
+                            float(schedule.get('interest_rate', debt_template['interest_rate'])), first_month, months)
+        for schedule in schedules
+    ]) if schedules else np.zeros((0, months))
+    rows = len(schedules)
+    result = simulate_debt_batch(
+        np.full(rows, float(debt_template['initial_balance'])), rate_matrix, float(debt_template['minimum_payment']),
+        float(payment if payment is not None else debt_template['minimum_payment']),
+        monthly_fee_vector(debt_template, first_month, months)
+    )
+    return [
+        {
+            'name': schedule.get('name') or f"Schedule {index + 1}",
+            'total_interest': round(float(result['total_interest'][index]), 2),
+            'total_fees': round(float(result['total_fees'][index]), 2),
+            'payoff_month': int(result['payoff_month'][index]) or None,
+            'final_balance': round(float(result['final_balance'][index]), 2)
+        }
+        for index, schedule in enumerate(schedules)
+    ]
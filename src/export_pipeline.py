@@ -0,0 +1,106 @@
+import atexit
+import queue
+import threading
+
+# --- Background Export Pipeline ---
+
+class ExportError(Exception):
+    """
+    Raised when one or more background exports failed. failures holds
+    (description, exception) pairs in the order the exports were submitted.
+    """
+    def __init__(self, failures):
+        self.failures = failures
+        details = '; '.join(f"{description}: {type(error).__name__}: {error}" for description, error in failures)
+        super().__init__(f"{len(failures)} export(s) failed: {details}")
+
+class ExportPipeline:
+    """
+    Writes exports on a background thread so the next plan can be computed while the
+    previous workbook is still being serialized.
+
+    Exports run one at a time in submission order. The queue is bounded: submit() blocks
+    once max_pending exports are waiting, so finished plans can't pile up in memory.
+    Failures are collected and raised as an ExportError by raise_failures(), flush() or
+    close(). Pending exports are flushed on close(), when leaving a `with` block and at
+    interpreter exit.
+
+    Example:
+        with ExportPipeline() as pipeline:
+            for scenario in scenarios:
+                bill_instances, final_pay_periods, debt_progress_report = run_plan(...)
+                pipeline.submit(generate_spreadsheet_output, final_pay_periods, debt_progress_report, output_file)
+    """
+
+    def __init__(self, max_pending=2):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._failures = []
+        self._failures_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='export-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None: # Sentinel from close()
+                    return
+                write, args, kwargs, description = job
+                try:
+                    write(*args, **kwargs)
+                except Exception as e: # Reported to the submitting thread, never lost
+                    with self._failures_lock:
+                        self._failures.append((description, e))
+            finally:
+                self._queue.task_done()
+
+    def submit(self, write, *args, description=None, **kwargs):
+        """
+        Queues write(*args, **kwargs) to run on the writer thread, blocking while the queue
+        is full. The arguments must not be modified by the caller after submitting.
+        """
+        if self._closed:
+            raise RuntimeError("Cannot submit to a closed export pipeline.")
+        self._queue.put((write, args, kwargs, description or getattr(write, '__name__', 'export')))
+
+    def raise_failures(self):
+        """
+        Raises an ExportError for exports that failed since the last check.
+        """
+        with self._failures_lock:
+            failures, self._failures = self._failures, []
+        if failures:
+            raise ExportError(failures) from failures[0][1]
+
+    def flush(self):
+        """
+        Waits until every submitted export has been written.
+        """
+        self._queue.join()
+        self.raise_failures()
+
+    def close(self):
+        """
+        Flushes pending exports and stops the writer thread. Safe to call more than once.
+        """
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+            atexit.unregister(self.close)
+        self.raise_failures()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            try:
+                self.close()
+            except ExportError:
+                pass # Don't mask the exception already propagating
+        return False
@@ -0,0 +1,197 @@
+import json
+import math
+import os
+from datetime import datetime, date
+
+from money import from_cents, to_cents
+
+# --- Savings Goals ---
+#
+# Goals are saved in data/goals.json, one dict per goal:
+#
+#     {"name": "Emergency fund", "target": 3000, "deadline": "2027-06-30", "priority": 1,
+#      "min_buffer": 200, "saved": 500}
+#
+# target and saved (already set aside) are dollars. deadline is optional. Lower priority
+# numbers are funded first. min_buffer is the part of a paycheck's remaining balance the
+# goal never takes, so a paycheck keeps at least that much as a cushion.
+
+def build_goal(fields):
+    """
+    Builds a savings goal from user-supplied fields (e.g. a goals.json entry).
+    Raises ValueError for a missing name or invalid numbers and dates.
+    """
+    name = str(fields.get('name') or '').strip()
+    if not name:
+        raise ValueError("A savings goal needs a name.")
+    goal = {'name': name}
+    for key in ('target', 'saved', 'min_buffer'):
+        try:
+            goal[key] = float(fields.get(key) or 0.0)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid {key} for goal '{name}': {fields.get(key)!r}")
+        if goal[key] < 0:
+            raise ValueError(f"{key} for goal '{name}' cannot be negative.")
+    if goal['target'] <= 0:
+        raise ValueError(f"Goal '{name}' needs a positive target.")
+    try:
+        goal['priority'] = int(fields.get('priority', 1))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid priority for goal '{name}': {fields.get('priority')!r}")
+    deadline = fields.get('deadline')
+    if isinstance(deadline, str):
+        try:
+            deadline = datetime.strptime(deadline, "%Y-%m-%d").date()
+        except ValueError:
+            raise ValueError(f"Invalid deadline for goal '{name}': {deadline!r}. Please use YYYY-MM-DD.")
+    goal['deadline'] = deadline
+    return goal
+
+def load_goals(file_path='data/goals.json'):
+    """
+    Loads savings goals from a JSON file. Returns an empty list if there is no file.
+    """
+    if not os.path.exists(file_path):
+        return []
+    with open(file_path, 'r') as f:
+        return [build_goal(fields) for fields in json.load(f)]
+
+def save_goals(goals, file_path='data/goals.json'):
+    """
+    Saves savings goals to a JSON file.
+    """
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    goals_to_save = []
+    for goal in goals:
+        goal_copy = goal.copy()
+        if isinstance(goal_copy.get('deadline'), date):
+            goal_copy['deadline'] = goal_copy['deadline'].strftime("%Y-%m-%d")
+        goals_to_save.append(goal_copy)
+    with open(file_path, 'w') as f:
+        json.dump(goals_to_save, f, indent=4)
+
+class GoalAllocator:
+    """
+    Sets aside each paycheck's surplus for savings goals, right after the paycheck has
+    paid its bills (see iter_plan_engine and assign_bills_to_paychecks), so goals are
+    funded in the same pass that assigns bills.
+
+    On each payday, goals with a deadline first get their pace: what is left of the goal
+    split evenly over the paydays up to the deadline. Whatever surplus is left then goes
+    to goals by priority. Contributions are recorded on the paycheck under
+    'goal_contributions' and taken out of its remaining balance. Amounts are in cents.
+    """
+
+    def __init__(self, goals, pay_calendar):
+        self.pay_calendar = pay_calendar
+        self.goals = [
+            {
+                'name': goal['name'],
+                'target': to_cents(goal['target']),
+                'saved': min(to_cents(goal.get('saved') or 0.0), to_cents(goal['target'])),
+                'deadline': goal.get('deadline'),
+                'priority': goal.get('priority', 1),
+                'min_buffer': to_cents(goal.get('min_buffer') or 0.0),
+                'contributed': 0, # During this plan
+                'completed_on': None
+            }
+            for goal in goals
+        ]
+        # Ties in priority go to the earlier deadline
+        self.goals.sort(key=lambda goal: (goal['priority'], goal['deadline'] or date.max))
+        self.paydays = 0
+        self.last_pay_date = None
+
+    def _contribute(self, goal, paychecks_today, amount):
+        for paycheck_info in paychecks_today:
+            if amount <= 0 or goal['saved'] >= goal['target']:
+                break
+            take = min(amount, goal['target'] - goal['saved'], paycheck_info['remaining_balance'] - goal['min_buffer'])
+            if take <= 0:
+                continue
+            contributions = paycheck_info.setdefault('goal_contributions', [])
+            contribution = next((c for c in contributions if c['name'] == goal['name']), None)
+            if contribution is None: # A deadline goal's pace and its priority share go in one entry
+                contributions.append({'name': goal['name'], 'amount': take})
+            else:
+                contribution['amount'] += take
+            paycheck_info['remaining_balance'] -= take
+            goal['saved'] += take
+            goal['contributed'] += take
+            amount -= take
+            if goal['saved'] >= goal['target']:
+                goal['completed_on'] = paycheck_info['pay_date']
+
+    def allocate(self, paychecks_today, payday_index):
+        """
+        Allocates the surplus of the paychecks landing on the payday at payday_index.
+        """
+        open_goals = [goal for goal in self.goals if goal['saved'] < goal['target']]
+        for goal in open_goals:
+            if goal['deadline'] is not None:
+                paydays_left = self.pay_calendar.index_on_or_before(goal['deadline']) - payday_index + 1
+                if paydays_left > 0:
+                    remaining = goal['target'] - goal['saved']
+                    self._contribute(goal, paychecks_today, -(-remaining // paydays_left)) # Round the pace up
+        for goal in open_goals:
+            self._contribute(goal, paychecks_today, goal['target'] - goal['saved'])
+        self.paydays += 1
+        self.last_pay_date = paychecks_today[0]['pay_date']
+
+    def progress(self):
+        """
+        Returns each goal's progress in dollars, highest priority first, with its completion
+        date: the payday it was reached, or for goals still open at the end of the plan a
+        projection. The projection assumes the average amount set aside per payday so far
+        keeps going to the open goals in priority order, so it is worked out in closed form
+        however far past the plan it lands. None if nothing was set aside.
+        """
+        if self.paydays and self.last_pay_date is not None:
+            rate = sum(goal['contributed'] for goal in self.goals) / self.paydays # Cents per payday
+            pay_gap = self.pay_calendar.following_pay_date - self.last_pay_date
+        else:
+            rate, pay_gap = 0, None
+
+        progress = []
+        still_needed = 0 # Cents needed by open goals ahead of this one
+        for goal in self.goals:
+            completion = goal['completed_on']
+            projected = False
+            if completion is None and goal['saved'] < goal['target']:
+                still_needed += goal['target'] - goal['saved']
+                if rate > 0:
+                    completion = self.last_pay_date + pay_gap * math.ceil(still_needed / rate)
+                    projected = True
+            progress.append({
+                'name': goal['name'],
+                'priority': goal['priority'],
+                'target': from_cents(goal['target']),
+                'saved': from_cents(goal['saved']),
+                'contributed': from_cents(goal['contributed']),
+                'deadline': goal['deadline'],
+                'completion_date': completion,
+                'projected': projected,
+                'on_track': None if goal['deadline'] is None else (
+                    completion <= goal['deadline'] if completion is not None else goal['saved'] >= goal['target']
+                )
+            })
+        return progress
+
+def print_goal_progress(progress):
+    """
+    Prints a line per savings goal with its progress and (projected) completion date.
+    """
+    if not progress:
+        return
+    print("\n--- Savings Goals ---")
+    for goal in progress:
+        if goal['completion_date'] is None:
+            completion = "already saved" if goal['saved'] >= goal['target'] else "no surplus to reach it"
+        elif goal['projected']:
+            completion = f"projected {goal['completion_date'].strftime('%m-%d-%Y')}"
+        else:
+            completion = f"reached {goal['completion_date'].strftime('%m-%d-%Y')}"
+        deadline = ""
+        if goal['deadline'] is not None:
+            deadline = f" (deadline {goal['deadline'].strftime('%m-%d-%Y')}: {'on track' if goal['on_track'] else 'behind'})"
+        print(f"  - {goal['name']}: ${goal['saved']:.2f} of ${goal['target']:.2f}, {completion}{deadline}")
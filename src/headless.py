@@ -0,0 +1,402 @@
+import argparse
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from typing import List, Optional
+
+from main import (
+    compare_debt_strategies, expand_debt_history, generate_spreadsheet_output, load_bills, run_plan_engine, snapshot_in_dollars
+)
+from debt_kernel import evaluate_rate_schedules, month_number
+from money import from_cents
+from export_pipeline import ExportError, ExportPipeline
+from goals import GoalAllocator, build_goal, load_goals
+from ledger import DailyLedger
+from pay_calendar import IncomeStream, PayCalendar
+from rollups import CategoryRollup, PaycheckChartData
+from snapshot import write_snapshot
+
+# --- Headless Scenario Runs ---
+#
+# Runs a complete financial plan from a scenario file, with no prompts:
+#
+#     python src/headless.py scenario.json
+#
+# A scenario file is JSON (paths are relative to the scenario file):
+#
+#     {
+#         "name": "Household A",
+#         "bills": "bills.json",
+#         "pay": {"num_paychecks": 26, "net_pay": 2500, "start_date": "2026-11-06",
+#                 "pay_frequency": "bi-weekly"},
+#         "optimizations": [{"debt": "Visa", "payment_strategy": "extra", "amount": 50}],
+#         "goals": [{"name": "Emergency fund", "target": 3000, "deadline": "2027-06-30"}],
+#         "ledger": {"opening_balance": 250, "threshold": 100},
+#         "rate_scenarios": [{"debt": "Visa", "schedules": [{"name": "Rates +5%", "interest_rate": 0.29}]}],
+#         "output": {"spreadsheet": "financial_plan.xlsx", "summary": "summary.json",
+#                    "snapshot": "plan.mbsnap"}
+#     }
+#
+# "pay" may also set days_of_month, weekend_shift and holidays (see PayCalendar.from_schedule),
+# pay_dates: an explicit list of paydays replacing start_date and pay_frequency (num_paychecks then
+# defaults to the number of dates), or income_streams: a list of {name, amount, frequency,
+# start_date, pay_dates, days_of_month, weekend_shift} replacing net_pay and start_date.
+# Dates are YYYY-MM-DD; holidays apply to every schedule. "goals" is a list of savings goals (see goals.py) or the
+# path of a goals.json file. "ledger" sets the account balance before the first payday and the
+# low-balance threshold for the daily cash ledger (see ledger.py); both default to 0.
+# "rate_scenarios" runs a debt under other rate schedules (see debt_kernel.py), all in one pass.
+# From Python, call run_scenario() for typed results.
+
+@dataclass
+class BillAssignment:
+    name: str
+    due_date: date
+    amount: float
+    category: str
+
+@dataclass
+class PaycheckResult:
+    pay_date: date
+    net_pay: float
+    remaining_balance: float
+    assigned_bills: List[BillAssignment]
+    source: Optional[str] = None
+    goal_contributions: dict = field(default_factory=dict) # Goal name -> amount set aside
+    carried_over_bills: List[BillAssignment] = field(default_factory=list) # Due in this pay window but paid later or never
+
+@dataclass
+class DebtResult:
+    name: str
+    current_balance: float
+    payoff_date: Optional[date]
+    credit_limit: float
+    total_interest: float
+    total_fees: float
+    history: List[dict]
+
+    @property
+    def utilization(self):
+        """
+        The debt's final balance as a share of its credit limit, or None without a limit.
+        """
+        return self.current_balance / self.credit_limit if self.credit_limit else None
+
+@dataclass
+class OptimizationResult:
+    debt_name: str
+    payment_strategy: str
+    amount: float
+    baseline: dict
+    optimized: dict
+    interest_saved: float
+    fees_saved: float
+    months_saved: Optional[int]
+
+@dataclass
+class RateScheduleResult:
+    debt_name: str
+    name: str
+    total_interest: float
+    total_fees: float
+    payoff_month: Optional[int] # Months from now, None if not paid off within 30 years
+    final_balance: float
+
+@dataclass
+class GoalResult:
+    name: str
+    priority: int
+    target: float
+    saved: float
+    contributed: float
+    deadline: Optional[date]
+    completion_date: Optional[date]
+    projected: bool
+    on_track: Optional[bool]
+
+@dataclass
+class ScenarioResult:
+    name: str
+    paychecks: List[PaycheckResult]
+    debts: List[DebtResult]
+    unpaid_bills: List[BillAssignment]
+    optimizations: List[OptimizationResult] = field(default_factory=list)
+    rate_scenarios: List[RateScheduleResult] = field(default_factory=list)
+    spending_by_category: dict = field(default_factory=dict) # CategoryRollup.to_dict()
+    goals: List[GoalResult] = field(default_factory=list)
+    cash_flow: dict = field(default_factory=dict) # DailyLedger.summary()
+    output_file: Optional[str] = None
+
+    @property
+    def lowest_remaining_balance(self):
+        return min((paycheck.remaining_balance for paycheck in self.paychecks), default=0.0)
+
+    @property
+    def shortfall_paychecks(self):
+        """
+        The number of paychecks that couldn't pay every bill due in their pay window.
+        """
+        return sum(1 for paycheck in self.paychecks if paycheck.carried_over_bills)
+
+    def to_dict(self):
+        """
+        Converts the result to a JSON-ready dict (dates as YYYY-MM-DD).
+        """
+        return json.loads(json.dumps(asdict(self), default=json_default))
+
+def json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _parse_date(value, field_name):
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {field_name}: {value!r}. Please use YYYY-MM-DD.")
+
+def _parse_dates(values, field_name):
+    if not isinstance(values, list):
+        raise ValueError(f"{field_name} must be a list of dates.")
+    return [_parse_date(value, field_name) for value in values]
+
+def build_pay_calendar(pay):
+    """
+    Builds the PayCalendar for a scenario's pay settings (see the module notes above).
+    Raises ValueError for missing or invalid settings.
+    """
+    pay_dates = _parse_dates(pay['pay_dates'], 'pay_dates') if pay.get('pay_dates') else None
+    try:
+        num_paychecks = int(pay['num_paychecks'] if pay_dates is None or 'num_paychecks' in pay else len(pay_dates))
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("num_paychecks must be a positive integer.")
+    if num_paychecks <= 0:
+        raise ValueError("num_paychecks must be a positive integer.")
+    holidays = _parse_dates(pay.get('holidays', []), 'holidays')
+
+    if pay.get('income_streams'):
+        streams = [
+            IncomeStream(stream['name'], float(stream['amount']), stream.get('frequency', 'bi-weekly'),
+                         _parse_date(stream.get('start_date'), 'start_date') if not stream.get('pay_dates') else None,
+                         pay_dates=_parse_dates(stream['pay_dates'], 'pay_dates') if stream.get('pay_dates') else None,
+                         days_of_month=stream.get('days_of_month'), weekend_shift=stream.get('weekend_shift'), holidays=holidays)
+            for stream in pay['income_streams']
+        ]
+        return PayCalendar.from_income_streams(streams, num_paychecks)
+    if pay_dates is not None:
+        return PayCalendar.from_dates(pay_dates, pay.get('weekend_shift'), holidays, num_paychecks)
+    return PayCalendar.from_schedule(pay.get('pay_frequency', 'bi-weekly'), _parse_date(pay.get('start_date'), 'start_date'),
+                                     num_paychecks, days_of_month=pay.get('days_of_month'), weekend_shift=pay.get('weekend_shift'),
+                                     holidays=holidays)
+
+def run_plan(bills, pay, pay_calendar=None, due_date_cache=None, aggregators=(), goal_allocator=None):
+    """
+    Runs the plan engine quietly for bill templates and pay settings. A prebuilt
+    pay_calendar and a due_date_cache can be shared by runs with the same pay settings.
+    Report aggregators (see iter_plan_engine) are filled in as bills are paid, and a
+    goal_allocator built on pay_calendar funds savings goals in the same pass.
+
+    Returns:
+        tuple: (bill_instances, final_pay_periods, debt_progress_report), as run_plan_engine().
+    """
+    if pay_calendar is None:
+        pay_calendar = build_pay_calendar(pay)
+    net_pay = float(pay.get('net_pay', 0.0))
+    return run_plan_engine(bills, len(pay_calendar), net_pay, pay_calendar[0], pay_calendar, verbose=False,
+                           due_date_cache=due_date_cache, aggregators=aggregators, goal_allocator=goal_allocator)
+
+def carried_over_bills(bill_instances, pay_calendar):
+    """
+    Groups the bills a payday couldn't pay by that payday's date. A bill is carried over when
+    the paycheck whose window covers its due date (see PayCalendar.paying_index) didn't pay
+    it, whether a later paycheck did or none did.
+
+    Returns:
+        dict: Pay date -> list of carried-over bill instances, in bill order.
+    """
+    carried_over = {}
+    for bill in bill_instances:
+        paycheck_index = pay_calendar.paying_index(bill['due_date'])
+        if paycheck_index is not None and paycheck_index < len(pay_calendar) and bill['paid_by_paycheck_date'] != pay_calendar[paycheck_index]:
+            carried_over.setdefault(pay_calendar[paycheck_index], []).append(bill)
+    return carried_over
+
+def _bill_assignment(bill):
+    return BillAssignment(bill['name'], bill['due_date'], from_cents(bill['amount']), bill['category'])
+
+def _debt_result(debt_data):
+    history = list(expand_debt_history(debt_data)) # Amounts in cents
+    return DebtResult(
+        name=debt_data['name'],
+        current_balance=round(debt_data['current_balance'], 2),
+        payoff_date=debt_data['payoff_date'],
+        credit_limit=debt_data['credit_limit'],
+        total_interest=from_cents(sum(row['interest_accrued'] for row in history)),
+        total_fees=from_cents(sum(row['total_fees_charged'] for row in history)),
+        history=[snapshot_in_dollars(row) for row in history]
+    )
+
+def load_scenario(path):
+    """
+    Reads a scenario file and resolves its bills and output paths relative to it.
+    """
+    with open(path, 'r') as f:
+        scenario = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(path))
+
+    def resolve(file_path):
+        return file_path if file_path is None else os.path.join(base_dir, file_path)
+
+    scenario.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+    scenario['bills'] = resolve(scenario.get('bills', 'bills.json'))
+    if isinstance(scenario.get('goals'), str):
+        scenario['goals'] = resolve(scenario['goals'])
+    output = scenario.setdefault('output', {})
+    for key in ('spreadsheet', 'summary', 'snapshot', 'calendar', 'whatif'):
+        output[key] = resolve(output.get(key))
+    return scenario
+
+def run_scenario(scenario, bills=None, export=True, export_pipeline=None, due_date_cache=None):
+    """
+    Runs a scenario (as returned by load_scenario()) end to end without prompts: bill
+    instances, paycheck assignment, debt progress, the requested debt optimizations and,
+    if export is set, the spreadsheet and JSON summary outputs.
+
+    Args:
+        scenario (dict): The scenario settings.
+        bills (list): Bill templates to use instead of loading scenario['bills'].
+        export (bool): Write the outputs named in scenario['output'].
+        export_pipeline (ExportPipeline): Queue the spreadsheet write on this pipeline
+            instead of writing it before returning.
+        due_date_cache (dict): Shared by runs of the same scenario to reuse bill due date expansions.
+
+    Returns:
+        ScenarioResult: Typed plan results.
+    """
+    if bills is None:
+        if not os.path.exists(scenario['bills']):
+            raise FileNotFoundError(f"Bills file not found: {scenario['bills']}")
+        bills = load_bills(scenario['bills'])
+    if not bills:
+        raise ValueError(f"No bills loaded for scenario '{scenario.get('name')}'.")
+
+    goals = scenario.get('goals') or []
+    goals = load_goals(goals) if isinstance(goals, str) else [build_goal(fields) for fields in goals]
+    pay_calendar = build_pay_calendar(scenario.get('pay', {}))
+    goal_allocator = GoalAllocator(goals, pay_calendar) if goals else None
+
+    category_rollup, chart_data = CategoryRollup(), PaycheckChartData()
+    bill_instances, final_pay_periods, debt_progress_report = run_plan(bills, scenario.get('pay', {}), pay_calendar, due_date_cache,
+                                                                       aggregators=(category_rollup, chart_data), goal_allocator=goal_allocator)
+    goal_progress = goal_allocator.progress() if goal_allocator is not None else []
+    ledger = scenario.get('ledger', {})
+
+    optimizations = []
+    for request in scenario.get('optimizations', []):
+        debt = next((b for b in bills if b.get('is_debt') and request.get('debt') in (b['id'], b['name'])), None)
+        if debt is None:
+            raise ValueError(f"No debt with id or name {request.get('debt')!r} to optimize.")
+        optimizations.append(OptimizationResult(
+            **compare_debt_strategies(debt, request.get('payment_strategy', 'extra'), float(request.get('amount', 0.0)))
+        ))
+
+    rate_scenarios = []
+    for request in scenario.get('rate_scenarios', []):
+        debt = next((b for b in bills if b.get('is_debt') and request.get('debt') in (b['id'], b['name'])), None)
+        if debt is None:
+            raise ValueError(f"No debt with id or name {request.get('debt')!r} for rate scenarios.")
+        rate_scenarios.extend(
+            RateScheduleResult(debt['name'], **schedule_result)
+            for schedule_result in evaluate_rate_schedules(debt, request.get('schedules', []), month_number(date.today()), payment=request.get('payment'))
+        )
+
+    carried_over = carried_over_bills(bill_instances, pay_calendar)
+    result = ScenarioResult(
+        name=scenario.get('name', 'scenario'),
+        paychecks=[
+            PaycheckResult(pp['pay_date'], from_cents(pp['net_pay']), from_cents(pp['remaining_balance']),
+                           [_bill_assignment(bill) for bill in pp['assigned_bills']], pp.get('source'),
+                           {contribution['name']: from_cents(contribution['amount']) for contribution in pp.get('goal_contributions', [])},
+                           # Several deposits can share a payday; its carry-overs go on the first
+                           [_bill_assignment(bill) for bill in carried_over.pop(pp['pay_date'], [])])
+            for pp in final_pay_periods
+        ],
+        debts=[_debt_result(debt_data) for debt_data in debt_progress_report.values()],
+        unpaid_bills=[_bill_assignment(bill) for bill in bill_instances if bill['paid_by_paycheck_date'] is None],
+        optimizations=optimizations,
+        rate_scenarios=rate_scenarios,
+        spending_by_category=category_rollup.to_dict(),
+        goals=[GoalResult(**goal) for goal in goal_progress],
+        cash_flow=DailyLedger(final_pay_periods, float(ledger.get('opening_balance', 0.0)), float(ledger.get('threshold', 0.0))).summary()
+    )
+
+    output = scenario.get('output', {})
+    if export and output.get('spreadsheet'):
+        if export_pipeline is not None:
+            export_pipeline.submit(generate_spreadsheet_output, final_pay_periods, debt_progress_report, output['spreadsheet'],
+                                   [bill.copy() for bill in bills], category_rollup, chart_data, goal_progress, description=output['spreadsheet'])
+        else:
+            generate_spreadsheet_output(final_pay_periods, debt_progress_report, output['spreadsheet'], bills, category_rollup, chart_data, goal_progress)
+        result.output_file = output['spreadsheet']
+    if export and output.get('summary'):
+        with open(output['summary'], 'w') as f:
+            json.dump(result.to_dict(), f, indent=4)
+    if export and output.get('snapshot'):
+        write_snapshot(output['snapshot'], bill_instances, final_pay_periods, debt_progress_report, bills, result.name)
+    return result
+
+def print_scenario_summary(result):
+    """
+    Prints a short summary of a scenario run.
+    """
+    print(f"\n--- Scenario: {result.name} ---")
+    print(f"  Paychecks: {len(result.paychecks)} | Lowest remaining balance: ${result.lowest_remaining_balance:.2f} | Unpaid bills: {len(result.unpaid_bills)}")
+    for debt in result.debts:
+        payoff = debt.payoff_date.strftime('%Y-%m') if debt.payoff_date else f"not paid off (${debt.current_balance:.2f} left)"
+        print(f"  - {debt.name}: {payoff}, interest ${debt.total_interest:.2f}, fees ${debt.total_fees:.2f}")
+    if result.cash_flow.get('days'):
+        overdraft = result.cash_flow['first_overdraft']
+        print(f"  Cash: lowest ${result.cash_flow['lowest_balance']:.2f} on {result.cash_flow['lowest_date'].strftime('%m-%d-%Y')}"
+              f" | first overdraft {overdraft.strftime('%m-%d-%Y') if overdraft else 'none'}"
+              f" | {result.cash_flow['days_below_threshold']} days below ${result.cash_flow['threshold']:.2f}")
+    for goal in result.goals:
+        if goal.completion_date is not None:
+            completion = ("projected " if goal.projected else "reached ") + goal.completion_date.strftime('%m-%d-%Y')
+        else:
+            completion = "already saved" if goal.saved >= goal.target else "not reached"
+        print(f"  + {goal.name}: ${goal.saved:.2f} of ${goal.target:.2f}, {completion}" + (" (behind deadline)" if goal.on_track is False else ""))
+    for optimization in result.optimizations:
+        print(f"  * {optimization.debt_name} ({optimization.payment_strategy} ${optimization.amount:.2f}): saves ${optimization.interest_saved:.2f} interest, {optimization.months_saved} months")
+    for rate_scenario in result.rate_scenarios:
+        payoff = f"paid off in {rate_scenario.payoff_month} months" if rate_scenario.payoff_month else f"${rate_scenario.final_balance:.2f} left after 30 years"
+        print(f"  ~ {rate_scenario.debt_name} ({rate_scenario.name}): interest ${rate_scenario.total_interest:.2f}, {payoff}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run MonteBuster scenarios without prompts.")
+    parser.add_argument('scenarios', nargs='+', help="Scenario JSON files.")
+    parser.add_argument('--no-export', action='store_true', help="Skip the spreadsheet and summary outputs.")
+    args = parser.parse_args()
+
+    # Each scenario's workbook is written in the background while the next one is computed
+    failed = 0
+    with ExportPipeline() as export_pipeline:
+        for scenario_path in args.scenarios:
+            try:
+                print_scenario_summary(run_scenario(load_scenario(scenario_path), export=not args.no_export, export_pipeline=export_pipeline))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Error running scenario {scenario_path}: {e}")
+                failed += 1
+            try:
+                export_pipeline.raise_failures()
+            except ExportError as e:
+                print(f"Error writing spreadsheet: {e}")
+                failed += len(e.failures)
+        try:
+            export_pipeline.flush()
+        except ExportError as e:
+            print(f"Error writing spreadsheet: {e}")
+            failed += len(e.failures)
+    sys.exit(1 if failed else 0)
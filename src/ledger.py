@@ -0,0 +1,174 @@
+from datetime import timedelta
+
+import numpy as np
+
+from money import from_cents, to_cents
+
+# --- Daily Cash Ledger ---
+
+class DailyLedger:
+    """
+    The account balance at the end of every day of a plan, built from its paychecks.
+
+    Each paycheck is deposited on its pay date. Each bill it pays leaves the account on its
+    due date, or on the pay date for bills paid late (carried over, or due before the first
+    payday). Savings goal contributions leave on the pay date. Daily totals are summed into
+    a day-indexed int64 array of cents and the balances come from one cumulative sum.
+
+    An index is built once up front, so queries don't rescan the days:
+        first_overdraft, lowest_date and lowest_balance  O(1)
+        balance_on(day), first_overdraft_on_or_after()   O(1)
+        lowest_between(start, end), lowest_in_month()    O(1), from a sparse table of range minimums
+        days_below(threshold)                            O(log n), from the sorted balances
+    """
+
+    def __init__(self, final_pay_periods, opening_balance=0.0, threshold=0.0):
+        """
+        Args:
+            final_pay_periods (list): Paychecks with their assigned bills (amounts in cents).
+            opening_balance (float): Balance in dollars before the first day.
+            threshold (float): Balance in dollars that counts as running low, for days_below_threshold.
+        """
+        days, amounts = [], []
+        for paycheck_info in final_pay_periods:
+            pay_date = paycheck_info['pay_date']
+            days.append(pay_date)
+            amounts.append(paycheck_info['net_pay'])
+            for bill in paycheck_info['assigned_bills']:
+                days.append(max(bill['due_date'], pay_date))
+                amounts.append(-bill['amount'])
+            for contribution in paycheck_info.get('goal_contributions', []):
+                days.append(pay_date)
+                amounts.append(-contribution['amount'])
+
+        self.opening_balance = to_cents(opening_balance)
+        self.first_day = min(days) if days else None
+        if not days:
+            self.balances = np.zeros(0, dtype=np.int64)
+        else:
+            offsets = (np.array(days, dtype='datetime64[D]') - np.datetime64(self.first_day, 'D')).astype(np.int64)
+            flows = np.zeros(offsets.max() + 1, dtype=np.int64)
+            np.add.at(flows, offsets, np.array(amounts, dtype=np.int64))
+            self.balances = self.opening_balance + np.cumsum(flows)
+        self._build_index(to_cents(threshold))
+
+    def _build_index(self, threshold):
+        balances = self.balances
+        count = len(balances)
+        self.threshold = threshold
+        self._sorted_balances = np.sort(balances)
+
+        # Sparse table: _min_index[k][i] is the day with the lowest balance in [i, i + 2**k)
+        self._min_index = [np.arange(count)]
+        span = 1
+        while span * 2 <= count:
+            previous = self._min_index[-1]
+            left, right = previous[:count - span * 2 + 1], previous[span:count - span + 1]
+            self._min_index.append(np.where(balances[right] < balances[left], right, left))
+            span *= 2
+
+        # _next_overdraft[i] is the first day on or after i with a negative balance (count if none)
+        overdraft_days = np.where(balances < 0, np.arange(count), count)
+        self._next_overdraft = np.minimum.accumulate(overdraft_days[::-1])[::-1] if count else overdraft_days
+
+        self.first_overdraft = self._date(self._next_overdraft[0]) if count and self._next_overdraft[0] < count else None
+        lowest_day = int(np.argmin(balances)) if count else None
+        self.lowest_date = self._date(lowest_day) if count else None
+        self.lowest_balance = from_cents(int(balances[lowest_day])) if count else None
+        self.days_below_threshold = self._count_below(threshold)
+
+    def __len__(self):
+        return len(self.balances)
+
+    def _date(self, day):
+        return self.first_day + timedelta(days=int(day))
+
+    def _day(self, target_date):
+        """
+        Returns the day index of a date, clamped to the ledger's days.
+        """
+        return min(max((target_date - self.first_day).days, 0), len(self.balances) - 1)
+
+    def _count_below(self, threshold_cents):
+        return int(np.searchsorted(self._sorted_balances, threshold_cents, side='left'))
+
+    def dates(self):
+        """
+        Returns the ledger's days as a datetime64[D] array, aligned with balances.
+        """
+        if not len(self.balances):
+            return np.zeros(0, dtype='datetime64[D]')
+        return np.datetime64(self.first_day, 'D') + np.arange(len(self.balances))
+
+    def balance_on(self, target_date):
+        """
+        Returns the end-of-day balance in dollars on a date (the opening balance before the
+        first day, the last balance after the last one).
+        """
+        if not len(self.balances) or target_date < self.first_day:
+            return from_cents(self.opening_balance)
+        return from_cents(int(self.balances[self._day(target_date)]))
+
+    def days_below(self, threshold):
+        """
+        Returns the number of days ending below a balance in dollars.
+        """
+        return self._count_below(to_cents(threshold))
+
+    def first_overdraft_on_or_after(self, target_date):
+        """
+        Returns the first date on or after target_date ending with a negative balance, or None.
+        """
+        if not len(self.balances):
+            return None
+        day = self._next_overdraft[self._day(max(target_date, self.first_day))]
+        return self._date(day) if day < len(self.balances) else None
+
+    def lowest_between(self, start_date, end_date):
+        """
+        Returns (date, balance in dollars) of the lowest end-of-day balance from start_date
+        to end_date inclusive, or None if the range has no ledger days.
+        """
+        if not len(self.balances) or end_date < start_date or end_date < self.first_day or start_date > self._date(len(self.balances) - 1):
+            return None
+        start, end = self._day(start_date), self._day(end_date)
+        level = (end - start + 1).bit_length() - 1
+        left = self._min_index[level][start]
+        right = self._min_index[level][end - (1 << level) + 1]
+        day = right if self.balances[right] < self.balances[left] else left
+        return self._date(day), from_cents(int(self.balances[day]))
+
+    def lowest_in_month(self, year, month):
+        """
+        Returns (date, balance in dollars) of the lowest balance in a calendar month, or None.
+        """
+        first = self.first_day.replace(year=year, month=month, day=1)
+        following = first.replace(year=year + 1, month=1) if month == 12 else first.replace(month=month + 1)
+        return self.lowest_between(first, following - timedelta(days=1))
+
+    def summary(self):
+        """
+        Returns the overdraft index as JSON-ready values (dates stay date objects).
+        """
+        return {
+            'first_overdraft': self.first_overdraft,
+            'lowest_date': self.lowest_date,
+            'lowest_balance': self.lowest_balance,
+            'threshold': from_cents(self.threshold),
+            'days_below_threshold': self.days_below_threshold,
+            'days': len(self.balances)
+        }
+
+def print_ledger_summary(ledger):
+    """
+    Prints the daily ledger's overdraft index.
+    """
+    if not len(ledger):
+        return
+    print("\n--- Daily Cash Ledger ---")
+    if ledger.first_overdraft is not None:
+        print(f"  First overdraft: {ledger.first_overdraft.strftime('%m-%d-%Y')}")
+    else:
+        print("  The account never goes negative.")
+    print(f"  Lowest balance: ${ledger.lowest_balance:.2f} on {ledger.lowest_date.strftime('%m-%d-%Y')}")
+    print(f"  Days below ${from_cents(ledger.threshold):.2f}: {ledger.days_below_threshold} of {len(ledger)}")
@@ -1,13 +1,33 @@
 import datetime
 from datetime import datetime, date, timedelta
+import heapq
+import itertools
+import math
 import uuid
 import re
 import os
 import json
 import pandas as pd # For spreadsheet generation
+import xlsxwriter # For streaming spreadsheet output in rolling-horizon mode
+
+from bill_index import BillIndex, page_of, parse_bill_query
+from export_pipeline import ExportError, ExportPipeline
+from goals import GoalAllocator, load_goals, print_goal_progress
+from ledger import DailyLedger, print_ledger_summary
+from pay_calendar import IncomeStream, PayCalendar, PAY_FREQUENCIES
+from debt_kernel import annual_rate_for_month, monthly_rate_vector, parse_rate_schedule, rate_change_months
+from money import from_cents, to_cents
+from recurrence import due_dates_by_template, expand_due_dates, iter_due_dates_in_chunks
+from rollups import CategoryRollup, PaycheckChartData
 
 # --- Helper Functions ---
 
+def _quiet(*args, **kwargs):
+    """
+    Stand-in for print() when progress output is turned off.
+    """
+    pass
+
 def get_user_input(prompt):
     """
     Standardizes getting string input from the user.
@@ -31,6 +51,31 @@ def get_user_date_input(prompt):
             except ValueError:
                 print("Invalid date format. Please use YYYY-MM-DD or MM-DD-YYYY.")
 
+def get_user_dates_input(prompt, allow_empty=False):
+    """
+    Helper function to get a comma-separated list of dates from the user, loops until valid.
+    Accepts YYYY-MM-DD and MM-DD-YYYY, like get_user_date_input().
+    """
+    while True:
+        dates_str = input(prompt).strip()
+        if not dates_str and allow_empty:
+            return []
+        dates = []
+        for date_str in dates_str.split(','):
+            date_str = date_str.strip()
+            for date_format in ("%Y-%m-%d", "%m-%d-%Y"):
+                try:
+                    dates.append(datetime.strptime(date_str, date_format).date())
+                    break
+                except ValueError:
+                    pass
+            else:
+                print(f"Invalid date: '{date_str}'. Please use YYYY-MM-DD or MM-DD-YYYY, separated by commas.")
+                break
+        else:
+            if dates:
+                return dates
+
 def get_user_float_input(prompt, allow_negative=False):
     """
     Helper function to get valid float input from user, loops until valid.
@@ -63,6 +108,99 @@ def get_user_int_input(prompt, min_val=None, max_val=None):
         except ValueError:
             print("Invalid input. Please enter an integer.")
 
+def get_pay_schedule_input():
+    """
+    Prompts for a pay frequency and its options, or for an explicit list of pay dates.
+
+    Returns:
+        tuple: (frequency, days_of_month, weekend_shift, pay_dates, holidays). frequency is
+               'explicit' and pay_dates the list of dates when dates were entered, else pay_dates
+               is None. The rest are as taken by PayCalendar.from_schedule().
+    """
+    while True:
+        frequency = input(f"Enter pay frequency ({', '.join(PAY_FREQUENCIES)}, or 'dates' to list pay dates) [bi-weekly]: ").strip().lower() or 'bi-weekly'
+        if frequency in PAY_FREQUENCIES or frequency == 'dates':
+            break
+        print(f"Invalid frequency. Please enter one of: {', '.join(PAY_FREQUENCIES)}, dates.")
+
+    days_of_month = None
+    weekend_shift = None
+    pay_dates = None
+    holidays = []
+    if frequency == 'dates':
+        frequency = 'explicit'
+        pay_dates = get_user_dates_input("Enter the pay dates, separated by commas (YYYY-MM-DD or MM-DD-YYYY): ")
+    if frequency == 'semi-monthly':
+        while True:
+            days_str = input("Enter the two pay days of the month (e.g., 15,31 where 31 means the last day) [15,31]: ").strip() or '15,31'
+            try:
+                days_of_month = [int(day) for day in days_str.split(',')]
+                if len(days_of_month) == 2 and all(1 <= day <= 31 for day in days_of_month):
+                    break
+            except ValueError:
+                pass
+            print("Invalid input. Please enter two days between 1 and 31, separated by a comma.")
+    if frequency in ('semi-monthly', 'monthly', 'explicit'):
+        while True:
+            shift = input("Move paydays that fall on a weekend to the previous or next business day? (previous/next/none) [previous]: ").strip().lower() or 'previous'
+            if shift in ('previous', 'next', 'none'):
+                weekend_shift = None if shift == 'none' else shift
+                break
+            print("Invalid choice. Please enter 'previous', 'next' or 'none'.")
+        if weekend_shift is not None:
+            holidays = get_user_dates_input("Enter bank holidays to move paydays off too, separated by commas [none]: ", allow_empty=True)
+
+    return frequency, days_of_month, weekend_shift, pay_dates, holidays
+
+def get_pay_calendar_input(start_date, num_paychecks, net_pay):
+    """
+    Prompts for the pay schedule and any additional income streams (a second earner,
+    side income) and builds the PayCalendar of paydays.
+    """
+    frequency, days_of_month, weekend_shift, pay_dates, holidays = get_pay_schedule_input()
+    income_streams = [IncomeStream('Primary Paycheck', net_pay, frequency, start_date, pay_dates, days_of_month, weekend_shift, holidays)]
+
+    while input("Add another income stream (e.g., a second earner or side income)? (yes/no) [no]: ").strip().lower() == 'yes':
+        name = get_user_input("Enter a name for this income (e.g., Partner Paycheck): ").strip() or f"Income {len(income_streams) + 1}"
+        amount = get_user_float_input(f"Enter the net amount of each {name} deposit: $")
+        stream_frequency, stream_days, stream_shift, stream_dates, stream_holidays = get_pay_schedule_input()
+        first_date = None
+        if stream_dates is None:
+            first_date = get_user_date_input(f"Enter the date of the first {name} deposit (YYYY-MM-DD or MM-DD-YYYY): ")
+        income_streams.append(IncomeStream(name, amount, stream_frequency, first_date, stream_dates, stream_days, stream_shift, stream_holidays))
+
+    if len(income_streams) == 1:
+        if pay_dates is not None:
+            return PayCalendar.from_dates(pay_dates, weekend_shift, holidays, num_paychecks)
+        return PayCalendar.from_schedule(frequency, start_date, num_paychecks, days_of_month=days_of_month, weekend_shift=weekend_shift, holidays=holidays)
+    return PayCalendar.from_income_streams(income_streams, num_paychecks)
+
+
+BILL_MONEY_FIELDS = ['amount', 'initial_balance', 'minimum_payment', 'interest_rate', 'credit_limit', 'monthly_fee', 'annual_fee']
+DEBT_FIELDS = ['initial_balance', 'current_balance', 'minimum_payment', 'interest_rate', 'credit_limit', 'monthly_fee', 'annual_fee', 'annual_fee_month']
+
+def _normalize_bill_fields(bill):
+    """
+    Converts a bill's fields read from JSON (or an API request) to the types the planner uses:
+    due dates to datetime.date and numeric fields to floats.
+    """
+    if 'due_date' in bill and isinstance(bill['due_date'], str):
+        bill['due_date'] = datetime.strptime(bill['due_date'], "%Y-%m-%d").date()
+    
+    # Ensure all numeric fields are floats upon loading and handle potential None values
+    for key in BILL_MONEY_FIELDS:
+        if key in bill and bill[key] is not None:
+            try:
+                bill[key] = float(bill[key])
+            except ValueError:
+                print(f"Warning: Could not convert {bill[key]} for {key} in bill {bill.get('name', 'Unknown')}. Setting to 0.0")
+                bill[key] = 0.0 # Default to 0.0 if conversion fails
+    if 'annual_fee_month' in bill and bill['annual_fee_month'] is not None:
+        try:
+            bill['annual_fee_month'] = int(bill['annual_fee_month'])
+        except ValueError:
+            print(f"Warning: Could not convert {bill['annual_fee_month']} for annual_fee_month in bill {bill.get('name', 'Unknown')}. Setting to None")
+            bill['annual_fee_month'] = None # Default to None if conversion fails
 
 def load_bills(file_path='data/bills.json'):
     """
@@ -75,24 +213,7 @@ def load_bills(file_path='data/bills.json'):
     
     # Convert date strings back to datetime.date objects and ensure floats
     for bill in bills_data:
-        if 'due_date' in bill and isinstance(bill['due_date'], str):
-            bill['due_date'] = datetime.strptime(bill['due_date'], "%Y-%m-%d").date()
-        
-        # Ensure all numeric fields are floats upon loading and handle potential None values
-        for key in ['amount', 'initial_balance', 'minimum_payment', 'interest_rate', 'credit_limit', 'monthly_fee', 'annual_fee']:
-            if key in bill and bill[key] is not None:
-                try:
-                    bill[key] = float(bill[key])
-                except ValueError:
-                    print(f"Warning: Could not convert {bill[key]} for {key} in bill {bill.get('name', 'Unknown')}. Setting to 0.0")
-                    bill[key] = 0.0 # Default to 0.0 if conversion fails
-        if 'annual_fee_month' in bill and bill['annual_fee_month'] is not None:
-            try:
-                bill['annual_fee_month'] = int(bill['annual_fee_month'])
-            except ValueError:
-                print(f"Warning: Could not convert {bill['annual_fee_month']} for annual_fee_month in bill {bill.get('name', 'Unknown')}. Setting to None")
-                bill['annual_fee_month'] = None # Default to None if conversion fails
-
+        _normalize_bill_fields(bill)
 
     return bills_data
 
@@ -194,138 +315,313 @@ def add_bill():
 
     return bill
 
-def view_bills(bills):
+def build_bill_template(fields):
+    """
+    Builds a new bill template from a dict of fields without prompting; the
+    non-interactive counterpart of add_bill(). Raises ValueError for missing or
+    invalid fields.
+    """
+    for key in ['name', 'due_date', 'amount']:
+        if fields.get(key) in (None, ''):
+            raise ValueError(f"Missing required bill field: {key}")
+
+    bill = {
+        'id': fields.get('id') or str(uuid.uuid4()),
+        'name': str(fields['name']).strip(),
+        'due_date': fields['due_date'],
+        'amount': fields['amount'],
+        'category': fields.get('category') or 'Uncategorized',
+        'is_debt': bool(fields.get('is_debt', False)),
+        'is_recurring': bool(fields.get('is_recurring', False)),
+        'recurrence_frequency': None,
+        'paid_by_paycheck_date': None
+    }
+    if bill['is_recurring']:
+        bill['recurrence_frequency'] = (fields.get('recurrence_frequency') or 'monthly').strip().lower()
+
+    for key in DEBT_FIELDS:
+        bill[key] = fields.get(key) if bill['is_debt'] else None
+    if bill['is_debt']:
+        for key in ['initial_balance', 'minimum_payment', 'interest_rate']:
+            if bill[key] is None:
+                raise ValueError(f"Missing required debt field: {key}")
+        for key in ['credit_limit', 'monthly_fee', 'annual_fee']:
+            if bill[key] is None:
+                bill[key] = 0.0
+        if fields.get('rate_schedule'):
+            parse_rate_schedule(fields['rate_schedule']) # Raises ValueError for invalid entries
+            bill['rate_schedule'] = list(fields['rate_schedule'])
+    for key in BILL_MONEY_FIELDS:
+        if bill.get(key) is not None:
+            try:
+                bill[key] = float(bill[key])
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid number for {key}: {bill[key]!r}")
+
+    try:
+        _normalize_bill_fields(bill)
+    except ValueError as e:
+        raise ValueError(f"Invalid due date: {bill['due_date']}. Please use YYYY-MM-DD.") from e
+    return bill
+
+def update_bill_template(bill, fields):
+    """
+    Applies edited fields to an existing bill template without prompting; the
+    non-interactive counterpart of edit_bill(). The id cannot be changed.
+    """
+    updated_fields = {key: value for key, value in fields.items() if key != 'id'}
+    bill.update(build_bill_template({**bill, **updated_fields}))
+    return bill
+
+BILL_PAGE_SIZE = 10 # Bills per page when listing
+BILL_QUERY_HELP = "name words and filters like category:Debt due:15 debt:yes amount:50-200"
+
+def _print_bill(bill, number):
     """
-    Displays all loaded bill templates in a formatted list.
+    Prints one bill template with all its details.
+    """
+    print(f"{number}. Name: {bill['name']}")
+    print(f"   Due Date: {bill['due_date'].strftime('%Y-%m-%d')}")
+    print(f"   Amount: ${bill['amount']:.2f}")
+    print(f"   Recurring: {'Yes' if bill['is_recurring'] else 'No'}")
+    if bill['is_recurring']:
+        print(f"   Frequency: {bill['recurrence_frequency']}")
+    print(f"   Category: {bill['category']}")
+    if bill.get('is_debt', False):
+        print(f"   -- Debt Details --")
+        print(f"   Initial Balance: ${bill['initial_balance']:.2f}")
+        print(f"   Min Payment: ${bill['minimum_payment']:.2f}")
+        print(f"   Interest Rate: {bill['interest_rate'] * 100:.2f}% (Annual)")
+        for entry in bill.get('rate_schedule') or []:
+            print(f"     from {entry['start']}: {float(entry['rate']) * 100:.2f}%")
+        print(f"   Credit Limit: ${bill['credit_limit']:.2f}")
+        if bill.get('monthly_fee', 0.0) > 0:
+            print(f"   Monthly Fee: ${bill['monthly_fee']:.2f}")
+        if bill.get('annual_fee', 0.0) > 0:
+            print(f"   Annual Fee: ${bill['annual_fee']:.2f} (Month: {bill['annual_fee_month']})")
+    print("-" * 20)
+
+def _print_bill_line(bill, number):
+    """
+    Prints one bill template on a single line, for picking from a list.
+    """
+    debt_str = " | debt" if bill.get('is_debt', False) else ""
+    print(f"{number}. {bill['name']} | due {bill['due_date'].strftime('%Y-%m-%d')} | ${bill['amount']:.2f} | {bill['category']}{debt_str} | id {bill['id'][:8]}")
+
+def _page_choice(page, pages, prompt):
+    """
+    Shows the page position and asks for a choice. Returns (choice, new page); the page
+    changes for n, p or a page number like p3, and choice is None then.
+    """
+    choice = get_user_input(f"Page {page} of {pages}. {prompt}").strip()
+    if choice.lower() == 'n':
+        return None, page + 1
+    if choice.lower() == 'p':
+        return None, page - 1
+    if re.fullmatch(r'[pP]\d+', choice):
+        return None, int(choice[1:])
+    return choice, page
+
+def view_bills(bills, page_size=BILL_PAGE_SIZE):
+    """
+    Displays bill templates in a formatted list, a page at a time.
     """
     if not bills:
         print("\nNo bills currently loaded. Please add some bills first.")
         return False # Indicate no bills to view
 
     print("\n--- Current Bill Templates ---")
-    for i, bill in enumerate(bills):
-        print(f"{i + 1}. Name: {bill['name']}")
-        print(f"   Due Date: {bill['due_date'].strftime('%Y-%m-%d')}")
-        print(f"   Amount: ${bill['amount']:.2f}")
-        print(f"   Recurring: {'Yes' if bill['is_recurring'] else 'No'}")
-        if bill['is_recurring']:
-            print(f"   Frequency: {bill['recurrence_frequency']}")
-        print(f"   Category: {bill['category']}")
-        if bill.get('is_debt', False):
-            print(f"   -- Debt Details --")
-            print(f"   Initial Balance: ${bill['initial_balance']:.2f}")
-            print(f"   Min Payment: ${bill['minimum_payment']:.2f}")
-            print(f"   Interest Rate: {bill['interest_rate'] * 100:.2f}% (Annual)")
-            print(f"   Credit Limit: ${bill['credit_limit']:.2f}")
-            if bill.get('monthly_fee', 0.0) > 0:
-                print(f"   Monthly Fee: ${bill['monthly_fee']:.2f}")
-            if bill.get('annual_fee', 0.0) > 0:
-                print(f"   Annual Fee: ${bill['annual_fee']:.2f} (Month: {bill['annual_fee_month']})")
-        print("-" * 20)
-    return True # Indicate bills were displayed
-
-def edit_bill(bills):
-    """
-    Allows the user to select and edit an existing bill template.
-    """
-    if not view_bills(bills):
+    page = 1
+    while True:
+        page_bills, page, pages = page_of(bills, page, page_size)
+        for offset, bill in enumerate(page_bills):
+            _print_bill(bill, (page - 1) * page_size + offset + 1)
+        if pages == 1:
+            return True # Indicate bills were displayed
+        choice, page = _page_choice(page, pages, "Enter n for next, p for previous, p<number> for a page, or 0 to stop: ")
+        if choice is not None:
+            if choice == '0':
+                return True
+            print("Invalid choice. Please try again.")
+
+def search_bills(bill_index):
+    """
+    Asks for a bill query and lists the matching bills. Returns the matches, or None if
+    the query was invalid.
+    """
+    query_text = get_user_input(f"Search bills ({BILL_QUERY_HELP}; blank for all): ").strip()
+    try:
+        matches = bill_index.find(**parse_bill_query(query_text))
+    except ValueError as e:
+        print(f"Invalid search: {e}")
+        return None
+    print(f"{len(matches)} of {len(bill_index)} bills match.")
+    if matches:
+        view_bills(matches)
+    return matches
+
+def _select_bill(bill_index, matches, page_size=BILL_PAGE_SIZE):
+    """
+    Lists matching bills a line each, a page at a time, and asks for one by number or id
+    (the full id or the first characters shown). Returns the bill, or None if cancelled.
+    """
+    page = 1
+    while True:
+        page_bills, page, pages = page_of(matches, page, page_size)
+        for offset, bill in enumerate(page_bills):
+            _print_bill_line(bill, (page - 1) * page_size + offset + 1)
+        choice, page = _page_choice(page, pages, "Enter the number or id of the bill to edit, n/p for next/previous page, or 0 to cancel: ")
+        if choice is None:
+            continue
+        if choice == '0':
+            return None
+        if choice.isdigit() and 1 <= int(choice) <= len(matches):
+            return matches[int(choice) - 1]
+        bill = bill_index.get(choice)
+        if bill is None and len(choice) >= 4:
+            prefixed = [match for match in matches if match['id'].startswith(choice)]
+            bill = prefixed[0] if len(prefixed) == 1 else None
+        if bill is not None:
+            return bill
+        print("Invalid choice. Please enter a number or id from the list.")
+
+def edit_bill(bills, bill_index=None):
+    """
+    Allows the user to find and edit an existing bill template.
+    """
+    if not bills:
+        print("\nNo bills currently loaded. Please add some bills first.")
         return # No bills to edit
+    if bill_index is None:
+        bill_index = BillIndex(bills)
 
     while True:
+        query_text = get_user_input(f"Find the bill to edit ({BILL_QUERY_HELP}; blank for all): ").strip()
         try:
-            bill_index_str = get_user_input("Enter the number of the bill to edit (or 0 to cancel): ").strip()
-            bill_index = int(bill_index_str) - 1
+            matches = bill_index.find(**parse_bill_query(query_text))
+        except ValueError as e:
+            print(f"Invalid search: {e}")
+            continue
+        if matches:
+            break
+        print("No bills match. Please try again.")
 
-            if bill_index == -1: # User entered 0 to cancel
-                print("Bill editing cancelled.")
-                return
+    selected_bill = _select_bill(bill_index, matches)
+    if selected_bill is None:
+        print("Bill editing cancelled.")
+        return
 
-            if 0 <= bill_index < len(bills):
-                selected_bill = bills[bill_index]
-                print(f"\n--- Editing Bill: {selected_bill['name']} ---")
-                
-                while True: # Loop for editing fields within the selected bill
-                    # Display editable fields before each prompt for choice
-                    print("\nSelect field to edit:")
-                    print("1. Name")
-                    print("2. Due Date (YYYY-MM-DD or MM-DD-YYYY)") # Updated prompt here as well
-                    print("3. Amount")
-                    print("4. Recurring (yes/no)")
-                    if selected_bill['is_recurring']:
-                        print("5. Recurrence Frequency")
-                    print("6. Category")
-                    if selected_bill.get('is_debt', False):
-                        print("7. Initial Balance")
-                        print("8. Minimum Payment")
-                        print("9. Interest Rate")
-                        print("10. Credit Limit")
-                        print("11. Monthly Fee")
-                        print("12. Annual Fee")
-                        if selected_bill.get('annual_fee', 0.0) > 0:
-                            print("13. Annual Fee Month")
-                    print("0. Done editing this bill")
-
-                    field_choice = get_user_input("Enter field number to edit: ").strip()
-
-                    if field_choice == '0':
-                        print(f"Finished editing '{selected_bill['name']}'.")
-                        save_bills(bills) # Save after each bill is done editing
-                        return # Exit editing for this bill
-
-                    if field_choice == '1':
-                        selected_bill['name'] = get_user_input(f"Enter new name for {selected_bill['name']}: ").strip()
-                    elif field_choice == '2':
-                        selected_bill['due_date'] = get_user_date_input(f"Enter new due date for {selected_bill['name']} (YYYY-MM-DD or MM-DD-YYYY): ") # Updated prompt here
-                    elif field_choice == '3':
-                        selected_bill['amount'] = get_user_float_input(f"Enter new amount for {selected_bill['name']}: $")
-                    elif field_choice == '4':
-                        while True:
-                            is_recurring_str = input(f"Is {selected_bill['name']} a recurring bill? (yes/no): ").lower().strip()
-                            if is_recurring_str == 'yes':
-                                selected_bill['is_recurring'] = True
-                                selected_bill['recurrence_frequency'] = get_user_input("Enter new recurrence frequency (e.g., monthly, bi-weekly, annually): ").strip().lower()
-                                break
-                            elif is_recurring_str == 'no':
-                                selected_bill['is_recurring'] = False
-                                selected_bill['recurrence_frequency'] = None
-                                break
-                            else:
-                                print("Invalid choice. Please enter 'yes' or 'no'.")
-                    elif field_choice == '5' and selected_bill['is_recurring']:
-                        selected_bill['recurrence_frequency'] = get_user_input("Enter new recurrence frequency (e.g., monthly, bi-weekly, annually): ").strip().lower()
-                    elif field_choice == '6':
-                        selected_bill['category'] = get_user_input(f"Enter new category for {selected_bill['name']}: ").strip()
-                    elif selected_bill.get('is_debt', False) and field_choice == '7':
-                        selected_bill['initial_balance'] = get_user_float_input(f"Enter new initial balance for {selected_bill['name']}: $")
-                    elif selected_bill.get('is_debt', False) and field_choice == '8':
-                        selected_bill['minimum_payment'] = get_user_float_input(f"Enter new minimum payment for {selected_bill['name']}: $")
-                    elif selected_bill.get('is_debt', False) and field_choice == '9':
-                        # Updated prompt for interest rate clarity
-                        selected_bill['interest_rate'] = get_user_float_input(f"Enter new annual interest rate for {selected_bill['name']} (e.g., 0.18 for 18%, or 0.36 for 36%): ", allow_negative=False)
-                    elif selected_bill.get('is_debt', False) and field_choice == '10':
-                        selected_bill['credit_limit'] = get_user_float_input(f"Enter new credit limit for {selected_bill['name']}: $")
-                    elif selected_bill.get('is_debt', False) and field_choice == '11':
-                        selected_bill['monthly_fee'] = get_user_float_input(f"Enter new monthly fee for {selected_bill['name']} (enter 0 if none): $")
-                    elif selected_bill.get('is_debt', False) and field_choice == '12':
-                        selected_bill['annual_fee'] = get_user_float_input(f"Enter new annual fee for {selected_bill['name']} (enter 0 if none): $")
-                        if selected_bill['annual_fee'] > 0:
-                            selected_bill['annual_fee_month'] = get_user_int_input(f"Enter the month (1-12) when the annual fee is charged for {selected_bill['name']}: ", 1, 12)
-                        else:
-                            selected_bill['annual_fee_month'] = None
-                    elif selected_bill.get('is_debt', False) and selected_bill.get('annual_fee', 0.0) > 0 and field_choice == '13':
-                        selected_bill['annual_fee_month'] = get_user_int_input(f"Enter the month (1-12) when the annual fee is charged for {selected_bill['name']}: ", 1, 12)
-                    else:
-                        print("Invalid field number or field not applicable to this bill type. Please try again.")
-                        continue # Continue the inner loop to re-display options
-                    
-                    print(f"'{selected_bill['name']}' updated.") # Simpler confirmation
-                    view_bills([selected_bill]) # Show updated bill
+    print(f"\n--- Editing Bill: {selected_bill['name']} ---")
+    while True: # Loop for editing fields within the selected bill
+        # Display editable fields before each prompt for choice
+        print("\nSelect field to edit:")
+        print("1. Name")
+        print("2. Due Date (YYYY-MM-DD or MM-DD-YYYY)") # Updated prompt here as well
+        print("3. Amount")
+        print("4. Recurring (yes/no)")
+        if selected_bill['is_recurring']:
+            print("5. Recurrence Frequency")
+        print("6. Category")
+        if selected_bill.get('is_debt', False):
+            print("7. Initial Balance")
+            print("8. Minimum Payment")
+            print("9. Interest Rate")
+            print("10. Credit Limit")
+            print("11. Monthly Fee")
+            print("12. Annual Fee")
+            if selected_bill.get('annual_fee', 0.0) > 0:
+                print("13. Annual Fee Month")
+        print("0. Done editing this bill")
+
+        field_choice = get_user_input("Enter field number to edit: ").strip()
+
+        if field_choice == '0':
+            print(f"Finished editing '{selected_bill['name']}'.")
+            save_bills(bills) # Save after each bill is done editing
+            return # Exit editing for this bill
+
+        if field_choice == '1':
+            selected_bill['name'] = get_user_input(f"Enter new name for {selected_bill['name']}: ").strip()
+        elif field_choice == '2':
+            selected_bill['due_date'] = get_user_date_input(f"Enter new due date for {selected_bill['name']} (YYYY-MM-DD or MM-DD-YYYY): ") # Updated prompt here
+        elif field_choice == '3':
+            selected_bill['amount'] = get_user_float_input(f"Enter new amount for {selected_bill['name']}: $")
+        elif field_choice == '4':
+            while True:
+                is_recurring_str = input(f"Is {selected_bill['name']} a recurring bill? (yes/no): ").lower().strip()
+                if is_recurring_str == 'yes':
+                    selected_bill['is_recurring'] = True
+                    selected_bill['recurrence_frequency'] = get_user_input("Enter new recurrence frequency (e.g., monthly, bi-weekly, annually): ").strip().lower()
+                    break
+                elif is_recurring_str == 'no':
+                    selected_bill['is_recurring'] = False
+                    selected_bill['recurrence_frequency'] = None
+                    break
+                else:
+                    print("Invalid choice. Please enter 'yes' or 'no'.")
+        elif field_choice == '5' and selected_bill['is_recurring']:
+            selected_bill['recurrence_frequency'] = get_user_input("Enter new recurrence frequency (e.g., monthly, bi-weekly, annually): ").strip().lower()
+        elif field_choice == '6':
+            selected_bill['category'] = get_user_input(f"Enter new category for {selected_bill['name']}: ").strip()
+        elif selected_bill.get('is_debt', False) and field_choice == '7':
+            selected_bill['initial_balance'] = get_user_float_input(f"Enter new initial balance for {selected_bill['name']}: $")
+        elif selected_bill.get('is_debt', False) and field_choice == '8':
+            selected_bill['minimum_payment'] = get_user_float_input(f"Enter new minimum payment for {selected_bill['name']}: $")
+        elif selected_bill.get('is_debt', False) and field_choice == '9':
+            # Updated prompt for interest rate clarity
+            selected_bill['interest_rate'] = get_user_float_input(f"Enter new annual interest rate for {selected_bill['name']} (e.g., 0.18 for 18%, or 0.36 for 36%): ", allow_negative=False)
+        elif selected_bill.get('is_debt', False) and field_choice == '10':
+            selected_bill['credit_limit'] = get_user_float_input(f"Enter new credit limit for {selected_bill['name']}: $")
+        elif selected_bill.get('is_debt', False) and field_choice == '11':
+            selected_bill['monthly_fee'] = get_user_float_input(f"Enter new monthly fee for {selected_bill['name']} (enter 0 if none): $")
+        elif selected_bill.get('is_debt', False) and field_choice == '12':
+            selected_bill['annual_fee'] = get_user_float_input(f"Enter new annual fee for {selected_bill['name']} (enter 0 if none): $")
+            if selected_bill['annual_fee'] > 0:
+                selected_bill['annual_fee_month'] = get_user_int_input(f"Enter the month (1-12) when the annual fee is charged for {selected_bill['name']}: ", 1, 12)
             else:
-                print("Invalid bill number. Please enter a number from the list.")
-        except ValueError:
-            print("Invalid input. Please enter a number.")
-        except IndexError:
-            print("Invalid bill number. Please enter a number from the list.")
+                selected_bill['annual_fee_month'] = None
+        elif selected_bill.get('is_debt', False) and selected_bill.get('annual_fee', 0.0) > 0 and field_choice == '13':
+            selected_bill['annual_fee_month'] = get_user_int_input(f"Enter the month (1-12) when the annual fee is charged for {selected_bill['name']}: ", 1, 12)
+        else:
+            print("Invalid field number or field not applicable to this bill type. Please try again.")
+            continue # Continue the inner loop to re-display options
+
+        bill_index.update(selected_bill) # Keep searches in step with the edit
+        print(f"'{selected_bill['name']}' updated.") # Simpler confirmation
+        view_bills([selected_bill]) # Show updated bill
+
+def _cached_due_dates_by_template(bill_templates, start_date, end_date, due_date_cache):
+    """
+    Returns an iterator over each template's due dates in the planning period (see recurrence.py).
+    With a due_date_cache, the templates are expanded together in one bulk expansion and each
+    distinct schedule (first due date, recurrence, period) is expanded only once per cache, so
+    plans that share most of their templates, like what-if variants, reuse the expansions.
+    Without one, each template's due dates are expanded lazily a chunk at a time, so memory
+    doesn't grow with the planning horizon (as in rolling-horizon mode).
+    """
+    if due_date_cache is None:
+        return [iter_due_dates_in_chunks(template, start_date, end_date) for template in bill_templates]
+    keys = [(template['due_date'], template['is_recurring'], template.get('recurrence_frequency'), start_date, end_date)
+            for template in bill_templates]
+    missing = {}
+    for key, template in zip(keys, bill_templates):
+        if key not in due_date_cache:
+            missing.setdefault(key, template)
+    if missing:
+        due_date_cache.update(zip(missing, due_dates_by_template(list(missing.values()), start_date, end_date)))
+    return [iter(due_date_cache[key]) for key in keys]
+
+def _new_bill_instance(template, due_date):
+    """
+    Creates a bill instance from a template for a single due date.
+    The instance's amount is in integer cents (see money.py).
+    """
+    instance = template.copy()
+    instance['id'] = str(uuid.uuid4()) # Unique ID for each instance
+    instance['due_date'] = due_date
+    instance['amount'] = to_cents(template['amount'])
+    instance['paid_by_paycheck_date'] = None # Reset for each instance
+    return instance
 
 def generate_bill_instances(bill_templates, start_date, end_date):
     """
@@ -339,152 +635,164 @@ def generate_bill_instances(bill_templates, start_date, end_date):
     if isinstance(end_date, str):
         end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
 
-    for template in bill_templates:
-        # Debts are not "generated instances" in the same way; their payments are part of the simulation
-        # However, if a 'debt payment' is entered as a recurring bill (e.g. 'Credit Card Payment'), it will be processed here
-        # For simplicity, we assume 'amount' for debt templates is the intended payment, and it will be assigned.
-        # The debt simulation itself uses minimum_payment if no assigned payment is found for a month.
-
-        if template['is_recurring']:
-            current_due_date = template['due_date']
-            
-            # Adjust current_due_date to be within or past start_date if it's an old template
-            # Ensure we don't start generating instances from before our planning period
-            while current_due_date < start_date:
-                if current_due_date.month == 12:
-                    current_due_date = current_due_date.replace(year=current_due_date.year + 1, month=1)
-                else:
-                    current_due_date = current_due_date.replace(month=current_due_date.month + 1)
-                # For bi-weekly/annually, similar logic would apply. 
-                # For simplicity here, just monthly is handled by default if 'recurrence_frequency' not specific.
-                if template['recurrence_frequency'] == 'bi-weekly':
-                    current_due_date += timedelta(weeks=2)
-                elif template['recurrence_frequency'] == 'annually':
-                    current_due_date = current_due_date.replace(year=current_due_date.year + 1)
-                elif template['recurrence_frequency'] == 'monthly':
-                    pass # Handled by the generic monthly adjustment
-                else:
-                    break # Break if frequency is unknown, avoid infinite loop for bad data
-
-
-            # Now, iterate from the adjusted current_due_date
-            while current_due_date <= end_date:
-                instance = template.copy()
-                instance['id'] = str(uuid.uuid4()) # Unique ID for each instance
-                instance['due_date'] = current_due_date
-                instance['paid_by_paycheck_date'] = None # Reset for each instance
-                bill_instances.append(instance)
-
-                # Move to the next due date based on frequency
-                if template['recurrence_frequency'] == 'monthly':
-                    if current_due_date.month == 12:
-                        current_due_date = current_due_date.replace(year=current_due_date.year + 1, month=1)
-                    else:
-                        current_due_date = current_due_date.replace(month=current_due_date.month + 1)
-                elif template['recurrence_frequency'] == 'bi-weekly':
-                    current_due_date += timedelta(weeks=2)
-                elif template['recurrence_frequency'] == 'annually':
-                    current_due_date = current_due_date.replace(year=current_due_date.year + 1)
-                else:
-                    print(f"Warning: Unknown recurrence frequency for {template['name']}: {template['recurrence_frequency']}")
-                    break # Stop generating instances for this bill if frequency is unknown
-        else:
-            # For non-recurring bills, just add the single instance if within range
-            if start_date <= template['due_date'] <= end_date:
-                instance = template.copy()
-                instance['id'] = str(uuid.uuid4()) # Unique ID for each instance
-                instance['paid_by_paycheck_date'] = None
-                bill_instances.append(instance)
-    
-    # Sort bill instances by due date
-    bill_instances.sort(key=lambda x: x['due_date'])
+    # Debts are not "generated instances" in the same way; their payments are part of the simulation
+    # However, if a 'debt payment' is entered as a recurring bill (e.g. 'Credit Card Payment'), it will be processed here
+    # For simplicity, we assume 'amount' for debt templates is the intended payment, and it will be assigned.
+    # The debt simulation itself uses minimum_payment if no assigned payment is found for a month.
+    # All templates are expanded at once, already ordered by due date (see recurrence.py)
+    template_indexes, due_dates = expand_due_dates(bill_templates, start_date, end_date)
+    for template_index, due_date in zip(template_indexes.tolist(), due_dates.tolist()):
+        bill_instances.append(_new_bill_instance(bill_templates[template_index], due_date))
     
     return bill_instances
 
-def assign_bills_to_paychecks(bill_instances, num_paychecks, net_pay, start_date):
+def _new_paycheck(pay_date, net_pay, source=None):
     """
-    Assigns bills to paychecks over a specified period.
-    Assumes bi-weekly paychecks starting from start_date.
+    Creates an empty paycheck record for a pay date, from net_pay in dollars.
+    Paychecks from income streams also record which stream they came from.
+    Balances are kept in integer cents (see money.py).
     """
-    paychecks = []
-    current_pay_date = start_date
+    net_pay = to_cents(net_pay)
+    paycheck_info = {
+        'pay_date': pay_date,
+        'net_pay': net_pay,
+        'initial_balance_for_period': net_pay,
+        'assigned_bills': [],
+        'remaining_balance': net_pay
+    }
+    if source is not None:
+        paycheck_info['source'] = source
+    return paycheck_info
+
+def _paychecks_for_payday(pay_calendar, index, net_pay):
+    """
+    Creates the paycheck records landing on a payday: one per deposit for calendars
+    built from income streams, otherwise a single paycheck of net_pay.
+    """
+    if pay_calendar.deposits is None:
+        return [_new_paycheck(pay_calendar[index], net_pay)]
+    return [_new_paycheck(deposit.pay_date, deposit.amount, deposit.source) for deposit in pay_calendar.deposits[index]]
 
-    # Determine planning end date based on paychecks
-    # Assuming start_date is the date of the first paycheck.
-    # The simulation period should cover all bills until the last paycheck.
-    end_planning_date = start_date + timedelta(weeks=2 * (num_paychecks - 1)) # Date of the last paycheck
-    
-    # Filter out bill instances that are outside the full planning period
-    # This ensures only relevant bills are considered, even if due dates extend slightly past a paycheck
-    filtered_bill_instances = [
-        bill for bill in bill_instances 
-        if bill['due_date'] <= end_planning_date + timedelta(days=31) # Allow bills due a month after last paycheck
-    ]
-    # Sort by due date
-    filtered_bill_instances.sort(key=lambda x: x['due_date'])
+def _best_deposit(paychecks_today, amount):
+    """
+    Picks the paycheck that can cover an amount with the least left over (best fit),
+    or None if none of them can.
+    """
+    best_paycheck = None
+    for paycheck_info in paychecks_today:
+        if paycheck_info['remaining_balance'] >= amount:
+            if best_paycheck is None or paycheck_info['remaining_balance'] < best_paycheck['remaining_balance']:
+                best_paycheck = paycheck_info
+    return best_paycheck
+
+def _pay_bills_on_payday(paychecks_today, unassigned_carry_over_bills, bills_due_this_period, verbose=True):
+    """
+    Pays carried-over bills first, then the bills newly due before the next payday.
+    When several deposits land on the same payday, each bill goes to the deposit that
+    covers it with the least left over. Bills that don't fit are added to the carry-over list.
 
+    Returns:
+        list: The bills paid on this payday.
+    """
+    log = print if verbose else _quiet
+    pay_date = paychecks_today[0]['pay_date']
+    log(f"\n--- Processing Paycheck for {pay_date.strftime('%Y-%m-%d')} ---")
+    if len(paychecks_today) == 1 and 'source' not in paychecks_today[0]:
+        log(f"  Initial Paycheck Balance: ${from_cents(paychecks_today[0]['remaining_balance']):.2f}")
+    else:
+        for paycheck_info in paychecks_today:
+            log(f"  Deposit from {paycheck_info['source']}: ${from_cents(paycheck_info['remaining_balance']):.2f}")
+
+    def paid_from(paycheck_info):
+        # Name the deposit only when there is more than one to choose from
+        return f" (from {paycheck_info['source']})" if len(paychecks_today) > 1 else ""
+
+    paid_bills = []
+
+    # Process carry-over bills first
+    if unassigned_carry_over_bills:
+        log("  Attempting to pay carried-over bills:")
+    for bill in unassigned_carry_over_bills[:]: # Iterate over copy
+        paycheck_info = _best_deposit(paychecks_today, bill['amount'])
+        if paycheck_info is not None:
+            paycheck_info['assigned_bills'].append(bill)
+            paycheck_info['remaining_balance'] -= bill['amount']
+            bill['paid_by_paycheck_date'] = pay_date # Mark as paid
+            unassigned_carry_over_bills.remove(bill) # Remove from carry-over list
+            paid_bills.append(bill)
+            log(f"    - PAID (Carry-over): {bill['name']} - ${from_cents(bill['amount']):.2f}{paid_from(paycheck_info)}. Remaining: ${from_cents(paycheck_info['remaining_balance']):.2f}")
+        else:
+            log(f"    - NOT PAID (Carry-over - Insufficient funds): {bill['name']} - ${from_cents(bill['amount']):.2f}. Remaining: ${from_cents(max(pc['remaining_balance'] for pc in paychecks_today)):.2f}")
+        # Else, it remains in unassigned_carry_over_bills for the next paycheck
+
+    # Sort new bills for this period by due date, then by amount (largest first)
+    bills_due_this_period.sort(key=lambda x: (x['due_date'], -x['amount']))
+
+    if bills_due_this_period:
+        log("  Attempting to pay new bills due this period:")
+    for bill in bills_due_this_period:
+        paycheck_info = _best_deposit(paychecks_today, bill['amount'])
+        if paycheck_info is not None:
+            paycheck_info['assigned_bills'].append(bill)
+            paycheck_info['remaining_balance'] -= bill['amount']
+            bill['paid_by_paycheck_date'] = pay_date # Mark as paid
+            paid_bills.append(bill)
+            log(f"    - PAID: {bill['name']} (Due: {bill['due_date'].strftime('%m-%d')}) - ${from_cents(bill['amount']):.2f}{paid_from(paycheck_info)}. Remaining: ${from_cents(paycheck_info['remaining_balance']):.2f}")
+        else:
+            unassigned_carry_over_bills.append(bill) # Carry over if insufficient funds
+            log(f"    - NOT PAID (Insufficient funds): {bill['name']} (Due: {bill['due_date'].strftime('%m-%d')}) - ${from_cents(bill['amount']):.2f}. Remaining: ${from_cents(max(pc['remaining_balance'] for pc in paychecks_today)):.2f}")
+
+    if not paid_bills and not unassigned_carry_over_bills:
+        log("    No bills assigned or carried over for this paycheck period.")
+
+    return paid_bills
+
+def _fund_goals(goal_allocator, paychecks_today, payday_index, verbose=True):
+    """
+    Sets aside what is left of a payday's paychecks for savings goals (see goals.py).
+    """
+    goal_allocator.allocate(paychecks_today, payday_index)
+    if verbose:
+        for paycheck_info in paychecks_today:
+            contributions = paycheck_info.get('goal_contributions', [])
+            if contributions:
+                print("  Setting aside surplus for savings goals:")
+            for contribution in contributions:
+                print(f"    - SAVED: {contribution['name']} - ${from_cents(contribution['amount']):.2f}")
+            if contributions:
+                print(f"    Remaining after savings: ${from_cents(paycheck_info['remaining_balance']):.2f}")
+
+def assign_bills_to_paychecks(bill_instances, num_paychecks, net_pay, start_date, pay_calendar=None, goal_allocator=None):
+    """
+    Assigns bills to paychecks over a specified period.
+    Paydays come from pay_calendar (a PayCalendar); without one, bi-weekly
+    paychecks of net_pay starting from start_date are assumed. For a calendar built
+    with PayCalendar.from_income_streams(), every deposit becomes its own paycheck
+    and net_pay is ignored. With a goal_allocator (a GoalAllocator built on the same
+    calendar), each paycheck's surplus goes to savings goals once its bills are paid.
+    """
+    if pay_calendar is None:
+        pay_calendar = PayCalendar.from_schedule('bi-weekly', start_date, num_paychecks)
+    num_paydays = min(num_paychecks, len(pay_calendar))
+
+    # Bucket each bill under the payday whose window (up to the next payday) covers its due date.
+    # Bills due after the last pay window closes are left unassigned.
+    bills_due_by_payday = [[] for _ in range(num_paydays)]
+    for bill in sorted(bill_instances, key=lambda x: x['due_date']):
+        payday_index = pay_calendar.paying_index(bill['due_date'])
+        if payday_index is not None and payday_index < num_paydays:
+            bills_due_by_payday[payday_index].append(bill)
+
+    paychecks = []
     # Track unassigned bills that carry over
     unassigned_carry_over_bills = []
 
-    for i in range(num_paychecks):
-        paycheck_info = {
-            'pay_date': current_pay_date,
-            'net_pay': net_pay,
-            'initial_balance_for_period': net_pay,
-            'assigned_bills': [],
-            'remaining_balance': net_pay
-        }
-        
-        print(f"\n--- Processing Paycheck for {current_pay_date.strftime('%Y-%m-%d')} ---")
-        print(f"  Initial Paycheck Balance: ${paycheck_info['remaining_balance']:.2f}")
-
-        # Add any carried-over unassigned bills to the current paycheck's consideration
-        # Process carry-over bills first
-        if unassigned_carry_over_bills:
-            print("  Attempting to pay carried-over bills:")
-        for bill in unassigned_carry_over_bills[:]: # Iterate over copy
-            if paycheck_info['remaining_balance'] >= bill['amount']:
-                paycheck_info['assigned_bills'].append(bill)
-                paycheck_info['remaining_balance'] -= bill['amount']
-                bill['paid_by_paycheck_date'] = current_pay_date # Mark as paid
-                unassigned_carry_over_bills.remove(bill) # Remove from carry-over list
-                print(f"    - PAID (Carry-over): {bill['name']} - ${bill['amount']:.2f}. Remaining: ${paycheck_info['remaining_balance']:.2f}")
-            else:
-                print(f"    - NOT PAID (Carry-over - Insufficient funds): {bill['name']} - ${bill['amount']:.2f}. Remaining: ${paycheck_info['remaining_balance']:.2f}")
-            # Else, it remains in unassigned_carry_over_bills for the next paycheck
-        
-        # Identify bills due before the *next* paycheck (or end of planning if last paycheck)
-        next_pay_date = current_pay_date + timedelta(weeks=2)
-        
-        # Bills due between previous paycheck + 1 day and next paycheck due date
-        bills_due_this_period = []
-        for bill in filtered_bill_instances:
-            # If bill is not already paid/assigned AND its due date is relevant for this paycheck window
-            if bill.get('paid_by_paycheck_date') is None and bill['due_date'] <= next_pay_date:
-                bills_due_this_period.append(bill)
-        
-        # Sort new bills for this period by due date, then by amount (largest first)
-        bills_due_this_period.sort(key=lambda x: (x['due_date'], -x['amount']))
-
-        if bills_due_this_period:
-            print("  Attempting to pay new bills due this period:")
-        # Assign new bills due this period
-        for bill in bills_due_this_period:
-            if bill.get('paid_by_paycheck_date') is None: # Only assign if not already assigned (prevents double assignment if it was a carry-over)
-                if paycheck_info['remaining_balance'] >= bill['amount']:
-                    paycheck_info['assigned_bills'].append(bill)
-                    paycheck_info['remaining_balance'] -= bill['amount']
-                    bill['paid_by_paycheck_date'] = current_pay_date # Mark as paid
-                    print(f"    - PAID: {bill['name']} (Due: {bill['due_date'].strftime('%m-%d')}) - ${bill['amount']:.2f}. Remaining: ${paycheck_info['remaining_balance']:.2f}")
-                else:
-                    unassigned_carry_over_bills.append(bill) # Carry over if insufficient funds
-                    print(f"    - NOT PAID (Insufficient funds): {bill['name']} (Due: {bill['due_date'].strftime('%m-%d')}) - ${bill['amount']:.2f}. Remaining: ${paycheck_info['remaining_balance']:.2f}")
-        
-        if not paycheck_info['assigned_bills'] and not unassigned_carry_over_bills:
-            print("    No bills assigned or carried over for this paycheck period.")
-
-        paychecks.append(paycheck_info)
-        current_pay_date += timedelta(weeks=2)
+    for i in range(num_paydays):
+        paychecks_today = _paychecks_for_payday(pay_calendar, i, net_pay)
+        _pay_bills_on_payday(paychecks_today, unassigned_carry_over_bills, bills_due_by_payday[i])
+        if goal_allocator is not None:
+            _fund_goals(goal_allocator, paychecks_today, i)
+        paychecks.extend(paychecks_today)
 
     return paychecks
 
@@ -502,32 +810,232 @@ def display_paycheck_summary(final_pay_periods):
 
 
     for pp in final_pay_periods:
-        print(f"--- Paycheck Date: {pp['pay_date'].strftime('%m-%d-%Y')} ---")
-        print(f"  Net Pay: ${pp['net_pay']:.2f}")
-        print(f"  Initial Balance for Period: ${pp['initial_balance_for_period']:.2f}")
+        source_str = f" ({pp['source']})" if pp.get('source') else ""
+        print(f"--- Paycheck Date: {pp['pay_date'].strftime('%m-%d-%Y')}{source_str} ---")
+        print(f"  Net Pay: ${from_cents(pp['net_pay']):.2f}")
+        print(f"  Initial Balance for Period: ${from_cents(pp['initial_balance_for_period']):.2f}")
         print("  Assigned Bills:")
         if not pp['assigned_bills']:
             print("    None")
         for bill in pp['assigned_bills']:
-            print(f"    - {bill['name']:<20} (Due: {bill['due_date'].strftime('%m-%d-%Y')}) - ${bill['amount']:.2f}")
-        print(f"  **Remaining Balance: ${pp['remaining_balance']:.2f}**")
+            print(f"    - {bill['name']:<20} (Due: {bill['due_date'].strftime('%m-%d-%Y')}) - ${from_cents(bill['amount']):.2f}")
+        for contribution in pp.get('goal_contributions', []):
+            print(f"  Saved for {contribution['name']}: ${from_cents(contribution['amount']):.2f}")
+        print(f"  **Remaining Balance: ${from_cents(pp['remaining_balance']):.2f}**")
         print("-" * 30 + "\n")
 
-def simulate_debt_progress(template_bills, final_pay_periods):
+def _month_index(d):
     """
-    Simulates the progress of debt payments and interest accrual over time.
-    Tracks balance reduction for each debt account.
-    
-    Args:
-        template_bills (list): Original list of template bills, including debt details.
-        final_pay_periods (list): List of pay periods with assigned bills.
+    Converts a date to a running month number so months can be compared and stepped with plain integers.
+    """
+    return d.year * 12 + (d.month - 1)
+
+def _month_start(month_index):
+    """
+    Converts a running month number back to the first day of that month.
+    """
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+def _debt_month_step(balance, monthly_interest_rate, fees, assigned_payment, minimum_payment):
+    """
+    Applies one month of fees, interest and payment to a debt balance.
 
     Returns:
-        dict: A dictionary where keys are debt names and values are lists of
-              monthly snapshots of debt balance, interest paid, etc.
+        tuple: (interest_accrued, payment_made, principal_paid, new_balance)
+    """
+    # Interest is typically calculated on the balance *before* the current month's payment.
+    interest_accrued = balance * monthly_interest_rate
+    balance_after_interest_and_fees = balance + interest_accrued + fees
+
+    # Ensure minimum payment is made if no other payment was assigned for this month
+    payment_made = assigned_payment
+    if payment_made < minimum_payment:
+        # If current balance is less than min payment, pay current balance
+        payment_made = min(minimum_payment, balance_after_interest_and_fees)
+
+    new_balance = balance_after_interest_and_fees - payment_made
+    if new_balance < 0:
+        new_balance = 0.0
+
+    # Calculate principal paid: total payments minus interest and fees for this month
+    principal_paid = payment_made - (interest_accrued + fees)
+    if principal_paid < 0:
+        principal_paid = 0.0
+
+    return interest_accrued, payment_made, principal_paid, new_balance
+
+def _balance_after_months(balance, monthly_interest_rate, fees, payment, months):
+    """
+    Closed-form balance after `months` months of constant fees and a constant payment,
+    assuming the debt is not paid off during that stretch.
+    """
+    if monthly_interest_rate == 0:
+        return balance + months * (fees - payment)
+    growth = (1 + monthly_interest_rate) ** months
+    fixed_point = (payment - fees) / monthly_interest_rate # Balance at which payments exactly cover interest and fees
+    return fixed_point + growth * (balance - fixed_point)
+
+def _months_until_payoff(balance, monthly_interest_rate, fees, payment, max_months):
+    """
+    Finds how many full months of a constant-payment stretch pass before the payoff month,
+    i.e. the first month in which the payment covers the whole balance plus interest and fees.
+    Returns max_months if the debt is not paid off within the stretch.
+    """
+    net_payment = payment - fees
+    if net_payment <= 0:
+        return max_months # Payment never gets ahead of the fees
+
+    growth = 1 + monthly_interest_rate
+    if monthly_interest_rate == 0:
+        estimate = math.ceil((balance + fees - payment) / net_payment)
+    else:
+        fixed_point = net_payment / monthly_interest_rate
+        if balance >= fixed_point:
+            return max_months # Negative (or zero) amortization, balance never shrinks
+        ratio = (fixed_point - net_payment / growth) / (fixed_point - balance)
+        estimate = math.ceil(math.log(ratio) / math.log(growth))
+    months = min(max(estimate, 0), max_months)
+
+    # The logarithm can land one month off because of float rounding, so nudge it onto the exact boundary
+    def pays_off(k):
+        return _balance_after_months(balance, monthly_interest_rate, fees, payment, k) * growth + fees <= payment
+    while months > 0 and pays_off(months - 1):
+        months -= 1
+    while months < max_months and not pays_off(months):
+        months += 1
+    return months
+
+def _simulate_debt_events(debt_data, payments_by_month, first_month, end_month, verbose=True):
+    """
+    Simulates a single debt from first_month up to (but not including) end_month, jumping
+    between the months where something changes: an assigned payment, an annual fee, a rate
+    change or the payoff. Months in between are advanced in closed form and stored as one
+    history segment.
+    """
+    monthly_fee = debt_data['monthly_fee']
+    minimum_payment = debt_data['minimum_payment']
+
+    # Months that cannot be part of a constant stretch
+    event_months = set(m for m in payments_by_month if first_month <= m < end_month)
+    if debt_data['annual_fee'] > 0 and debt_data['annual_fee_month']:
+        fee_month_offset = debt_data['annual_fee_month'] - 1
+        first_fee_month = first_month + (fee_month_offset - first_month % 12) % 12
+        event_months.update(range(first_fee_month, end_month, 12))
+    # A rate change ends a stretch, so every stretch has a single rate
+    event_months.update(rate_change_months(debt_data['rate_schedule'], first_month, end_month))
+    event_months = sorted(event_months)
+
+    log = print if verbose else _quiet
+    balance = debt_data['current_balance']
+    current_month = first_month
+    event_pos = 0
+
+    while current_month < end_month and balance > 0:
+        while event_pos < len(event_months) and event_months[event_pos] < current_month:
+            event_pos += 1
+        next_event_month = event_months[event_pos] if event_pos < len(event_months) else end_month
+        monthly_interest_rate = _monthly_interest_rate(debt_data, current_month)
+
+        if next_event_month == current_month:
+            # --- Event month: assigned payment and/or annual fee ---
+            fees = monthly_fee
+            if debt_data['annual_fee'] > 0 and debt_data['annual_fee_month'] == current_month % 12 + 1:
+                fees += debt_data['annual_fee']
+            assigned_payment = payments_by_month.get(current_month, 0.0)
+            interest, payment, _, new_balance = _debt_month_step(balance, monthly_interest_rate, fees, assigned_payment, minimum_payment)
+
+            fee_print_str = f" (+Fees: ${fees:.2f})" if fees > 0 else ""
+            log(f"  - {debt_data['name']} {_month_start(current_month).strftime('%Y-%m')}: Beg Bal: ${balance:.2f}{fee_print_str}"
+                  f", Interest: ${interest:.2f}, Paid: ${payment:.2f}, End Bal: ${new_balance:.2f}")
+            months = 1
+        else:
+            # --- Constant stretch: only the monthly fee and the minimum payment ---
+            assigned_payment = 0.0
+            fees = monthly_fee
+            stretch = next_event_month - current_month
+            full_months = _months_until_payoff(balance, monthly_interest_rate, fees, minimum_payment, stretch)
+            if full_months < stretch:
+                months = full_months + 1 # Include the payoff month itself
+                new_balance = 0.0
+            else:
+                months = stretch
+                new_balance = _balance_after_months(balance, monthly_interest_rate, fees, minimum_payment, stretch)
+
+            months_str = _month_start(current_month).strftime('%Y-%m')
+            if months > 1:
+                months_str += f" to {_month_start(current_month + months - 1).strftime('%Y-%m')}"
+            log(f"  - {debt_data['name']} {months_str}: Beg Bal: ${balance:.2f}"
+                  f", Min Payments: ${minimum_payment:.2f} x {months}, End Bal: ${new_balance:.2f}")
+
+        # Store the stretch sparsely; expand_debt_history() rebuilds the monthly rows on export
+        debt_data['history_segments'].append({
+            'start_month': current_month,
+            'months': months,
+            'balance_start': balance,
+            'fees': fees,
+            'assigned_payment': assigned_payment,
+            'monthly_interest_rate': monthly_interest_rate
+        })
+
+        balance = new_balance
+        current_month += months
+
+    debt_data['current_balance'] = balance
+    if balance <= 0 and debt_data['history_segments']:
+        last_segment = debt_data['history_segments'][-1]
+        debt_data['payoff_date'] = _month_start(last_segment['start_month'] + last_segment['months'] - 1)
+
+def _debt_snapshot(month_date, balance, fees, payment, interest, principal, new_balance):
+    """
+    Builds one monthly debt history row with amounts in integer cents.
+    """
+    return {
+        'date': month_date,
+        'balance_start_of_month': to_cents(balance), # Balance before any actions this month
+        'total_fees_charged': to_cents(fees),
+        'payments_made': to_cents(payment),
+        'interest_accrued': to_cents(interest),
+        'principal_paid': to_cents(principal),
+        'balance_end_of_month': to_cents(new_balance)
+    }
+
+DEBT_SNAPSHOT_MONEY_FIELDS = ['balance_start_of_month', 'total_fees_charged', 'payments_made', 'interest_accrued', 'principal_paid', 'balance_end_of_month']
+
+def snapshot_in_dollars(snapshot):
+    """
+    Returns a copy of a debt history row with its amounts converted to dollars, for output.
+    """
+    return {key: from_cents(value) if key in DEBT_SNAPSHOT_MONEY_FIELDS else value for key, value in snapshot.items()}
+
+def _expand_history_segment(debt_data, segment):
+    """
+    Yields the monthly history rows covered by one sparse history segment.
+    """
+    monthly_interest_rate = segment['monthly_interest_rate']
+    balance = segment['balance_start']
+    for offset in range(segment['months']):
+        interest, payment, principal, new_balance = _debt_month_step(
+            balance, monthly_interest_rate, segment['fees'], segment['assigned_payment'], debt_data['minimum_payment']
+        )
+        yield _debt_snapshot(_month_start(segment['start_month'] + offset), balance, segment['fees'], payment, interest, principal, new_balance)
+        balance = new_balance
+
+def expand_debt_history(debt_data):
+    """
+    Expands a debt's sparse history segments into monthly snapshots of
+    balance, interest paid, etc. Yields one dict per simulated month.
+    Debts read back from a plan snapshot carry their monthly rows in 'history' instead.
+    """
+    if 'history' in debt_data:
+        yield from debt_data['history']
+        return
+    for segment in debt_data['history_segments']:
+        yield from _expand_history_segment(debt_data, segment)
+
+def _init_live_debt_accounts(template_bills):
+    """
+    Creates the live debt accounts to simulate from debt templates with a balance.
     """
-    
-    # Initialize live debt accounts from templates
     live_debt_accounts = {}
     for bill_template in template_bills:
         if bill_template.get('is_debt', False) and bill_template.get('initial_balance') is not None and bill_template['initial_balance'] > 0:
@@ -538,11 +1046,72 @@ def simulate_debt_progress(template_bills, final_pay_periods):
                 'minimum_payment': float(bill_template['minimum_payment']),
                 'interest_rate': float(bill_template['interest_rate']), # Annual rate (e.g., 0.24)
                 'credit_limit': float(bill_template['credit_limit']),
-                'monthly_fee': float(bill_template.get('monthly_fee', 0.0)),
-                'annual_fee': float(bill_template.get('annual_fee', 0.0)),
+                'monthly_fee': float(bill_template.get('monthly_fee') or 0.0),
+                'annual_fee': float(bill_template.get('annual_fee') or 0.0),
                 'annual_fee_month': bill_template.get('annual_fee_month'),
-                'history': [] # To store monthly snapshots of balance, interest, etc.
+                'rate_schedule': parse_rate_schedule(bill_template.get('rate_schedule')), # [(month, annual rate)]
+                'payoff_date': None,
+                'history_segments': [] # Sparse monthly history, expanded by expand_debt_history()
             }
+    return live_debt_accounts
+
+def _monthly_interest_rate(debt_data, month):
+    """
+    Returns a live debt's monthly interest rate in a month, following its rate schedule.
+    """
+    return annual_rate_for_month(debt_data['rate_schedule'], debt_data['interest_rate'], month) / 12.0
+
+def _debt_simulation_window(first_pay_date, last_pay_date, max_months=120):
+    """
+    Determines the months to simulate debts over, as (first_month, end_month) month indexes
+    with end_month exclusive. The window is capped at max_months (None for no cap).
+    """
+    # Set the simulation start (month of the first payment, but never before the current month)
+    first_month = max(_month_index(first_pay_date), _month_index(date.today()))
+
+    # Simulate until the end of the month of the last payment, extended by another year to see payoff
+    end_sim_date = _month_start(_month_index(last_pay_date) + 1) - timedelta(days=1) + timedelta(days=365)
+    end_month = _month_index(end_sim_date) + 1
+    if max_months is not None:
+        end_month = min(end_month, first_month + max_months) # Cap at 10 years by default
+    return first_month, end_month
+
+def _print_debt_summary(live_debt_accounts, end_month):
+    """
+    Prints the final state of each simulated debt.
+    """
+    print(f"\n--- Debt Simulation Summary (through {_month_start(end_month - 1).strftime('%Y-%m')}) ---")
+    all_paid_off_final = True
+    for debt_name, debt_data in live_debt_accounts.items():
+        if debt_data['current_balance'] > 0:
+            print(f"  - {debt_name}: Remaining Balance: ${debt_data['current_balance']:.2f}")
+            all_paid_off_final = False
+        else:
+            print(f"  - {debt_name}: Paid off in {debt_data['payoff_date'].strftime('%Y-%m')}!")
+    
+    if all_paid_off_final:
+        print("All debts successfully paid off within the planning period!")
+    else:
+        print("Some debts remain outstanding at the end of the planning period.")
+
+def simulate_debt_progress(template_bills, final_pay_periods):
+    """
+    Simulates the progress of debt payments and interest accrual over time.
+    Tracks balance reduction for each debt account.
+
+    Only months where something changes (an assigned payment, an annual fee or a payoff)
+    are stepped individually; stretches of minimum payments in between are advanced in
+    closed form. History is kept as sparse segments, see expand_debt_history().
+    
+    Args:
+        template_bills (list): Original list of template bills, including debt details.
+        final_pay_periods (list): List of pay periods with assigned bills.
+
+    Returns:
+        dict: A dictionary where keys are debt names and values are the live debt
+              accounts, each with its 'history_segments' and final 'current_balance'.
+    """
+    live_debt_accounts = _init_live_debt_accounts(template_bills)
     
     if not live_debt_accounts:
         print("\nNo active debt accounts with a balance to simulate.")
@@ -550,184 +1119,243 @@ def simulate_debt_progress(template_bills, final_pay_periods):
 
     print("\n--- Simulating Debt Progress ---")
 
-    # Group payments by debt and by month for easier processing
-    # Key: (year, month), Value: { debt_name: total_paid_this_month }
-    payments_by_month_and_debt = {} 
-    
-    # Determine the earliest and latest payment month based on assigned bills
-    # If no payments, use today's month as min and 6 months from now as max
-    min_year, min_month = date.today().year, date.today().month
-    max_year, max_month = (date.today() + timedelta(days=180)).year, (date.today() + timedelta(days=180)).month
+    # Group assigned payments by debt and by month index
+    # Key: debt_name, Value: { month_index: total_paid_this_month }
+    payments_by_debt_and_month = {debt_name: {} for debt_name in live_debt_accounts}
 
+    # If no payments, simulate from today's month to 6 months from now
+    first_pay_date, last_pay_date = date.today(), date.today() + timedelta(days=180)
 
     if final_pay_periods:
         first_pay_date = final_pay_periods[0]['pay_date']
         last_pay_date = final_pay_periods[-1]['pay_date']
-        
-        min_year, min_month = first_pay_date.year, first_pay_date.month
-        max_year, max_month = last_pay_date.year, last_pay_date.month
 
         for pp in final_pay_periods:
-            pay_date = pp['pay_date']
-            payment_month_key = (pay_date.year, pay_date.month)
-            
+            payment_month = _month_index(pp['pay_date'])
             for assigned_bill in pp['assigned_bills']:
                 if assigned_bill.get('is_debt', False) and assigned_bill['name'] in live_debt_accounts:
-                    debt_name = assigned_bill['name']
-                    
-                    payments_by_month_and_debt.setdefault(payment_month_key, {}).setdefault(debt_name, 0.0)
-                    payments_by_month_and_debt[payment_month_key][debt_name] += assigned_bill['amount']
-    
-    
-    # Set the simulation start date (beginning of the month of the first payment or today)
-    start_sim_date = date(min_year, min_month, 1)
-    if start_sim_date < date.today().replace(day=1):
-        start_sim_date = date.today().replace(day=1)
-
-    # Set the simulation end date (end of the month of the last payment, or later to see payoff)
-    end_sim_date_raw = date(max_year, max_month, 1)
-    if end_sim_date_raw.month == 12:
-        end_sim_date = end_sim_date_raw.replace(year=end_sim_date_raw.year + 1, month=1, day=1) - timedelta(days=1)
-    else:
-        end_sim_date = end_sim_date_raw.replace(month=end_sim_date_raw.month + 1, day=1) - timedelta(days=1)
-    
-    # Extend simulation for a few more months just in case debts take longer to pay off
-    end_sim_date += timedelta(days=365) # Extend by another year for simulation
+                    debt_payments = payments_by_debt_and_month[assigned_bill['name']]
+                    debt_payments[payment_month] = debt_payments.get(payment_month, 0) + assigned_bill['amount'] # Cents
 
-    current_sim_date = start_sim_date
+    first_month, end_month = _debt_simulation_window(first_pay_date, last_pay_date)
 
-    # Iterate month by month strictly until the determined end date
-    simulation_months_counter = 0
-    while current_sim_date <= end_sim_date and simulation_months_counter < 120: # Cap at 10 years to prevent infinite loops
-        year = current_sim_date.year
-        month = current_sim_date.month
+    # Debts do not interact, so each one is simulated on its own event timeline
+    for debt_name, debt_data in live_debt_accounts.items():
+        payments_by_month = {month: from_cents(cents) for month, cents in payments_by_debt_and_month[debt_name].items()}
+        _simulate_debt_events(debt_data, payments_by_month, first_month, end_month)
 
-        print(f"\n--- Month: {year}-{month:02d} ---")
-        
-        # Check if all debts are paid off at the beginning of the month
-        all_debts_paid_this_month = True
-        for debt_name, debt_data in live_debt_accounts.items():
-            if debt_data['current_balance'] > 0:
-                all_debts_paid_this_month = False
-                break
-        if all_debts_paid_this_month:
-            print("All active debts paid off!")
-            break
+    _print_debt_summary(live_debt_accounts, end_month)
 
+    return live_debt_accounts
 
-        for debt_name, debt_data in live_debt_accounts.items():
-            current_balance = debt_data['current_balance']
-            
-            if current_balance <= 0:
-                if not debt_data['history'] or debt_data['history'][-1]['date'].month != current_sim_date.month or debt_data['history'][-1]['date'].year != current_sim_date.year:
-                    debt_data['history'].append({
-                        'date': current_sim_date,
-                        'balance_start_of_month': 0.0,
-                        'total_fees_charged': 0.0, 
-                        'payments_made': 0.0,
-                        'interest_accrued': 0.0,
-                        'principal_paid': 0.0,
-                        'balance_end_of_month': 0.0
-                    })
-                # Only print "Paid off!" once per debt
-                if not debt_data['history'] or debt_data['history'][-1]['balance_end_of_month'] > 0:
-                    print(f"  - {debt_name}: Paid off! (Balance: $0.00)")
-                continue
+# --- Plan Engine ---
 
-            # --- APPLY MONTHLY AND ANNUAL FEES ---
-            total_fees_this_month = 0.0
-            
-            # Apply monthly fee
-            monthly_fee = debt_data.get('monthly_fee', 0.0)
-            if monthly_fee > 0:
-                total_fees_this_month += monthly_fee
-                # current_balance += monthly_fee # Apply after interest calc, or account for interest on fee if immediate
-                # print(f"  - {debt_name}: Monthly Fee of ${monthly_fee:.2f} charged.") # Removed for cleaner output
-            
-            # Apply annual fee if applicable for this month
-            annual_fee = debt_data.get('annual_fee', 0.0)
-            annual_fee_month = debt_data.get('annual_fee_month')
-            if annual_fee > 0 and annual_fee_month == month:
-                total_fees_this_month += annual_fee
-                # current_balance += annual_fee # Apply after interest calc, or account for interest on fee if immediate
-                # print(f"  - {debt_name}: Annual Fee of ${annual_fee:.2f} charged.") # Removed for cleaner output
-            # --- END FEE LOGIC ---
-
-            annual_interest_rate = debt_data['interest_rate']
-            monthly_interest_rate = annual_interest_rate / 12.0
-
-            # Interest is typically calculated on the balance *before* the current month's payment.
-            # Fees can also accrue interest if added before interest calculation.
-            interest_accrued_this_month = current_balance * monthly_interest_rate
-            current_balance_after_interest_and_fees = current_balance + interest_accrued_this_month + total_fees_this_month # Corrected variable name
-            
-            payments_this_month = payments_by_month_and_debt.get((year, month), {}).get(debt_name, 0.0)
-            
-            # Ensure minimum payment is made if no other payment was assigned for this month
-            if payments_this_month < debt_data['minimum_payment']:
-                # Only if the current balance is greater than 0, otherwise no need for min payment
-                if current_balance > 0: 
-                    # If current balance is less than min payment, pay current balance
-                    payments_this_month = min(debt_data['minimum_payment'], current_balance_after_interest_and_fees)
+# Plans with more paychecks than this (about five years bi-weekly) are offered rolling-horizon mode
+ROLLING_PLAN_THRESHOLD = 130
 
+# Event types for iter_plan_engine, listed in the order they are handled when they share a date
+EVENT_FEE_CHARGED = 0      # Monthly/annual fees for a debt's month that is being closed
+EVENT_INTEREST_POSTED = 1  # Closes a debt's month: interest, payments and the history snapshot
+EVENT_BILL_DUE = 2         # A bill instance becomes payable by the upcoming paycheck
+EVENT_PAYDAY = 3           # A paycheck arrives and pays carried-over and newly due bills
+EVENT_PAYMENT_APPLIED = 4  # An assigned debt payment is credited to its account for the month
 
-            new_balance = current_balance_after_interest_and_fees - payments_this_month
-            
-            if new_balance < 0:
-                new_balance = 0.0
-            
-            # Calculate principal paid: total payments minus interest and fees for this month
-            principal_paid_this_month = payments_this_month - (interest_accrued_this_month + total_fees_this_month)
-            if principal_paid_this_month < 0:
-                principal_paid_this_month = 0.0 
-            
+def iter_plan_engine(bill_templates, num_paychecks, net_pay, start_date, pay_calendar=None, max_debt_months=120, keep_history=True, verbose=True, due_date_cache=None, aggregators=(), goal_allocator=None):
+    """
+    Runs bill instance generation, paycheck assignment and debt simulation as a single
+    time-ordered pass over a priority queue of typed events (see the EVENT_* constants).
+    Paydays come from pay_calendar (a PayCalendar); without one, bi-weekly
+    paychecks of net_pay starting from start_date are assumed. Calendars built from
+    income streams pay each deposit as its own paycheck.
+
+    Nothing is accumulated; each result is yielded as soon as it is final:
+        ('bill', instance)                   when a bill instance is created
+        ('paycheck', paycheck_info)          once a paycheck has paid its bills
+        ('debt_month', debt_name, snapshot)  once a debt's month is posted
+        ('debts', live_debt_accounts)        at the end, with each debt's final state
+
+    Args:
+        max_debt_months (int): Cap on the debt simulation window (None for no cap).
+        keep_history (bool): Keep each debt's sparse 'history_segments'. Turn off for
+            very long plans where the monthly rows are consumed as they are yielded.
+        verbose (bool): Print progress as paychecks and debt months are processed.
+        due_date_cache (dict): Shared across runs to reuse bill due date expansions.
+        aggregators (iterable): Report builders (e.g. CategoryRollup, PaycheckChartData) whose
+            add_paycheck() is called with each paycheck as soon as it has paid its bills.
+        goal_allocator (GoalAllocator): Sets aside each paycheck's surplus for savings goals
+            before the paycheck is yielded. Must be built on the same pay calendar.
+    """
+    log = print if verbose else _quiet
+    if pay_calendar is None:
+        pay_calendar = PayCalendar.from_schedule('bi-weekly', start_date, num_paychecks)
+    num_paydays = min(num_paychecks, len(pay_calendar))
+    last_pay_date = pay_calendar[num_paydays - 1]
+    end_planning_date = pay_calendar.next_pay_date(num_paydays - 1) + timedelta(days=31)
+
+    events = []
+    sequence = itertools.count() # Tie-breaker so events on the same date keep scheduling order
+    def schedule(event_date, event_type, payload):
+        heapq.heappush(events, (event_date, event_type, next(sequence), payload))
+
+    # A bill is paid from the paycheck whose window (up to the next payday) covers its due date,
+    # so it is released on that payday. Bills past the last pay window are released on their
+    # due date just to record the instance.
+    def schedule_next_bill(template, due_dates):
+        due_date = next(due_dates, None)
+        if due_date is not None:
+            paycheck_index = pay_calendar.paying_index(due_date)
+            if paycheck_index is not None and paycheck_index < num_paydays:
+                schedule(pay_calendar[paycheck_index], EVENT_BILL_DUE, (template, due_date, due_dates, True))
+            else:
+                schedule(due_date, EVENT_BILL_DUE, (template, due_date, due_dates, False))
+
+    for template, due_dates in zip(bill_templates, _cached_due_dates_by_template(bill_templates, start_date, end_planning_date, due_date_cache)):
+        schedule_next_bill(template, due_dates)
+
+    schedule(pay_calendar[0], EVENT_PAYDAY, 0)
+
+    live_debt_accounts = _init_live_debt_accounts(bill_templates)
+    first_month, end_month = _debt_simulation_window(pay_calendar[0], last_pay_date, max_debt_months)
+    last_pay_month = _month_index(last_pay_date)
+    open_months = {} # debt_name -> {'month', 'fees', 'payments'} for the month being accumulated
+
+    def open_debt_month(debt_data, month):
+        open_months[debt_data['name']] = {'month': month, 'fees': 0.0, 'payments': 0} # Payments in cents
+        close_date = _month_start(month + 1)
+        if debt_data['monthly_fee'] > 0 or (debt_data['annual_fee'] > 0 and debt_data['annual_fee_month'] == month % 12 + 1):
+            schedule(close_date, EVENT_FEE_CHARGED, debt_data)
+        schedule(close_date, EVENT_INTEREST_POSTED, debt_data)
+
+    if live_debt_accounts:
+        log("\n--- Simulating Debt Progress Alongside Paychecks ---")
+        for debt_data in live_debt_accounts.values():
+            open_debt_month(debt_data, first_month)
+
+    bills_due_next_payday = []
+    unassigned_carry_over_bills = []
+
+    while events:
+        event_date, event_type, _, payload = heapq.heappop(events)
+
+        if event_type == EVENT_BILL_DUE:
+            template, due_date, due_dates, payable = payload
+            instance = _new_bill_instance(template, due_date)
+            if payable:
+                bills_due_next_payday.append(instance)
+            schedule_next_bill(template, due_dates)
+            yield ('bill', instance)
+
+        elif event_type == EVENT_PAYDAY:
+            paychecks_today = _paychecks_for_payday(pay_calendar, payload, net_pay)
+            paid_bills = _pay_bills_on_payday(paychecks_today, unassigned_carry_over_bills, bills_due_next_payday, verbose)
+            bills_due_next_payday = []
+            if goal_allocator is not None:
+                _fund_goals(goal_allocator, paychecks_today, payload, verbose)
+
+            for bill in paid_bills:
+                if bill.get('is_debt', False) and bill['name'] in live_debt_accounts:
+                    schedule(event_date, EVENT_PAYMENT_APPLIED, (live_debt_accounts[bill['name']], bill['amount']))
+            if payload + 1 < num_paydays:
+                schedule(pay_calendar[payload + 1], EVENT_PAYDAY, payload + 1)
+            for paycheck_info in paychecks_today:
+                for aggregator in aggregators:
+                    aggregator.add_paycheck(paycheck_info)
+                yield ('paycheck', paycheck_info)
+
+        elif event_type == EVENT_PAYMENT_APPLIED:
+            debt_data, amount = payload
+            open_month = open_months.get(debt_data['name'])
+            # Payments before the simulation start or after payoff don't affect the balance
+            if open_month is not None and open_month['month'] == _month_index(event_date):
+                open_month['payments'] += amount
+
+        elif event_type == EVENT_FEE_CHARGED:
+            debt_data = payload
+            open_month = open_months[debt_data['name']]
+            open_month['fees'] += debt_data['monthly_fee']
+            if debt_data['annual_fee'] > 0 and debt_data['annual_fee_month'] == open_month['month'] % 12 + 1:
+                open_month['fees'] += debt_data['annual_fee']
+
+        elif event_type == EVENT_INTEREST_POSTED:
+            debt_data = payload
+            open_month = open_months.pop(debt_data['name'])
+            month, fees, assigned_payment = open_month['month'], open_month['fees'], from_cents(open_month['payments'])
+            balance = debt_data['current_balance']
+            monthly_interest_rate = _monthly_interest_rate(debt_data, month)
+
+            interest, payment, principal, new_balance = _debt_month_step(
+                balance, monthly_interest_rate, fees, assigned_payment, debt_data['minimum_payment']
+            )
+            fee_print_str = f" (+Fees: ${fees:.2f})" if fees > 0 else ""
+            log(f"  - {debt_data['name']} {_month_start(month).strftime('%Y-%m')}: Beg Bal: ${balance:.2f}{fee_print_str}"
+                  f", Interest: ${interest:.2f}, Paid: ${payment:.2f}, End Bal: ${new_balance:.2f}")
+
+            # Extend the previous segment when this month continues a constant minimum-payment stretch
+            segments = debt_data['history_segments']
+            if (assigned_payment == 0 and segments and segments[-1]['assigned_payment'] == 0
+                    and segments[-1]['fees'] == fees and segments[-1]['monthly_interest_rate'] == monthly_interest_rate
+                    and segments[-1]['start_month'] + segments[-1]['months'] == month):
+                segments[-1]['months'] += 1
+            else:
+                segments.append({
+                    'start_month': month,
+                    'months': 1,
+                    'balance_start': balance,
+                    'fees': fees,
+                    'assigned_payment': assigned_payment,
+                    'monthly_interest_rate': monthly_interest_rate
+                })
             debt_data['current_balance'] = new_balance
+            if not keep_history:
+                del segments[:-1] # Only the segment that may still be extended
 
-            # Record snapshot
-            debt_data['history'].append({
-                'date': current_sim_date,
-                'balance_start_of_month': round(current_balance, 2), # Balance before any actions this month
-                'total_fees_charged': round(total_fees_this_month, 2), 
-                'payments_made': round(payments_this_month, 2),
-                'interest_accrued': round(interest_accrued_this_month, 2),
-                'principal_paid': round(principal_paid_this_month, 2),
-                'balance_end_of_month': round(new_balance, 2)
-            })
+            yield ('debt_month', debt_data['name'], _debt_snapshot(_month_start(month), balance, fees, payment, interest, principal, new_balance))
 
-            fee_print_str = ""
-            if total_fees_this_month > 0:
-                fee_print_str = f" (+Fees: ${total_fees_this_month:.2f})"
+            if new_balance <= 0:
+                debt_data['payoff_date'] = _month_start(month)
+            elif month + 1 < end_month:
+                if month + 1 <= last_pay_month:
+                    open_debt_month(debt_data, month + 1)
+                else:
+                    # No paychecks left to assign payments, so skip through the rest in closed form
+                    tail_start = len(segments)
+                    _simulate_debt_events(debt_data, {}, month + 1, end_month, verbose)
+                    for segment in segments[tail_start:]:
+                        for snapshot in _expand_history_segment(debt_data, segment):
+                            yield ('debt_month', debt_data['name'], snapshot)
+                    if not keep_history:
+                        del segments[:]
 
-            print(f"  - {debt_name}: Beg Bal: ${current_balance:.2f}{fee_print_str}"
-                  f", Interest: ${interest_accrued_this_month:.2f}, Paid: ${payments_this_month:.2f}, End Bal: ${new_balance:.2f}")
-            
-        # Move to the next month
-        simulation_months_counter += 1
-        if month == 12:
-            current_sim_date = current_sim_date.replace(year=year + 1, month=1)
-        else:
-            current_sim_date = current_sim_date.replace(month=month + 1)
-        
-        if all(d['current_balance'] <= 0 for d in live_debt_accounts.values()):
-            print("\nAll active debts paid off before end of simulation period!")
-            break
+    if live_debt_accounts and verbose:
+        _print_debt_summary(live_debt_accounts, end_month)
 
-    # Final reporting outside the loop
-    print(f"\n--- Debt Simulation Summary (as of {current_sim_date.strftime('%Y-%m-%d') if simulation_months_counter < 120 else 'End of 10-year cap'}) ---")
-    all_paid_off_final = True
-    for debt_name, debt_data in live_debt_accounts.items():
-        if debt_data['current_balance'] > 0:
-            print(f"  - {debt_name}: Remaining Balance: ${debt_data['current_balance']:.2f}")
-            all_paid_off_final = False
-        else:
-            print(f"  - {debt_name}: Paid off!")
-    
-    if all_paid_off_final:
-        print("All debts successfully paid off within the planning period!")
-    else:
-        print("Some debts remain outstanding at the end of the planning period.")
+    yield ('debts', live_debt_accounts)
 
-    return live_debt_accounts
+def run_plan_engine(bill_templates, num_paychecks, net_pay, start_date, pay_calendar=None, verbose=True, due_date_cache=None, aggregators=(), goal_allocator=None):
+    """
+    Runs the plan engine (see iter_plan_engine) and collects its results.
+
+    Returns:
+        tuple: (bill_instances, final_pay_periods, debt_progress_report), the same
+               outputs as generate_bill_instances, assign_bills_to_paychecks and
+               simulate_debt_progress.
+    """
+    bill_instances = []
+    paychecks = []
+    live_debt_accounts = {}
+    for result in iter_plan_engine(bill_templates, num_paychecks, net_pay, start_date, pay_calendar, verbose=verbose,
+                                   due_date_cache=due_date_cache, aggregators=aggregators, goal_allocator=goal_allocator):
+        if result[0] == 'bill':
+            bill_instances.append(result[1])
+        elif result[0] == 'paycheck':
+            paychecks.append(result[1])
+        elif result[0] == 'debts':
+            live_debt_accounts = result[1]
+
+    # Instances are created as they are released to paydays; report them by due date
+    bill_instances.sort(key=lambda x: x['due_date'])
+
+    return bill_instances, paychecks, live_debt_accounts
 
 def simulate_single_debt_scenario(initial_debt_data, payment_strategy='minimum', extra_payment=0.0, principal_only_payment_amount=0.0):
     """
@@ -746,7 +1374,6 @@ def simulate_single_debt_scenario(initial_debt_data, payment_strategy='minimum',
     current_balance = initial_debt_data['initial_balance']
     minimum_payment = initial_debt_data['minimum_payment']
     annual_interest_rate = initial_debt_data['interest_rate']
-    monthly_interest_rate = annual_interest_rate / 12.0
     monthly_fee = initial_debt_data.get('monthly_fee', 0.0)
     annual_fee = initial_debt_data.get('annual_fee', 0.0)
     annual_fee_month = initial_debt_data.get('annual_fee_month')
@@ -761,6 +1388,11 @@ def simulate_single_debt_scenario(initial_debt_data, payment_strategy='minimum',
     # Cap simulation at 30 years (360 months) to prevent infinite loops for very low payments
     max_months_cap = 360 
 
+    # Monthly interest rate for every month up to the cap, following the debt's rate schedule
+    monthly_interest_rates = monthly_rate_vector(
+        parse_rate_schedule(initial_debt_data.get('rate_schedule')), annual_interest_rate, _month_index(current_sim_date), max_months_cap
+    ).tolist()
+
     while current_balance > 0 and months_to_payoff < max_months_cap:
         months_to_payoff += 1
         year = current_sim_date.year
@@ -773,7 +1405,7 @@ def simulate_single_debt_scenario(initial_debt_data, payment_strategy='minimum',
         total_fees_paid += fees_this_month
 
         # Calculate interest on the current balance *before* any payment
-        interest_this_month = current_balance * monthly_interest_rate
+        interest_this_month = current_balance * monthly_interest_rates[months_to_payoff - 1]
         total_interest_paid += interest_this_month
         
         # Balance after interest and fees
@@ -842,6 +1474,48 @@ def simulate_single_debt_scenario(initial_debt_data, payment_strategy='minimum',
     return total_interest_paid, total_fees_paid, months_to_payoff, current_balance
 
 
+def compare_debt_strategies(debt_template, payment_strategy, amount):
+    """
+    Compares a debt's minimum-payment payoff against an optimized strategy without prompting;
+    the non-interactive counterpart of optimize_debt_payment().
+
+    Args:
+        debt_template (dict): The debt's template data.
+        payment_strategy (str): 'extra' (amount paid on top of the minimum every month) or
+            'principal_only_onetime' (a one-time principal-only payment of amount).
+        amount (float): The extra or one-time payment amount.
+
+    Returns:
+        dict: 'baseline' and 'optimized' results (total_interest, total_fees, months_to_payoff,
+              final_balance) plus the interest, fees and months saved.
+    """
+    if payment_strategy not in ('extra', 'principal_only_onetime'):
+        raise ValueError(f"Unknown payment strategy: {payment_strategy}. Expected 'extra' or 'principal_only_onetime'.")
+
+    def scenario_result(result):
+        total_interest, total_fees, months_to_payoff, final_balance = result
+        return {'total_interest': total_interest, 'total_fees': total_fees, 'months_to_payoff': months_to_payoff, 'final_balance': final_balance}
+
+    baseline = scenario_result(simulate_single_debt_scenario(debt_template.copy(), payment_strategy='minimum'))
+    if payment_strategy == 'extra':
+        optimized = scenario_result(simulate_single_debt_scenario(debt_template.copy(), payment_strategy='extra', extra_payment=amount))
+    else:
+        optimized = scenario_result(simulate_single_debt_scenario(debt_template.copy(), payment_strategy='principal_only_onetime', principal_only_payment_amount=amount))
+
+    months_saved = None
+    if baseline['months_to_payoff'] is not None and optimized['months_to_payoff'] is not None:
+        months_saved = baseline['months_to_payoff'] - optimized['months_to_payoff']
+    return {
+        'debt_name': debt_template['name'],
+        'payment_strategy': payment_strategy,
+        'amount': amount,
+        'baseline': baseline,
+        'optimized': optimized,
+        'interest_saved': baseline['total_interest'] - optimized['total_interest'],
+        'fees_saved': baseline['total_fees'] - optimized['total_fees'],
+        'months_saved': months_saved
+    }
+
 def optimize_debt_payment(bills):
     """
     Allows the user to select a debt and simulate different payment strategies
@@ -955,13 +1629,61 @@ def optimize_debt_payment(bills):
         print("\nThis optimization helps you see the benefit of paying more!")
 
 
-def generate_spreadsheet_output(final_pay_periods, debt_progress_report):
+# Blank columns in the exported sheets for recording actual payments (see reconcile.py)
+RECONCILE_PAYMENT_COLUMNS = ['Actual Paid', 'Paid On']
+RECONCILE_BALANCE_COLUMN = 'Actual Balance'
+
+def _write_category_rollup_sheets(workbook, category_rollup, currency_format, bold_format):
+    """
+    Writes one 'Spending by <Level>' sheet per rollup level: a row per period with the
+    amount spent in each category and the period total.
+    """
+    categories = category_rollup.categories()
+    for level in category_rollup.levels:
+        worksheet = workbook.add_worksheet(f"Spending by {level.title()}")
+        worksheet.write_row(0, 0, [level.title()] + categories + ['Total'], bold_format)
+        worksheet.set_column(0, 0, 12)
+        worksheet.set_column(1, len(categories) + 1, 15, currency_format)
+        for row_idx, (label, amounts, total) in enumerate(category_rollup.rows(level), start=1):
+            worksheet.write_row(row_idx, 0, [label] + amounts + [total])
+
+def _write_goal_progress_sheet(workbook, goal_progress, currency_format, bold_format):
+    """
+    Writes the 'Savings Goals' sheet from GoalAllocator.progress().
+    """
+    worksheet = workbook.add_worksheet('Savings Goals')
+    worksheet.write_row(0, 0, ['Goal', 'Priority', 'Target', 'Saved', 'Set Aside in Plan', 'Deadline', 'Completion Date', 'Status'], bold_format)
+    worksheet.set_column(0, 0, 20)
+    worksheet.set_column(2, 4, 15, currency_format)
+    worksheet.set_column(5, 7, 15)
+    for row_idx, goal in enumerate(goal_progress, start=1):
+        if goal['completion_date'] is None:
+            status = 'Already saved' if goal['saved'] >= goal['target'] else 'Not reachable'
+        else:
+            status = 'Projected' if goal['projected'] else 'Reached'
+        if goal['on_track'] is False:
+            status += ' (behind)'
+        worksheet.write_row(row_idx, 0, [
+            goal['name'], goal['priority'], goal['target'], goal['saved'], goal['contributed'],
+            goal['deadline'].strftime('%m-%d-%Y') if goal['deadline'] else '',
+            goal['completion_date'].strftime('%m-%d-%Y') if goal['completion_date'] else '',
+            status
+        ])
+
+def generate_spreadsheet_output(final_pay_periods, debt_progress_report, output_file=None, bill_templates=None, category_rollup=None, chart_data=None, goal_progress=None):
     """
     Generates an Excel spreadsheet with the financial plan and debt progress, including charts.
+    Writes to data/financial_plan.xlsx unless output_file is given. The Credit Utilization
+    sheet uses bill_templates, or the saved bills when none are given. The Spending by
+    category sheets use category_rollup and the paycheck chart uses chart_data (a
+    PaycheckChartData); both are built from final_pay_periods when not given. A Savings
+    Goals sheet is added when goal_progress (from GoalAllocator.progress()) is given.
     """
-    output_dir = 'data'
-    os.makedirs(output_dir, exist_ok=True)
-    output_file = os.path.join(output_dir, 'financial_plan.xlsx')
+    if output_file is None:
+        output_file = os.path.join('data', 'financial_plan.xlsx')
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    if bill_templates is None:
+        bill_templates = load_bills()
 
     with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
         workbook = writer.book
@@ -977,12 +1699,13 @@ def generate_spreadsheet_output(final_pay_periods, debt_progress_report):
         for pp in final_pay_periods:
             row = {
                 'Pay Date': pp['pay_date'].strftime('%m-%d-%Y'),
-                'Net Pay': pp['net_pay'],
-                'Initial Balance for Period': pp['initial_balance_for_period'],
-                'Remaining Balance': pp['remaining_balance']
+                'Income Source': pp.get('source') or 'Paycheck',
+                'Net Pay': from_cents(pp['net_pay']),
+                'Initial Balance for Period': from_cents(pp['initial_balance_for_period']),
+                'Remaining Balance': from_cents(pp['remaining_balance'])
             }
             assigned_bills_str = "; ".join([
-                f"{b['name']} (Due: {b['due_date'].strftime('%m-%d-%Y')}) - ${b['amount']:.2f}"
+                f"{b['name']} (Due: {b['due_date'].strftime('%m-%d-%Y')}) - ${from_cents(b['amount']):.2f}"
                 for b in pp['assigned_bills']
             ])
             row['Assigned Bills'] = assigned_bills_str
@@ -1001,14 +1724,22 @@ def generate_spreadsheet_output(final_pay_periods, debt_progress_report):
                         'Pay Date': pp['pay_date'], # Keep as datetime.date object for proper sorting
                         'Bill Name': bill['name'],
                         'Bill Due Date': bill['due_date'].strftime('%m-%d-%Y'),
-                        'Amount Assigned': bill['amount'],
+                        'Amount Assigned': from_cents(bill['amount']),
                         'Category': bill['category']
                     })
+            for contribution in pp.get('goal_contributions', []):
+                paycheck_details_data.append({
+                    'Pay Date': pp['pay_date'],
+                    'Bill Name': contribution['name'],
+                    'Bill Due Date': '',
+                    'Amount Assigned': from_cents(contribution['amount']),
+                    'Category': 'Savings Goal'
+                })
             paycheck_details_data.append({
                 'Pay Date': pp['pay_date'], # Keep as datetime.date object for proper sorting
                 'Bill Name': 'Remaining Balance',
                 'Bill Due Date': '',
-                'Amount Assigned': pp['remaining_balance'],
+                'Amount Assigned': from_cents(pp['remaining_balance']),
                 'Category': 'Savings/Buffer'
             })
         
@@ -1020,6 +1751,9 @@ def generate_spreadsheet_output(final_pay_periods, debt_progress_report):
         df_paycheck_details = df_paycheck_details.sort_values(by='Pay Date')
         # Now convert 'Pay Date' to string format for display in the Excel sheet
         df_paycheck_details['Pay Date'] = df_paycheck_details['Pay Date'].dt.strftime('%m-%d-%Y')
+        # Left blank for recording what was actually paid (read back by reconcile.py)
+        for column in RECONCILE_PAYMENT_COLUMNS:
+            df_paycheck_details[column] = None
 
 
         df_paycheck_details.to_excel(writer, sheet_name='Paycheck Details', index=False)
@@ -1028,7 +1762,8 @@ def generate_spreadsheet_output(final_pay_periods, debt_progress_report):
         if debt_progress_report:
             all_debt_history = []
             for debt_name, debt_data in debt_progress_report.items():
-                for month_snapshot in debt_data['history']:
+                for month_snapshot in expand_debt_history(debt_data):
+                    month_snapshot = snapshot_in_dollars(month_snapshot)
                     row = {
                         'Debt Name': debt_name,
                         'Date': month_snapshot['date'].strftime('%m-%d-%Y'),
@@ -1043,11 +1778,12 @@ def generate_spreadsheet_output(final_pay_periods, debt_progress_report):
             
             if all_debt_history:
                 df_debt_progress = pd.DataFrame(all_debt_history)
+                df_debt_progress[RECONCILE_BALANCE_COLUMN] = None
                 df_debt_progress.to_excel(writer, sheet_name='Debt Progress', index=False)
                 
                 worksheet_debt_progress = writer.sheets['Debt Progress']
                 
-                for col_idx in [2, 3, 4, 5, 6, 7]:
+                for col_idx in [2, 3, 4, 5, 6, 7, 8]:
                     worksheet_debt_progress.set_column(col_idx, col_idx, 15, currency_format)
             else:
                 print("No debt history to write to spreadsheet.")
@@ -1058,7 +1794,7 @@ def generate_spreadsheet_output(final_pay_periods, debt_progress_report):
         credit_utilization_data = []
         target_utilization_rate = 0.29
 
-        debt_templates_for_utilization = [b for b in load_bills() if b.get('is_debt', False) and b.get('initial_balance') is not None and b['initial_balance'] > 0]
+        debt_templates_for_utilization = [b for b in bill_templates if b.get('is_debt', False) and b.get('initial_balance') is not None and b['initial_balance'] > 0]
 
         for debt_template in debt_templates_for_utilization:
             debt_name = debt_template['name']
@@ -1131,39 +1867,25 @@ def generate_spreadsheet_output(final_pay_periods, debt_progress_report):
             print("No credit card debt data available to generate Credit Utilization sheet.")
 
 
-        # --- Sheet 5: Paycheck Overview Chart (using data from Paycheck Details) ---
-        # Re-create df_chart_data from df_paycheck_details, ensuring Pay Date is used for sorting
-        df_chart_data_pre_pivot = pd.DataFrame(paycheck_details_data) # Use the original data with datetime.date objects
-        
-        # Explicitly convert 'Pay Date' to datetime objects to ensure .dt accessor works
-        df_chart_data_pre_pivot['Pay Date'] = pd.to_datetime(df_chart_data_pre_pivot['Pay Date'])
-        
-        df_chart_data = df_chart_data_pre_pivot.pivot_table(
-            index='Pay Date',
-            columns='Bill Name',
-            values='Amount Assigned',
-            aggfunc='sum'
-        ).fillna(0)
-        
-        # Now convert the index (Pay Date) to string format for display in the Excel sheet
-        df_chart_data.index = df_chart_data.index.strftime('%m-%d-%Y')
+        # --- Sheet 5: Paycheck Overview Chart ---
+        # Written straight from the dense per-paycheck series; small bills are bucketed into 'Other'
+        if chart_data is None:
+            chart_data = PaycheckChartData.from_paychecks(final_pay_periods)
+        chart_columns, chart_rows = chart_data.series()
 
-        bill_columns = [col for col in df_chart_data.columns if col != 'Remaining Balance']
-        ordered_columns = bill_columns + ['Remaining Balance']
-        df_chart_data = df_chart_data[ordered_columns]
-
-        df_chart_data.to_excel(writer, sheet_name='Chart Data', index=True)
-
-        worksheet_chart_data = writer.sheets['Chart Data']
+        worksheet_chart_data = workbook.add_worksheet('Chart Data')
+        worksheet_chart_data.write_row(0, 0, ['Pay Date'] + chart_columns, bold_format)
+        for row_idx, chart_row in enumerate(chart_rows, start=1):
+            worksheet_chart_data.write_row(row_idx, 0, [chart_row[0].strftime('%m-%d-%Y')] + chart_row[1:])
 
         chart = workbook.add_chart({'type': 'column', 'subtype': 'stacked'})
 
-        num_paychecks_in_chart_data = len(df_chart_data)
+        num_paychecks_in_chart_data = len(chart_rows)
         
         chart.set_x_axis({'name': 'Paycheck Date'})
         chart.set_y_axis({'name': 'Amount ($)', 'num_format': '$#,##0'})
 
-        for i, col_name in enumerate(df_chart_data.columns):
+        for i in range(len(chart_columns)):
             chart.add_series({
                 'name':       ['Chart Data', 0, i + 1],
                 'categories': ['Chart Data', 1, 0, num_paychecks_in_chart_data, 0],
@@ -1181,6 +1903,137 @@ def generate_spreadsheet_output(final_pay_periods, debt_progress_report):
         chart_sheet = workbook.add_worksheet('Paycheck Chart')
         chart_sheet.insert_chart('A1', chart)
 
+        # --- Sheets 6+: Spending by Category per Paycheck, Month, Quarter and Year ---
+        if category_rollup is None:
+            category_rollup = CategoryRollup.from_paychecks(final_pay_periods)
+        _write_category_rollup_sheets(workbook, category_rollup, currency_format, bold_format)
+
+        if goal_progress:
+            _write_goal_progress_sheet(workbook, goal_progress, currency_format, bold_format)
+
+    print(f"\nSpreadsheet generated successfully at: {output_file}")
+
+
+def generate_rolling_spreadsheet_output(plan_events, bill_templates, output_file=None, window_paychecks=26, goal_allocator=None):
+    """
+    Writes a plan streamed from iter_plan_engine() to the spreadsheet as it is computed.
+    Paychecks are collected one window (window_paychecks paychecks) at a time and flushed
+    as soon as the window is finished; debt months are written as they are posted.
+    The workbook uses XlsxWriter's constant_memory mode, so memory stays flat for
+    mortgage-length plans. Sheets that need the whole plan at once (Credit Utilization)
+    are left out; Chart Data uses one column per bill template name. Category spending
+    totals are rolled up as paychecks stream past and written as the last sheets.
+    Pass the goal_allocator funding plan_events to add goal columns and a Savings Goals sheet.
+    """
+    if output_file is None:
+        output_file = os.path.join('data', 'financial_plan.xlsx')
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+
+    workbook = xlsxwriter.Workbook(output_file, {'constant_memory': True})
+    currency_format = workbook.add_format({'num_format': '$#,##0.00'})
+    bold_format = workbook.add_format({'bold': True})
+
+    summary_sheet = workbook.add_worksheet('Paycheck Summary')
+    details_sheet = workbook.add_worksheet('Paycheck Details')
+    debt_sheet = workbook.add_worksheet('Debt Progress')
+    chart_data_sheet = workbook.add_worksheet('Chart Data')
+
+    summary_sheet.write_row(0, 0, ['Pay Date', 'Income Source', 'Net Pay', 'Initial Balance for Period', 'Remaining Balance', 'Assigned Bills'], bold_format)
+    details_sheet.write_row(0, 0, ['Pay Date', 'Bill Name', 'Bill Due Date', 'Amount Assigned', 'Category'] + RECONCILE_PAYMENT_COLUMNS, bold_format)
+    debt_sheet.write_row(0, 0, ['Debt Name', 'Date', 'Balance Start of Month', 'Total Fees Charged', 'Payments Made',
+                                'Interest Accrued', 'Principal Paid', 'Balance End of Month', RECONCILE_BALANCE_COLUMN], bold_format)
+    summary_sheet.set_column(2, 4, 15, currency_format)
+    details_sheet.set_column(3, 3, 15, currency_format)
+    details_sheet.set_column(5, 5, 15, currency_format)
+    debt_sheet.set_column(2, 8, 15, currency_format)
+
+    # Chart columns are known up front from the templates, so chart rows can be streamed too
+    goal_names = [goal['name'] for goal in goal_allocator.goals] if goal_allocator is not None else []
+    chart_columns = list(dict.fromkeys([template['name'] for template in bill_templates] + goal_names)) + ['Remaining Balance']
+    chart_column_index = {name: i for i, name in enumerate(chart_columns)}
+    chart_data_sheet.write_row(0, 0, ['Pay Date'] + chart_columns, bold_format)
+
+    rows = {'summary': 1, 'details': 1, 'debt': 1}
+    category_rollup = CategoryRollup(['month', 'quarter', 'year']) # Per-paycheck rows are already in Chart Data
+    window = []
+    totals = {'paychecks': 0, 'bills_paid': 0}
+
+    def flush_window():
+        for pp in window:
+            pay_date_str = pp['pay_date'].strftime('%m-%d-%Y')
+            assigned_bills_str = "; ".join(
+                f"{b['name']} (Due: {b['due_date'].strftime('%m-%d-%Y')}) - ${from_cents(b['amount']):.2f}" for b in pp['assigned_bills']
+            )
+            summary_sheet.write_row(rows['summary'], 0, [pay_date_str, pp.get('source') or 'Paycheck', from_cents(pp['net_pay']),
+                                                         from_cents(pp['initial_balance_for_period']), from_cents(pp['remaining_balance']), assigned_bills_str])
+            chart_row = [0] * len(chart_columns) # Cents
+            for bill in pp['assigned_bills']:
+                details_sheet.write_row(rows['details'], 0, [pay_date_str, bill['name'], bill['due_date'].strftime('%m-%d-%Y'), from_cents(bill['amount']), bill['category']])
+                rows['details'] += 1
+                chart_row[chart_column_index[bill['name']]] += bill['amount']
+            for contribution in pp.get('goal_contributions', []):
+                details_sheet.write_row(rows['details'], 0, [pay_date_str, contribution['name'], '', from_cents(contribution['amount']), 'Savings Goal'])
+                rows['details'] += 1
+                chart_row[chart_column_index[contribution['name']]] += contribution['amount']
+            details_sheet.write_row(rows['details'], 0, [pay_date_str, 'Remaining Balance', '', from_cents(pp['remaining_balance']), 'Savings/Buffer'])
+            rows['details'] += 1
+            chart_row[-1] = pp['remaining_balance']
+            chart_data_sheet.write_row(rows['summary'], 0, [pay_date_str] + [from_cents(cents) for cents in chart_row])
+            rows['summary'] += 1
+
+        print(f"  Wrote paychecks {window[0]['pay_date'].strftime('%m-%d-%Y')} to {window[-1]['pay_date'].strftime('%m-%d-%Y')}: "
+              f"{sum(len(pp['assigned_bills']) for pp in window)} bills paid, lowest remaining balance ${from_cents(min(pp['remaining_balance'] for pp in window)):.2f}")
+        window.clear()
+
+    print("\n--- Rolling-Horizon Plan ---")
+    live_debt_accounts = {}
+    for result in plan_events:
+        if result[0] == 'paycheck':
+            window.append(result[1])
+            category_rollup.add_paycheck(result[1])
+            totals['paychecks'] += 1
+            totals['bills_paid'] += len(result[1]['assigned_bills'])
+            if len(window) >= window_paychecks:
+                flush_window()
+        elif result[0] == 'debt_month':
+            _, debt_name, snapshot = result
+            debt_sheet.write_row(rows['debt'], 0, [debt_name, snapshot['date'].strftime('%m-%d-%Y')] +
+                                 [from_cents(snapshot[key]) for key in DEBT_SNAPSHOT_MONEY_FIELDS])
+            rows['debt'] += 1
+        elif result[0] == 'debts':
+            live_debt_accounts = result[1]
+    if window:
+        flush_window()
+
+    num_rows = rows['summary'] - 1
+    if num_rows > 0:
+        chart = workbook.add_chart({'type': 'column', 'subtype': 'stacked'})
+        chart.set_x_axis({'name': 'Paycheck Date'})
+        chart.set_y_axis({'name': 'Amount ($)', 'num_format': '$#,##0'})
+        for i in range(len(chart_columns)):
+            chart.add_series({
+                'name':       ['Chart Data', 0, i + 1],
+                'categories': ['Chart Data', 1, 0, num_rows, 0],
+                'values':     ['Chart Data', 1, i + 1, num_rows, i + 1],
+            })
+        chart.set_title({'name': 'Paycheck Expense Breakdown'})
+        chart.set_legend({'position': 'bottom'})
+        chart_sheet = workbook.add_worksheet('Paycheck Chart')
+        chart_sheet.insert_chart('A1', chart)
+
+    _write_category_rollup_sheets(workbook, category_rollup, currency_format, bold_format)
+    if goal_allocator is not None and goal_allocator.goals:
+        _write_goal_progress_sheet(workbook, goal_allocator.progress(), currency_format, bold_format)
+    workbook.close()
+
+    print(f"\nPlanned {totals['paychecks']} paychecks paying {totals['bills_paid']} bills.")
+    for debt_name, debt_data in live_debt_accounts.items():
+        if debt_data['current_balance'] > 0:
+            print(f"  - {debt_name}: Remaining Balance: ${debt_data['current_balance']:.2f}")
+        else:
+            print(f"  - {debt_name}: Paid off in {debt_data['payoff_date'].strftime('%Y-%m')}!")
+    if goal_allocator is not None:
+        print_goal_progress(goal_allocator.progress())
     print(f"\nSpreadsheet generated successfully at: {output_file}")
 
 
@@ -1190,6 +2043,8 @@ def main_menu():
     Allows user to manage bills, run simulations, and generate reports.
     """
     bills = load_bills() # Load existing bill templates
+    bill_index = BillIndex(bills) # Finds bills by name, category, due day, debt flag and amount
+    export_pipeline = ExportPipeline() # Spreadsheets are written in the background while you keep working
 
     while True:
         print("\n--- MonteBuster Main Menu ---")
@@ -1201,9 +2056,14 @@ def main_menu():
 
         choice = get_user_input("Enter your choice: ").strip()
 
+        try:
+            export_pipeline.raise_failures() # Report a background spreadsheet write that failed
+        except ExportError as e:
+            print(f"Error writing spreadsheet: {e}")
+
         if choice == '1':
             new_bill = add_bill()
-            bills.append(new_bill)
+            bill_index.add(new_bill)
             save_bills(bills)
             print(f"Bill '{new_bill['name']}' added successfully.")
         elif choice == '2':
@@ -1212,13 +2072,16 @@ def main_menu():
                 print("\n--- View/Edit Bills Menu ---")
                 print("1. View all bills")
                 print("2. Edit a bill")
+                print("3. Search bills")
                 print("0. Back to Main Menu")
                 edit_choice = get_user_input("Enter your choice: ").strip()
 
                 if edit_choice == '1':
                     view_bills(bills)
                 elif edit_choice == '2':
-                    edit_bill(bills)
+                    edit_bill(bills, bill_index)
+                elif edit_choice == '3':
+                    search_bills(bill_index)
                 elif edit_choice == '0':
                     break # Exit sub-menu
                 else:
@@ -1250,24 +2113,48 @@ def main_menu():
                 continue
 
             start_date_input = get_user_date_input("Enter the date of your first paycheck (YYYY-MM-DD or MM-DD-YYYY): ") # Updated prompt here
+            pay_calendar = get_pay_calendar_input(start_date_input, num_paychecks, net_pay)
+            # Plans start at the calendar's first payday, which a weekend shift, a pay date list
+            # or another income stream can move before the date entered
+            plan_start = pay_calendar[0]
+            goals = load_goals() # Surplus goes to the savings goals in data/goals.json, if any
+            goal_allocator = GoalAllocator(goals, pay_calendar) if goals else None
+
+            # Long plans (several years of paychecks) can be streamed window by window with flat memory
+            if num_paychecks > ROLLING_PLAN_THRESHOLD:
+                rolling_choice = get_user_input("This is a long plan. Stream it in rolling windows (flat memory, no per-paycheck console output)? (yes/no) [yes]: ").strip().lower()
+                if rolling_choice in ('', 'yes'):
+                    plan_events = iter_plan_engine(bills, num_paychecks, net_pay, plan_start, pay_calendar,
+                                                   max_debt_months=None, keep_history=False, verbose=False, goal_allocator=goal_allocator)
+                    generate_rolling_spreadsheet_output(plan_events, bills, goal_allocator=goal_allocator)
+                    continue
 
-            simulation_end_date = start_date_input + timedelta(weeks=2 * num_paychecks) + timedelta(days=31)
-            bill_instances = generate_bill_instances(bills, start_date_input, simulation_end_date)
-            
-            debt_templates = [b for b in bills if b.get('is_debt', False)]
-
-            final_pay_periods = assign_bills_to_paychecks(bill_instances, num_paychecks, net_pay, start_date_input)
+            # Instances, paycheck assignment and debt progress all come out of one event-ordered pass,
+            # which also rolls up category spending and builds the chart data as bills are paid
+            category_rollup, chart_data = CategoryRollup(), PaycheckChartData()
+            bill_instances, final_pay_periods, debt_progress_report = run_plan_engine(bills, num_paychecks, net_pay, plan_start, pay_calendar,
+                                                                                     goal_allocator=goal_allocator, aggregators=(category_rollup, chart_data))
             
             display_paycheck_summary(final_pay_periods)
-
-            debt_progress_report = simulate_debt_progress(debt_templates, final_pay_periods)
-
-            generate_spreadsheet_output(final_pay_periods, debt_progress_report)
+            print_ledger_summary(DailyLedger(final_pay_periods))
+            goal_progress = goal_allocator.progress() if goal_allocator is not None else None
+            if goal_progress:
+                print_goal_progress(goal_progress)
+
+            # Copy the templates so later edits don't change a workbook still being written
+            export_pipeline.submit(generate_spreadsheet_output, final_pay_periods, debt_progress_report,
+                                   bill_templates=[bill.copy() for bill in bills], category_rollup=category_rollup, chart_data=chart_data,
+                                   goal_progress=goal_progress, description='financial_plan.xlsx')
+            print("\nWriting spreadsheet in the background...")
         
         elif choice == '4': # New option for debt optimization
             optimize_debt_payment(bills)
 
         elif choice == '5': # Changed exit number
+            try:
+                export_pipeline.close() # Finish writing any pending spreadsheet
+            except ExportError as e:
+                print(f"Error writing spreadsheet: {e}")
             print("Exiting MonteBuster. Goodbye!")
             break
         else:
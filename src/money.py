@@ -0,0 +1,39 @@
+import math
+
+import numpy as np
+
+# --- Fixed-Point Money ---
+#
+# Plan results (bill instances, paychecks and debt history rows) hold money as integer
+# cents, so sums and comparisons like remaining_balance >= amount are exact. Bill templates
+# keep dollars, as entered and as saved in bills.json; amounts are converted to cents when
+# a plan is built and back to dollars only for display, JSON and Excel output.
+
+CENTS_PER_DOLLAR = 100
+
+def to_cents(amount):
+    """
+    Converts a dollar amount (float, int or numeric string) to integer cents, rounding
+    half away from zero. Binary float noise is dropped first, so 1.005 becomes 101 cents.
+    """
+    scaled = round(float(amount) * CENTS_PER_DOLLAR, 6)
+    return int(math.copysign(math.floor(abs(scaled) + 0.5), scaled))
+
+def from_cents(cents):
+    """
+    Converts integer cents to a float dollar amount for display, JSON and Excel.
+    """
+    return cents / CENTS_PER_DOLLAR
+
+def to_cents_array(amounts):
+    """
+    Converts dollar amounts to an int64 array of cents, rounding like to_cents().
+    """
+    scaled = np.round(np.asarray(amounts, dtype=np.float64) * CENTS_PER_DOLLAR, 6)
+    return (np.sign(scaled) * np.floor(np.abs(scaled) + 0.5)).astype(np.int64)
+
+def from_cents_array(cents):
+    """
+    Converts an array of integer cents to float64 dollars.
+    """
+    return np.asarray(cents, dtype=np.int64) / CENTS_PER_DOLLAR
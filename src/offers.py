@@ -0,0 +1,196 @@
+import argparse
+import csv
+import json
+import sys
+from datetime import date
+
+import numpy as np
+
+from debt_kernel import month_number, monthly_fee_vector, monthly_rate_vector, parse_rate_schedule, simulate_debt_batch
+from main import load_bills
+
+# --- Refinance and Balance-Transfer Offers ---
+#
+# Compares a debt's status quo with a table of refinance or balance-transfer offers:
+#
+#     python src/offers.py data/bills.json "Visa" offers.csv --payment 150
+#
+# The offers table is CSV or JSON, one row per offer:
+#
+#     name,transfer_fee,promo_rate,promo_months,post_promo_rate,minimum_payment,annual_fee
+#     Card A 0% 18mo,0.03,0.0,18,0.2499,35,0
+#
+# transfer_fee is a share of the balance added to the new balance (0.03 for 3%); rates are
+# annual (0.2499 for 24.99%). monthly_fee and annual_fee are optional; the annual fee is
+# charged on each anniversary of the transfer. Every offer and the status quo pay the same
+# monthly amount (the debt's minimum payment unless --payment is given), never less than
+# their own minimum payment, so their costs compare like for like.
+
+OFFER_FIELDS = ['transfer_fee', 'promo_rate', 'promo_months', 'post_promo_rate', 'minimum_payment', 'monthly_fee', 'annual_fee']
+
+def build_offer(fields):
+    """
+    Builds an offer from a table row. Raises ValueError for missing or invalid fields.
+    """
+    name = str(fields.get('name') or '').strip()
+    if not name:
+        raise ValueError("An offer needs a name.")
+    offer = {'name': name}
+    for key in OFFER_FIELDS:
+        value = fields.get(key)
+        if value in (None, ''):
+            if key in ('monthly_fee', 'annual_fee', 'promo_months'):
+                value = 0
+            elif key == 'promo_rate':
+                value = fields.get('post_promo_rate') # No promo
+            else:
+                raise ValueError(f"Offer '{name}' is missing {key}.")
+        try:
+            offer[key] = int(value) if key == 'promo_months' else float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid {key} for offer '{name}': {value!r}")
+        if offer[key] < 0:
+            raise ValueError(f"{key} for offer '{name}' cannot be negative.")
+    return offer
+
+def load_offers(file_path):
+    """
+    Loads offers from a CSV file, or a JSON file with a list of offers.
+    """
+    with open(file_path, 'r', newline='') as f:
+        rows = json.load(f) if file_path.lower().endswith('.json') else list(csv.DictReader(f))
+    return [build_offer(row) for row in rows]
+
+def _break_even_months(costs, baseline_costs):
+    """
+    Returns, per row of costs, the first month (1-based) from which the row's cumulative
+    cost stays at or below the baseline's for the rest of the horizon; 0 if it never does.
+    """
+    cheaper = costs <= baseline_costs[None, :] + 0.005 # Within half a cent counts as even
+    cheaper_from_here = np.logical_and.accumulate(cheaper[:, ::-1], axis=1)[:, ::-1]
+    first = np.argmax(cheaper_from_here, axis=1) + 1
+    return np.where(cheaper_from_here.any(axis=1), first, 0)
+
+def evaluate_offers(debt_template, offers, payment=None, months=360, first_month=None):
+    """
+    Simulates a debt's status quo and every offer side by side in one batched simulation
+    (see debt_kernel.simulate_debt_batch) and ranks the offers.
+
+    Args:
+        debt_template (dict): The debt's template data.
+        offers (list): Offers as returned by build_offer().
+        payment (float): Monthly amount paid toward the debt (defaults to its minimum payment).
+        months (int): Months to simulate.
+        first_month (int): Running month number of the transfer (defaults to this month).
+
+    Returns:
+        dict: 'status_quo' and 'offers' results, the offers ranked by total cost (offers paid
+              off within the horizon first). Each result has its total_cost (interest, fees
+              and transfer fee, plus any balance still owed at the end), total_interest,
+              total_fees, transfer_fee, payoff_month, final_balance and, for offers,
+              savings and break_even_month (None if it never catches up with the status quo).
+    """
+    if first_month is None:
+        first_month = month_number(date.today())
+    balance = float(debt_template['initial_balance'])
+    payment = float(payment if payment is not None else debt_template['minimum_payment'])
+
+    def column(key):
+        # One field of every offer as a column, shape (offers, 1)
+        return np.array([offer[key] for offer in offers], dtype=np.float64).reshape(-1, 1)
+
+    # Row 0 is the status quo; each offer starts from the balance plus its transfer fee
+    transfer_fees = np.concatenate([[0.0], column('transfer_fee').ravel() * balance])
+    month_offsets = np.arange(months)
+    offer_rates = np.where(month_offsets < column('promo_months'), column('promo_rate'), column('post_promo_rate')) / 12.0
+    offer_fees = column('monthly_fee') + np.where(month_offsets % 12 == 11, column('annual_fee'), 0.0)
+    status_quo_rates = monthly_rate_vector(parse_rate_schedule(debt_template.get('rate_schedule')),
+                                           float(debt_template['interest_rate']), first_month, months)
+
+    result = simulate_debt_batch(
+        balance + transfer_fees,
+        np.vstack([status_quo_rates, offer_rates]),
+        np.concatenate([[float(debt_template['minimum_payment'])], column('minimum_payment').ravel()]),
+        payment,
+        np.vstack([monthly_fee_vector(debt_template, first_month, months), offer_fees]),
+        keep_balances=True
+    )
+
+    # Cumulative cost after each month: everything paid so far plus what is still owed, less the original balance
+    costs = np.cumsum(result['payments'], axis=1) + result['balances'] - balance
+    total_costs = costs[:, -1]
+    break_even = _break_even_months(costs[1:], costs[0])
+
+    def row_result(row, name):
+        return {
+            'name': name,
+            'total_cost': round(float(total_costs[row]), 2),
+            'total_interest': round(float(result['total_interest'][row]), 2),
+            'total_fees': round(float(result['total_fees'][row]), 2),
+            'transfer_fee': round(float(transfer_fees[row]), 2),
+            'payoff_month': int(result['payoff_month'][row]) or None,
+            'final_balance': round(float(result['final_balance'][row]), 2)
+        }
+
+    ranked = []
+    for index, offer in enumerate(offers):
+        offer_result = row_result(index + 1, offer['name'])
+        offer_result['savings'] = round(float(total_costs[0] - total_costs[index + 1]), 2)
+        offer_result['break_even_month'] = int(break_even[index]) or None
+        ranked.append(offer_result)
+    ranked.sort(key=lambda r: (r['payoff_month'] is None, r['total_cost'], r['break_even_month'] or months + 1))
+
+    return {
+        'debt_name': debt_template['name'],
+        'payment': payment,
+        'months': months,
+        'status_quo': row_result(0, 'Status quo'),
+        'offers': ranked
+    }
+
+def print_offer_ranking(evaluation):
+    """
+    Prints the status quo and the ranked offers.
+    """
+    status_quo = evaluation['status_quo']
+    print(f"\n--- Offers for {evaluation['debt_name']} (paying ${evaluation['payment']:.2f}/month) ---")
+
+    def payoff(result):
+        if result['payoff_month'] is None:
+            return f"${result['final_balance']:.2f} left after {evaluation['months']} months"
+        return f"paid off in {result['payoff_month']} months"
+
+    print(f"  Status quo: cost ${status_quo['total_cost']:.2f}, {payoff(status_quo)}")
+    for rank, offer in enumerate(evaluation['offers'], start=1):
+        if offer['break_even_month'] is None:
+            break_even = "never breaks even"
+        elif offer['break_even_month'] == 1:
+            break_even = "cheaper from month 1"
+        else:
+            break_even = f"breaks even in month {offer['break_even_month']}"
+        savings = f"saves ${offer['savings']:.2f}" if offer['savings'] >= 0 else f"costs ${-offer['savings']:.2f} more"
+        print(f"  {rank}. {offer['name']}: cost ${offer['total_cost']:.2f} ({savings}, "
+              f"transfer fee ${offer['transfer_fee']:.2f}), {payoff(offer)}, {break_even}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank refinance and balance-transfer offers for a debt.")
+    parser.add_argument('bills', help="Bills JSON file with the debt.")
+    parser.add_argument('debt', help="Name or id of the debt.")
+    parser.add_argument('offers', help="Offers CSV or JSON file.")
+    parser.add_argument('--payment', type=float, help="Monthly payment (defaults to the debt's minimum payment).")
+    parser.add_argument('--months', type=int, default=360, help="Months to simulate (default 360).")
+    parser.add_argument('--output', help="Write the ranking to this JSON file.")
+    args = parser.parse_args()
+
+    try:
+        debt = next((b for b in load_bills(args.bills) if b.get('is_debt') and args.debt in (b['id'], b['name'])), None)
+        if debt is None:
+            raise ValueError(f"No debt with id or name {args.debt!r} in {args.bills}.")
+        evaluation = evaluate_offers(debt, load_offers(args.offers), args.payment, args.months)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print_offer_ranking(evaluation)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(evaluation, f, indent=4)
@@ -0,0 +1,265 @@
+import bisect
+import calendar
+import heapq
+from collections import namedtuple
+from datetime import date, timedelta
+
+# --- Pay Calendar ---
+
+PAY_FREQUENCIES = ['weekly', 'bi-weekly', 'semi-monthly', 'monthly']
+WEEKEND_SHIFTS = ['previous', 'next', None] # Move a payday off a weekend/holiday to the business day before or after
+
+# A single deposit of income: when it lands, which income stream it came from and how much
+Deposit = namedtuple('Deposit', ['pay_date', 'source', 'amount'])
+
+def _clamped_date(year, month, day):
+    """
+    Builds a date, clamping the day to the last day of the month (e.g. 31 -> 30 in April).
+    """
+    return date(year, month, min(day, calendar.monthrange(year, month)[1]))
+
+def _add_months(year, month, months):
+    """
+    Returns (year, month) shifted by a number of months.
+    """
+    month_index = year * 12 + (month - 1) + months
+    return month_index // 12, month_index % 12 + 1
+
+def _shift_to_business_day(pay_date, weekend_shift, holidays):
+    """
+    Moves a pay date that falls on a weekend or holiday to the previous or next business day.
+    """
+    if weekend_shift is None:
+        return pay_date
+    step = timedelta(days=-1 if weekend_shift == 'previous' else 1)
+    while pay_date.weekday() >= 5 or pay_date in holidays:
+        pay_date += step
+    return pay_date
+
+def _iter_scheduled_pay_dates(frequency, start_date, days_of_month):
+    """
+    Yields unshifted pay dates for a schedule forever, starting at start_date. Days of the
+    month that clamp to the same date (e.g. 30 and 31 in February) give one pay date.
+    """
+    if frequency in ('weekly', 'bi-weekly'):
+        step = timedelta(weeks=1 if frequency == 'weekly' else 2)
+        pay_date = start_date
+        while True:
+            yield pay_date
+            pay_date += step
+
+    elif frequency in ('semi-monthly', 'monthly'):
+        if not days_of_month:
+            days_of_month = [15, 31] if frequency == 'semi-monthly' else [start_date.day]
+        year, month = start_date.year, start_date.month
+        last_pay_date = None
+        while True:
+            for day in sorted(days_of_month):
+                pay_date = _clamped_date(year, month, day)
+                if pay_date >= start_date and pay_date != last_pay_date:
+                    yield pay_date
+                    last_pay_date = pay_date
+            year, month = _add_months(year, month, 1)
+
+    else:
+        raise ValueError(f"Unknown pay frequency: {frequency}. Expected one of {', '.join(PAY_FREQUENCIES)}.")
+
+class PayCalendar:
+    """
+    A precomputed, sorted list of paydays with O(log n) date lookups.
+
+    Use PayCalendar.from_schedule() for weekly, bi-weekly, semi-monthly and monthly
+    schedules, or PayCalendar.from_dates() for an explicit list of pay dates.
+    """
+
+    def __init__(self, pay_dates, frequency='explicit', following_pay_date=None, deposits=None):
+        self.pay_dates = sorted(set(pay_dates))
+        if not self.pay_dates:
+            raise ValueError("A pay calendar needs at least one pay date.")
+        self.frequency = frequency
+        # For calendars built from income streams: the list of Deposits landing on each payday
+        self.deposits = deposits
+
+        # The payday after the last one closes the last pay window.
+        # For explicit lists, assume the same spacing as the last two paydays (or two weeks).
+        if following_pay_date is None:
+            gap = self.pay_dates[-1] - self.pay_dates[-2] if len(self.pay_dates) > 1 else timedelta(weeks=2)
+            following_pay_date = self.pay_dates[-1] + gap
+        self.following_pay_date = following_pay_date
+
+    @classmethod
+    def from_schedule(cls, frequency, start_date, num_paychecks, days_of_month=None, weekend_shift=None, holidays=()):
+        """
+        Builds a calendar of num_paychecks paydays starting at start_date.
+
+        Args:
+            frequency (str): 'weekly', 'bi-weekly', 'semi-monthly' or 'monthly'.
+            start_date (date): The first payday (or the earliest allowed payday for
+                semi-monthly/monthly schedules).
+            num_paychecks (int): Number of paydays to generate.
+            days_of_month (list): Days paid on for semi-monthly/monthly schedules.
+                Days past the end of a month are clamped, so 31 means the last day.
+                Defaults to [15, 31] for semi-monthly and start_date's day for monthly.
+            weekend_shift (str): 'previous', 'next' or None to leave paydays on weekends/holidays.
+            holidays (iterable): Dates that are not business days.
+        """
+        if num_paychecks <= 0:
+            raise ValueError("Number of paychecks must be positive.")
+        if weekend_shift not in WEEKEND_SHIFTS:
+            raise ValueError(f"Unknown weekend shift: {weekend_shift}. Expected 'previous', 'next' or None.")
+        holidays = set(holidays)
+
+        # Shifting paydays off weekends and holidays can land two on the same business day,
+        # so keep going until there are enough distinct paydays
+        pay_dates = []
+        for scheduled_date in _iter_scheduled_pay_dates(frequency, start_date, days_of_month):
+            pay_date = _shift_to_business_day(scheduled_date, weekend_shift, holidays)
+            if not pay_dates or pay_date != pay_dates[-1]:
+                pay_dates.append(pay_date)
+            if len(pay_dates) > num_paychecks: # One extra to close the last pay window
+                break
+        return cls(pay_dates[:-1], frequency, following_pay_date=pay_dates[-1])
+
+    @classmethod
+    def from_dates(cls, pay_dates, weekend_shift=None, holidays=(), num_paychecks=None):
+        """
+        Builds a calendar from an explicit list of pay dates, e.g. for irregular pay.
+
+        Args:
+            pay_dates (iterable): The paydays, in any order.
+            weekend_shift, holidays: As in from_schedule(). Dates shifted onto the same
+                business day give one payday.
+            num_paychecks (int): Keep only the first num_paychecks paydays (None for all).
+                The next listed payday then closes the last pay window.
+        """
+        if weekend_shift not in WEEKEND_SHIFTS:
+            raise ValueError(f"Unknown weekend shift: {weekend_shift}. Expected 'previous', 'next' or None.")
+        if num_paychecks is not None and num_paychecks <= 0:
+            raise ValueError("Number of paychecks must be positive.")
+        holidays = set(holidays)
+        shifted_dates = sorted(set(_shift_to_business_day(pay_date, weekend_shift, holidays) for pay_date in pay_dates))
+        if num_paychecks is not None and len(shifted_dates) > num_paychecks:
+            return cls(shifted_dates[:num_paychecks], following_pay_date=shifted_dates[num_paychecks])
+        return cls(shifted_dates)
+
+    @classmethod
+    def from_income_streams(cls, income_streams, num_deposits):
+        """
+        Builds a calendar from exactly the first num_deposits deposits of several income
+        streams, merged into one timeline. Each payday keeps the list of deposits landing on
+        it, so the last payday can hold fewer deposits than land that day: same-day deposits
+        are taken in income_streams order.
+        """
+        if num_deposits <= 0:
+            raise ValueError("Number of paychecks must be positive.")
+        timeline = merge_income_streams(income_streams)
+
+        pay_dates = []
+        deposits = []
+        following_pay_date = None
+        taken = 0
+        for deposit in timeline:
+            if taken >= num_deposits:
+                if deposit.pay_date != pay_dates[-1]: # Deposits past the last one on its payday are left out
+                    following_pay_date = deposit.pay_date
+                    break
+            elif pay_dates and deposit.pay_date == pay_dates[-1]:
+                deposits[-1].append(deposit) # Keep same-day deposits together
+                taken += 1
+            else:
+                pay_dates.append(deposit.pay_date)
+                deposits.append([deposit])
+                taken += 1
+
+        return cls(pay_dates, 'income streams', following_pay_date=following_pay_date, deposits=deposits)
+
+    def __len__(self):
+        return len(self.pay_dates)
+
+    def __iter__(self):
+        return iter(self.pay_dates)
+
+    def __getitem__(self, index):
+        return self.pay_dates[index]
+
+    def next_pay_date(self, index):
+        """
+        Returns the payday after the one at index (closing its pay window).
+        """
+        if index + 1 < len(self.pay_dates):
+            return self.pay_dates[index + 1]
+        return self.following_pay_date
+
+    def index_on_or_before(self, target_date):
+        """
+        Returns the index of the latest payday on or before target_date, or -1 if there is none.
+        """
+        return bisect.bisect_right(self.pay_dates, target_date) - 1
+
+    def latest_on_or_before(self, target_date):
+        """
+        Returns the latest payday on or before target_date, or None if there is none.
+        """
+        index = self.index_on_or_before(target_date)
+        return self.pay_dates[index] if index >= 0 else None
+
+    def paying_index(self, due_date):
+        """
+        Returns the index of the paycheck that should pay a bill due on due_date: the
+        latest payday strictly before it, so a bill due on a payday is covered by the
+        previous paycheck. Bills due before the first payday go to the first paycheck.
+        Returns None if the bill is due after the last pay window closes.
+        """
+        if due_date > self.following_pay_date:
+            return None
+        return max(bisect.bisect_left(self.pay_dates, due_date) - 1, 0)
+
+# --- Income Streams ---
+
+class IncomeStream:
+    """
+    One source of income with its own schedule, e.g. each earner's paycheck or side income.
+    Deposits are generated lazily, so a stream has no fixed length.
+    """
+
+    def __init__(self, name, amount, frequency='bi-weekly', start_date=None, pay_dates=None, days_of_month=None, weekend_shift=None, holidays=()):
+        """
+        Args:
+            name (str): Label for the stream (e.g. 'Alex - Paycheck').
+            amount (float): Net amount of each deposit.
+            frequency (str): One of PAY_FREQUENCIES, or 'explicit' together with pay_dates.
+            start_date (date): First payday of a scheduled stream.
+            pay_dates (list): Explicit pay dates, for irregular income.
+            days_of_month, weekend_shift, holidays: As in PayCalendar.from_schedule().
+        """
+        if pay_dates is None and start_date is None:
+            raise ValueError(f"Income stream '{name}' needs a start date or a list of pay dates.")
+        if weekend_shift not in WEEKEND_SHIFTS:
+            raise ValueError(f"Unknown weekend shift: {weekend_shift}. Expected 'previous', 'next' or None.")
+        self.name = name
+        self.amount = amount
+        self.frequency = 'explicit' if pay_dates is not None else frequency
+        self.start_date = start_date
+        self.pay_dates = sorted(pay_dates) if pay_dates is not None else None
+        self.days_of_month = days_of_month
+        self.weekend_shift = weekend_shift
+        self.holidays = set(holidays)
+
+    def iter_deposits(self):
+        """
+        Yields this stream's deposits in date order.
+        """
+        if self.pay_dates is not None:
+            scheduled_dates = iter(self.pay_dates)
+        else:
+            scheduled_dates = _iter_scheduled_pay_dates(self.frequency, self.start_date, self.days_of_month)
+        for pay_date in scheduled_dates:
+            yield Deposit(_shift_to_business_day(pay_date, self.weekend_shift, self.holidays), self.name, self.amount)
+
+def merge_income_streams(income_streams):
+    """
+    Lazily merges the deposits of several income streams into one time-ordered timeline.
+    Uses a heap merge, so only one pending deposit per stream is held at a time.
+    Deposits on the same date keep the order of income_streams.
+    """
+    return heapq.merge(*(stream.iter_deposits() for stream in income_streams), key=lambda deposit: deposit.pay_date)
@@ -0,0 +1,212 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from debt_kernel import debt_month_step_batch, month_number
+
+# --- Portfolio Projections ---
+#
+# Projects balances, interest and fees for a whole portfolio of debt accounts:
+#
+#     python src/portfolio.py accounts.csv --months 120 --output monthly.csv --workers 8
+#
+# Accounts are read in chunks from a CSV file, or from a directory of .npy column files
+# (balance.npy, interest_rate.npy, ...) that are memory-mapped, so the input never has to
+# fit in memory. Columns:
+#
+#     balance, interest_rate, minimum_payment     required; rates are annual (0.2499)
+#     payment                                      monthly payment (defaults to the minimum)
+#     monthly_fee, annual_fee, annual_fee_month    fees (annual_fee_month 1-12, 0 for none)
+#     promo_rate, promo_months                     a promotional rate for the first months
+#     id                                           account id for --accounts (defaults to the row number)
+#
+# Each chunk is simulated as arrays in a worker process, with the same monthly steps as the
+# plan's debt simulation. The monthly totals across all accounts go to --output, and each
+# account's results can be streamed to --accounts as chunks finish.
+
+PORTFOLIO_COLUMNS = ['balance', 'interest_rate', 'minimum_payment', 'payment', 'monthly_fee', 'annual_fee', 'annual_fee_month', 'promo_rate', 'promo_months']
+REQUIRED_COLUMNS = ['balance', 'interest_rate', 'minimum_payment']
+MONTHLY_TOTALS = ['open_accounts', 'balance_start', 'interest', 'fees', 'payments', 'balance_end', 'paid_off']
+
+def _chunk_arrays(columns, rows, first_row):
+    """
+    Builds a chunk's float64 column arrays, filling in the optional columns.
+    """
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(f"Account input is missing columns: {', '.join(missing)}")
+    chunk = {name: np.asarray(columns[name], dtype=np.float64) for name in PORTFOLIO_COLUMNS if name in columns}
+    for name in REQUIRED_COLUMNS:
+        if np.isnan(chunk[name]).any():
+            raise ValueError(f"Accounts {first_row}-{first_row + rows - 1} have blank {name} values.")
+    # Blank optional values: pay the minimum, no fees, no promo
+    defaults = {'payment': chunk['minimum_payment'], 'promo_rate': chunk['interest_rate']}
+    for name in PORTFOLIO_COLUMNS:
+        default = defaults.get(name, 0.0)
+        chunk[name] = np.where(np.isnan(chunk[name]), default, chunk[name]) if name in chunk else np.broadcast_to(default, rows)
+    chunk['id'] = np.asarray(columns['id']) if 'id' in columns else np.arange(first_row, first_row + rows)
+    return chunk
+
+def iter_account_chunks(path, chunk_size=100000):
+    """
+    Yields the accounts in path as dicts of column arrays, chunk_size accounts at a time.
+    """
+    first_row = 0
+    if os.path.isdir(path):
+        columns = {
+            os.path.splitext(file_name)[0]: np.load(os.path.join(path, file_name), mmap_mode='r')
+            for file_name in os.listdir(path) if file_name.endswith('.npy')
+        }
+        rows = len(next(iter(columns.values()))) if columns else 0
+        if any(len(column) != rows for column in columns.values()):
+            raise ValueError(f"Column files in {path} have different lengths.")
+        for start in range(0, rows, chunk_size):
+            end = min(start + chunk_size, rows)
+            yield _chunk_arrays({name: column[start:end] for name, column in columns.items()}, end - start, start)
+        return
+
+    for frame in pd.read_csv(path, chunksize=chunk_size):
+        columns = {name: frame[name].to_numpy() for name in frame.columns}
+        yield _chunk_arrays(columns, len(frame), first_row)
+        first_row += len(frame)
+
+def project_chunk(chunk, first_month, months):
+    """
+    Simulates one chunk of accounts for `months` months from first_month.
+
+    Returns:
+        tuple: (monthly totals as a (months, len(MONTHLY_TOTALS)) array, per-account results
+               dict with 'id', 'payoff_month' (0 if not paid off), 'total_interest',
+               'total_fees' and 'final_balance')
+    """
+    balance = chunk['balance'].copy()
+    annual_fee_month = chunk['annual_fee_month'].astype(np.int64)
+    totals = np.zeros((months, len(MONTHLY_TOTALS)))
+    total_interest = np.zeros(len(balance))
+    total_fees = np.zeros(len(balance))
+    payoff_month = np.zeros(len(balance), dtype=np.int64)
+
+    for month in range(months):
+        active = balance > 0
+        if not active.any():
+            break
+        monthly_rate = np.where(month < chunk['promo_months'], chunk['promo_rate'], chunk['interest_rate']) / 12.0
+        fees = chunk['monthly_fee'] + np.where(annual_fee_month == (first_month + month) % 12 + 1, chunk['annual_fee'], 0.0)
+        interest, fees, payment, new_balance = debt_month_step_batch(balance, monthly_rate, fees, chunk['payment'], chunk['minimum_payment'])
+        paid_off = active & (new_balance <= 0)
+        totals[month] = (active.sum(), balance.sum(), interest.sum(), fees.sum(), payment.sum(), new_balance.sum(), paid_off.sum())
+        total_interest += interest
+        total_fees += fees
+        payoff_month[paid_off] = month + 1
+        balance = new_balance
+
+    # Months after every account is paid off stay zero
+    return totals, {
+        'id': chunk['id'],
+        'payoff_month': payoff_month,
+        'total_interest': total_interest,
+        'total_fees': total_fees,
+        'final_balance': balance
+    }
+
+def iter_projected_chunks(chunks, first_month, months, workers=None, max_pending=None):
+    """
+    Projects chunks across a process pool and yields (accounts, totals, account results) as
+    they complete. At most max_pending chunks (default: twice the worker count) are read
+    ahead, so memory stays bounded however many accounts there are.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    chunks = iter(chunks)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        while True:
+            for chunk in chunks:
+                pending[pool.submit(project_chunk, chunk, first_month, months)] = len(chunk['balance'])
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                totals, account_results = future.result()
+                yield pending.pop(future), totals, account_results
+
+def run_portfolio_projection(input_path, output_file, months=120, start_month=None, chunk_size=100000, workers=None, accounts_file=None):
+    """
+    Projects every account in input_path, writing the monthly totals across the portfolio
+    to output_file (CSV) and, if accounts_file is given, each account's results to it
+    (CSV, in the order chunks finish).
+
+    Returns:
+        dict: Accounts projected, elapsed seconds and accounts per second.
+    """
+    first_month = start_month if start_month is not None else month_number(date.today())
+    print(f"\n--- Portfolio Projection: {input_path}, {months} months ---")
+    started = time.perf_counter()
+    totals = np.zeros((months, len(MONTHLY_TOTALS)))
+    accounts = 0
+
+    accounts_out = open(accounts_file, 'w', newline='') if accounts_file else None
+    try:
+        if accounts_out:
+            account_writer = csv.writer(accounts_out)
+            account_writer.writerow(['id', 'payoff_month', 'total_interest', 'total_fees', 'final_balance'])
+        for chunk_accounts, chunk_totals, account_results in iter_projected_chunks(
+                iter_account_chunks(input_path, chunk_size), first_month, months, workers):
+            totals += chunk_totals
+            accounts += chunk_accounts
+            if accounts_out:
+                account_writer.writerows(zip(
+                    account_results['id'].tolist(), account_results['payoff_month'].tolist(),
+                    np.round(account_results['total_interest'], 2).tolist(), np.round(account_results['total_fees'], 2).tolist(),
+                    np.round(account_results['final_balance'], 2).tolist()
+                ))
+            elapsed = time.perf_counter() - started
+            print(f"  {accounts} accounts projected ({accounts / elapsed:,.0f} accounts/s)")
+    finally:
+        if accounts_out:
+            accounts_out.close()
+
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['month'] + MONTHLY_TOTALS)
+        for month, row in enumerate(totals):
+            month_index = first_month + month
+            writer.writerow([f"{month_index // 12}-{month_index % 12 + 1:02d}", int(row[0])]
+                            + [round(float(value), 2) for value in row[1:6]] + [int(row[6])])
+
+    elapsed = time.perf_counter() - started
+    result = {
+        'accounts': accounts,
+        'seconds': round(elapsed, 2),
+        'accounts_per_second': round(accounts / elapsed, 1) if elapsed > 0 else None
+    }
+    print(f"\nProjection complete: {accounts} accounts in {result['seconds']}s ({result['accounts_per_second']} accounts/s). "
+          f"Monthly totals written to {output_file}.")
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Project balances, interest and fees for a portfolio of debt accounts.")
+    parser.add_argument('accounts', help="Accounts CSV file, or a directory of .npy column files.")
+    parser.add_argument('--output', default='portfolio_monthly.csv', help="Monthly totals CSV (default portfolio_monthly.csv).")
+    parser.add_argument('--accounts-output', help="Also write each account's results to this CSV.")
+    parser.add_argument('--months', type=int, default=120, help="Months to project (default 120).")
+    parser.add_argument('--start', help="First month to project (YYYY-MM, defaults to this month).")
+    parser.add_argument('--chunk-size', type=int, default=100000, help="Accounts per chunk (default 100000).")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count).")
+    args = parser.parse_args()
+
+    try:
+        start_month = month_number(datetime.strptime(args.start, "%Y-%m")) if args.start else None
+        run_portfolio_projection(args.accounts, args.output, args.months, start_month, args.chunk_size, args.workers, args.accounts_output)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,214 @@
+import argparse
+import os
+import sys
+import zipfile
+from datetime import date, datetime
+
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+from main import RECONCILE_BALANCE_COLUMN, RECONCILE_PAYMENT_COLUMNS, load_bills, save_bills
+
+# --- Workbook Reconciliation ---
+#
+# Reads actual payments typed into an exported financial_plan.xlsx back into the bills:
+#
+#     python src/reconcile.py data/financial_plan.xlsx --bills data/bills.json
+#
+# In the Paycheck Details sheet, fill in a bill row's "Actual Paid" (amount) and/or
+# "Paid On" (date) columns. In the Debt Progress sheet, fill in "Actual Balance" from a
+# statement. Each annotated row is compared with the plan and recorded on its bill in
+# bills.json: bills get a 'payment_history' entry per due date and debts a 'balance_history'
+# entry per month. Reconciling the same workbook again replaces those entries rather than
+# adding them twice.
+#
+# The sheets are streamed a row at a time with openpyxl's read-only mode, so memory stays
+# flat however long the plan is.
+
+# Headers are matched ignoring case; the alternatives cover columns added by hand
+ACTUAL_PAID_HEADERS = (RECONCILE_PAYMENT_COLUMNS[0].lower(), 'actual amount', 'paid amount')
+PAID_ON_HEADERS = (RECONCILE_PAYMENT_COLUMNS[1].lower(), 'actual date', 'date paid')
+ACTUAL_BALANCE_HEADERS = (RECONCILE_BALANCE_COLUMN.lower(), 'statement balance')
+NON_BILL_CATEGORIES = ('Savings Goal', 'Savings/Buffer')
+
+def _parse_cell_date(value):
+    """
+    Converts a date cell (an Excel date, or text as MM-DD-YYYY or YYYY-MM-DD) to a date.
+    Returns None for an empty cell. Raises ValueError for text that isn't a date.
+    """
+    if value in (None, ''):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    for date_format in ("%m-%d-%Y", "%Y-%m-%d", "%m/%d/%Y"):
+        try:
+            return datetime.strptime(str(value).strip(), date_format).date()
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid date: {value!r}")
+
+def _parse_cell_amount(value):
+    """
+    Converts an amount cell (a number, or text like "$1,234.50") to a float, or None if empty.
+    """
+    if value in (None, ''):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float(str(value).replace('$', '').replace(',', '').strip())
+
+def _iter_sheet_rows(workbook, sheet_name):
+    """
+    Yields (row number, {header: value}) for each row of a sheet after the header row.
+    Headers are matched lowercased. Yields nothing if the workbook has no such sheet.
+    """
+    if sheet_name not in workbook.sheetnames:
+        return
+    rows = workbook[sheet_name].iter_rows(values_only=True)
+    header = [str(cell).strip().lower() if cell is not None else '' for cell in next(rows, ())]
+    for row_number, row in enumerate(rows, start=2):
+        yield row_number, dict(zip(header, row))
+
+def _first_value(row, headers):
+    return next((row[header] for header in headers if row.get(header) not in (None, '')), None)
+
+def _record(history, key_field, entry):
+    """
+    Adds an entry to a bill's history list, replacing an earlier entry for the same key.
+    """
+    for index, existing in enumerate(history):
+        if existing.get(key_field) == entry[key_field]:
+            history[index] = entry
+            return
+    history.append(entry)
+
+def reconcile_workbook(workbook_path, bills):
+    """
+    Streams a plan workbook's Paycheck Details and Debt Progress sheets and records every
+    annotated row on its bill (see above). Bills are matched by name.
+
+    Args:
+        workbook_path (str): The exported workbook with actual payments filled in.
+        bills (list): Bill templates to record history on (changed in place).
+
+    Returns:
+        dict: Counts and totals: rows read, payments reconciled, planned and paid totals,
+              late and short payments, balances checked, plus rows that couldn't be used.
+    """
+    bills_by_name = {}
+    for bill in bills:
+        bills_by_name.setdefault(bill['name'], bill) # The first bill wins if names repeat
+    report = {
+        'rows_read': 0, 'payments_reconciled': 0, 'planned_total': 0.0, 'paid_total': 0.0,
+        'late_payments': 0, 'short_payments': 0, 'balances_checked': 0, 'balance_difference': 0.0,
+        'unknown_bills': set(), 'invalid_rows': []
+    }
+
+    workbook = load_workbook(workbook_path, read_only=True, data_only=True)
+    try:
+        for row_number, row in _iter_sheet_rows(workbook, 'Paycheck Details'):
+            report['rows_read'] += 1
+            if row.get('category') in NON_BILL_CATEGORIES:
+                continue
+            try:
+                paid_amount = _parse_cell_amount(_first_value(row, ACTUAL_PAID_HEADERS))
+                paid_on = _parse_cell_date(_first_value(row, PAID_ON_HEADERS))
+                if paid_amount is None and paid_on is None:
+                    continue # Not annotated
+                planned_amount = _parse_cell_amount(row.get('amount assigned')) or 0.0
+                due_date = _parse_cell_date(row.get('bill due date'))
+                pay_date = _parse_cell_date(row.get('pay date'))
+            except ValueError as e:
+                report['invalid_rows'].append(f"Paycheck Details row {row_number}: {e}")
+                continue
+            bill = bills_by_name.get(row.get('bill name'))
+            if bill is None or due_date is None:
+                report['unknown_bills'].add(str(row.get('bill name')))
+                continue
+
+            if paid_amount is None:
+                paid_amount = planned_amount # Only the date was filled in: paid as planned
+            days_late = (paid_on - due_date).days if paid_on is not None else None
+            _record(bill.setdefault('payment_history', []), 'due_date', {
+                'due_date': due_date.strftime("%Y-%m-%d"),
+                'planned_pay_date': pay_date.strftime("%Y-%m-%d") if pay_date else None,
+                'planned_amount': round(planned_amount, 2),
+                'paid_amount': round(paid_amount, 2),
+                'paid_on': paid_on.strftime("%Y-%m-%d") if paid_on else None,
+                'amount_difference': round(paid_amount - planned_amount, 2),
+                'days_late': days_late
+            })
+            report['payments_reconciled'] += 1
+            report['planned_total'] += planned_amount
+            report['paid_total'] += paid_amount
+            report['late_payments'] += days_late is not None and days_late > 0
+            report['short_payments'] += paid_amount < planned_amount - 0.005
+
+        for row_number, row in _iter_sheet_rows(workbook, 'Debt Progress'):
+            report['rows_read'] += 1
+            try:
+                actual_balance = _parse_cell_amount(_first_value(row, ACTUAL_BALANCE_HEADERS))
+                if actual_balance is None:
+                    continue
+                month = _parse_cell_date(row.get('date'))
+                planned_balance = _parse_cell_amount(row.get('balance end of month')) or 0.0
+            except ValueError as e:
+                report['invalid_rows'].append(f"Debt Progress row {row_number}: {e}")
+                continue
+            debt = bills_by_name.get(row.get('debt name'))
+            if debt is None or month is None:
+                report['unknown_bills'].add(str(row.get('debt name')))
+                continue
+            _record(debt.setdefault('balance_history', []), 'month', {
+                'month': month.strftime("%Y-%m"),
+                'planned_balance': round(planned_balance, 2),
+                'actual_balance': round(actual_balance, 2),
+                'difference': round(actual_balance - planned_balance, 2)
+            })
+            report['balances_checked'] += 1
+            report['balance_difference'] += actual_balance - planned_balance
+    finally:
+        workbook.close() # Read-only workbooks keep the file open until closed
+
+    report['unknown_bills'] = sorted(report['unknown_bills'])
+    for key in ('planned_total', 'paid_total', 'balance_difference'):
+        report[key] = round(report[key], 2)
+    return report
+
+def print_reconciliation(report):
+    """
+    Prints a reconciliation report.
+    """
+    print("\n--- Workbook Reconciliation ---")
+    print(f"  Rows read: {report['rows_read']}")
+    print(f"  Payments reconciled: {report['payments_reconciled']} (planned ${report['planned_total']:.2f}, "
+          f"paid ${report['paid_total']:.2f}, difference ${report['paid_total'] - report['planned_total']:.2f})")
+    print(f"  Late payments: {report['late_payments']} | Short payments: {report['short_payments']}")
+    if report['balances_checked']:
+        print(f"  Debt balances checked: {report['balances_checked']} (actual minus planned: ${report['balance_difference']:.2f})")
+    if report['unknown_bills']:
+        print(f"  Not in your bills (skipped): {', '.join(report['unknown_bills'])}")
+    for message in report['invalid_rows']:
+        print(f"  Skipped {message}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read actual payments from an exported plan workbook back into the bills.")
+    parser.add_argument('workbook', nargs='?', default=os.path.join('data', 'financial_plan.xlsx'), help="Plan workbook (default data/financial_plan.xlsx).")
+    parser.add_argument('--bills', default=os.path.join('data', 'bills.json'), help="Bills file to update (default data/bills.json).")
+    parser.add_argument('--dry-run', action='store_true', help="Report the differences without saving them.")
+    args = parser.parse_args()
+
+    try:
+        bills = load_bills(args.bills)
+        if not bills:
+            raise ValueError(f"No bills found in {args.bills}.")
+        report = reconcile_workbook(args.workbook, bills)
+    except (OSError, ValueError, InvalidFileException, zipfile.BadZipFile) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print_reconciliation(report)
+    if not args.dry_run and (report['payments_reconciled'] or report['balances_checked']):
+        save_bills(bills, args.bills)
+        print(f"Payment history saved to {args.bills}.")
@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+import numpy as np
+
+# --- Bulk Recurrence Expansion ---
+#
+# Expands the due dates of many bill templates at once as NumPy arrays. Templates are
+# grouped by recurrence frequency and each group is expanded in a few array operations:
+#
+#     monthly, annually   month offsets from the first due date (datetime64[M]), with the due
+#                         day clamped to the length of each month
+#     bi-weekly           14-day offsets from the first due date (datetime64[D])
+#
+# Every due date is computed from the template's first due date rather than from the
+# previous one, so a bill due on the 31st is due on the 30th in April, the 28th (or 29th) in
+# February and the 31st again in May. A bill first due on February 29th is due on the 28th
+# in other years.
+#
+# iter_due_dates_in_chunks expands one template a chunk of dates at a time, for plans that
+# stream their results and shouldn't hold every due date of the horizon at once.
+
+MONTH_STEPS = {'monthly': 1, 'annually': 12}
+DAY_STEPS = {'bi-weekly': 14}
+DUE_DATES_PER_CHUNK = 64 # Due dates expanded at a time by iter_due_dates_in_chunks
+CHUNK_STEP_DAYS = {'monthly': 31, 'annually': 366, 'bi-weekly': 14} # Longest step between due dates
+
+def _ceil_div(a, b):
+    return -((-a) // b)
+
+def _repeat_ranges(first, counts):
+    """
+    For rows with counts[i] steps starting at step first[i], returns (row of each step, step).
+    """
+    rows = np.repeat(np.arange(len(counts)), counts)
+    steps = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + first[rows]
+    return rows, steps
+
+def clamp_to_month(months, days):
+    """
+    Returns the dates on day `days` of each month in `months` (datetime64[M]), using the last
+    day of the month for days past its end.
+    """
+    month_starts = months.astype('datetime64[D]')
+    month_lengths = ((months + 1).astype('datetime64[D]') - month_starts).astype(np.int64)
+    return month_starts + (np.minimum(days, month_lengths) - 1)
+
+def _expand_month_steps(anchors, step, start, end):
+    anchor_months = anchors.astype('datetime64[M]')
+    anchor_days = (anchors - anchor_months.astype('datetime64[D]')).astype(np.int64) + 1
+    start_offsets = (start.astype('datetime64[M]') - anchor_months).astype(np.int64)
+    end_offsets = (end.astype('datetime64[M]') - anchor_months).astype(np.int64)
+    first = np.maximum(_ceil_div(start_offsets, step), 0)
+    counts = np.maximum(end_offsets // step - first + 1, 0)
+    rows, steps = _repeat_ranges(first, counts)
+    return rows, clamp_to_month(anchor_months[rows] + steps * step, anchor_days[rows])
+
+def _expand_day_steps(anchors, step, start, end):
+    first = np.maximum(_ceil_div((start - anchors).astype(np.int64), step), 0)
+    counts = np.maximum((end - anchors).astype(np.int64) // step - first + 1, 0)
+    rows, steps = _repeat_ranges(first, counts)
+    return rows, anchors[rows] + steps * step
+
+def _expand_unordered(bill_templates, start, end):
+    """
+    Returns (template indexes, due dates) for every due date in [start, end], grouped by
+    frequency rather than ordered.
+    """
+    anchors = np.array([template['due_date'] for template in bill_templates], dtype='datetime64[D]')
+    groups = {}
+    for index, template in enumerate(bill_templates):
+        frequency = template.get('recurrence_frequency') if template['is_recurring'] else None
+        if frequency is not None and frequency not in MONTH_STEPS and frequency not in DAY_STEPS:
+            print(f"Warning: Unknown recurrence frequency for {template['name']}: {frequency}")
+            frequency = None
+        groups.setdefault(frequency, []).append(index)
+
+    template_indexes, due_dates = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype='datetime64[D]')]
+    for frequency, indexes in groups.items():
+        indexes = np.array(indexes, dtype=np.int64)
+        if frequency is None:
+            rows, dates = np.arange(len(indexes)), anchors[indexes]
+        elif frequency in MONTH_STEPS:
+            rows, dates = _expand_month_steps(anchors[indexes], MONTH_STEPS[frequency], start, end)
+        else:
+            rows, dates = _expand_day_steps(anchors[indexes], DAY_STEPS[frequency], start, end)
+        # One-off dates, and month steps clamped in the first or last month, may fall outside the range
+        in_range = (dates >= start) & (dates <= end)
+        template_indexes.append(indexes[rows[in_range]])
+        due_dates.append(dates[in_range])
+    return np.concatenate(template_indexes), np.concatenate(due_dates)
+
+def expand_due_dates(bill_templates, start_date, end_date):
+    """
+    Expands the due dates of bill templates that fall between start_date and end_date
+    (inclusive). One-off bills contribute their due date if it is in range. Recurring bills
+    with an unknown frequency are treated as one-off, with a warning.
+
+    Returns:
+        tuple: (template indexes as an int64 array, due dates as a datetime64[D] array), one
+               entry per due date, ordered by due date and then template index.
+    """
+    start, end = np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D')
+    template_indexes, due_dates = _expand_unordered(bill_templates, start, end)
+    # One integer sort on (due date, template index) packed into a single key
+    order = np.argsort((due_dates - start).astype(np.int64) * len(bill_templates) + template_indexes)
+    return template_indexes[order], due_dates[order]
+
+def due_dates_by_template(bill_templates, start_date, end_date):
+    """
+    Expands the due dates of bill templates (see expand_due_dates) and returns them as one
+    tuple of datetime.date objects per template, in order.
+    """
+    start, end = np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D')
+    template_indexes, due_dates = _expand_unordered(bill_templates, start, end)
+    span = (end - start).astype(np.int64) + 1
+    order = np.argsort(template_indexes * span + (due_dates - start).astype(np.int64))
+    bounds = np.searchsorted(template_indexes[order], np.arange(len(bill_templates) + 1))
+    dates = due_dates[order].tolist()
+    return [tuple(dates[bounds[i]:bounds[i + 1]]) for i in range(len(bill_templates))]
+
+def iter_due_dates_in_chunks(template, start_date, end_date, dates_per_chunk=DUE_DATES_PER_CHUNK):
+    """
+    Yields a template's due dates between start_date and end_date, like due_dates_by_template,
+    but expanded lazily about dates_per_chunk dates at a time, so a long planning period
+    never holds all of a template's due dates at once.
+    """
+    frequency = template.get('recurrence_frequency') if template['is_recurring'] else None
+    if frequency not in CHUNK_STEP_DAYS:
+        yield from due_dates_by_template([template], start_date, end_date)[0] # At most one date
+        return
+    chunk = timedelta(days=dates_per_chunk * CHUNK_STEP_DAYS[frequency])
+    chunk_start = max(start_date, template['due_date']) # Nothing is due before the first due date
+    while chunk_start <= end_date:
+        chunk_end = min(chunk_start + chunk - timedelta(days=1), end_date)
+        yield from due_dates_by_template([template], chunk_start, chunk_end)[0]
+        chunk_start = chunk_end + timedelta(days=1)
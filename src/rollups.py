@@ -0,0 +1,195 @@
+from money import from_cents
+
+# --- Category Rollups ---
+
+ROLLUP_LEVELS = ['paycheck', 'month', 'quarter', 'year']
+
+def period_key(level, pay_date):
+    """
+    Returns the key of the period containing pay_date at a rollup level.
+    Keys sort chronologically: a date, (year, month), (year, quarter) or a year.
+    """
+    if level == 'paycheck':
+        return pay_date
+    if level == 'month':
+        return (pay_date.year, pay_date.month)
+    if level == 'quarter':
+        return (pay_date.year, (pay_date.month - 1) // 3 + 1)
+    if level == 'year':
+        return pay_date.year
+    raise ValueError(f"Unknown rollup level: {level}. Expected one of {', '.join(ROLLUP_LEVELS)}.")
+
+def period_label(level, key):
+    """
+    Formats a period key for reports, e.g. '11-06-2026', '2026-11', '2026-Q4' or '2026'.
+    """
+    if level == 'paycheck':
+        return key.strftime('%m-%d-%Y')
+    if level == 'month':
+        return f"{key[0]}-{key[1]:02d}"
+    if level == 'quarter':
+        return f"{key[0]}-Q{key[1]}"
+    return str(key)
+
+class CategoryRollup:
+    """
+    Spending totals by category and period (paycheck, month, quarter and year), built
+    incrementally as bills are paid. Each paid bill updates one cell per level, so
+    building the rollup is O(bills) and its size is O(periods x categories), never
+    the number of bills. Bills count toward the periods of the paycheck that paid them.
+    Totals are kept in integer cents and reported in dollars.
+    """
+
+    def __init__(self, levels=ROLLUP_LEVELS):
+        for level in levels:
+            if level not in ROLLUP_LEVELS:
+                raise ValueError(f"Unknown rollup level: {level}. Expected one of {', '.join(ROLLUP_LEVELS)}.")
+        self.levels = list(levels)
+        self.totals = {level: {} for level in self.levels} # level -> {period key: {category: amount}}
+        self.category_totals = {} # category -> amount over the whole plan
+
+    @classmethod
+    def from_paychecks(cls, final_pay_periods, levels=ROLLUP_LEVELS):
+        """
+        Builds a rollup from finished paychecks (e.g. the output of run_plan_engine()).
+        """
+        rollup = cls(levels)
+        for paycheck_info in final_pay_periods:
+            rollup.add_paycheck(paycheck_info)
+        return rollup
+
+    def add(self, pay_date, category, amount):
+        """
+        Adds a payment of amount (in cents) in category, made by the paycheck on pay_date.
+        """
+        category = category or 'Uncategorized'
+        for level in self.levels:
+            cell = self.totals[level].setdefault(period_key(level, pay_date), {})
+            cell[category] = cell.get(category, 0) + amount
+        self.category_totals[category] = self.category_totals.get(category, 0) + amount
+
+    def add_paycheck(self, paycheck_info):
+        """
+        Adds every bill a paycheck paid.
+        """
+        for bill in paycheck_info['assigned_bills']:
+            self.add(paycheck_info['pay_date'], bill['category'], bill['amount'])
+
+    def categories(self):
+        """
+        Returns the categories, largest total spending first.
+        """
+        return sorted(self.category_totals, key=lambda category: (-self.category_totals[category], category))
+
+    def periods(self, level):
+        """
+        Returns the period keys with spending at a level, in chronological order.
+        """
+        return sorted(self.totals[level])
+
+    def rows(self, level):
+        """
+        Yields one (period label, [dollars per category in categories() order], total dollars)
+        tuple per period at a level.
+        """
+        categories = self.categories()
+        level_totals = self.totals[level]
+        for key in self.periods(level):
+            amounts = [from_cents(level_totals[key].get(category, 0)) for category in categories]
+            yield period_label(level, key), amounts, from_cents(sum(level_totals[key].values()))
+
+    def to_dict(self):
+        """
+        Returns the rollup as JSON-ready data: {level: [{'period', 'categories', 'total'}]}
+        plus the plan's 'category_totals'.
+        """
+        categories = self.categories()
+        result = {
+            level: [
+                {'period': label, 'categories': dict(zip(categories, amounts)), 'total': total}
+                for label, amounts, total in self.rows(level)
+            ]
+            for level in self.levels
+        }
+        result['category_totals'] = {category: from_cents(self.category_totals[category]) for category in categories}
+        return result
+
+# --- Paycheck Chart Data ---
+
+CHART_MAX_SERIES = 12 # Bill columns shown in the stacked paycheck chart before the rest go to 'Other'
+
+class PaycheckChartData:
+    """
+    The amount each paycheck paid per bill name, accumulated as bills are paid, for the
+    stacked paycheck chart. Rows are dense lists indexed by a bill column number, so
+    there is no sparse pay date x bill name matrix to pivot at export time. Paychecks
+    landing on the same date share one row. Amounts are kept in integer cents.
+    """
+
+    def __init__(self):
+        self.pay_dates = []
+        self.rows = [] # Per pay date: amount per bill column (shorter rows end in zeros)
+        self.remaining_balances = []
+        self.column_index = {} # bill name -> column number
+        self.column_totals = []
+
+    @classmethod
+    def from_paychecks(cls, final_pay_periods):
+        """
+        Builds chart data from finished paychecks (e.g. the output of run_plan_engine()).
+        """
+        chart_data = cls()
+        for paycheck_info in final_pay_periods:
+            chart_data.add_paycheck(paycheck_info)
+        return chart_data
+
+    def _add_amount(self, row, name, amount):
+        column = self.column_index.get(name)
+        if column is None:
+            column = self.column_index[name] = len(self.column_totals)
+            self.column_totals.append(0)
+        if column >= len(row):
+            row.extend([0] * (column + 1 - len(row)))
+        row[column] += amount
+        self.column_totals[column] += amount
+
+    def add_paycheck(self, paycheck_info):
+        """
+        Adds a paycheck's bills, savings goal contributions and remaining balance.
+        Paychecks must arrive in date order.
+        """
+        if not self.pay_dates or self.pay_dates[-1] != paycheck_info['pay_date']:
+            self.pay_dates.append(paycheck_info['pay_date'])
+            self.rows.append([])
+            self.remaining_balances.append(0)
+        row = self.rows[-1]
+        for bill in paycheck_info['assigned_bills']:
+            self._add_amount(row, bill['name'], bill['amount'])
+        for contribution in paycheck_info.get('goal_contributions', []): # Savings goals get a column like a bill
+            self._add_amount(row, contribution['name'], contribution['amount'])
+        self.remaining_balances[-1] += paycheck_info['remaining_balance']
+
+    def series(self, max_series=CHART_MAX_SERIES):
+        """
+        Returns (column names, rows) for the chart sheet. Columns are bill names in
+        alphabetical order, then 'Remaining Balance'. With more than max_series bills,
+        only the max_series largest by total are kept and the rest are summed into
+        'Other' (None keeps every bill). Each row is [pay date, dollars per column...].
+        """
+        names = sorted(self.column_index)
+        if max_series is not None and len(names) > max_series:
+            largest = sorted(names, key=lambda name: -self.column_totals[self.column_index[name]])[:max_series]
+            kept = sorted(largest)
+        else:
+            kept = names
+        kept_columns = [self.column_index[name] for name in kept]
+        other_columns = sorted(set(self.column_index.values()) - set(kept_columns))
+
+        column_names = kept + (['Other'] if other_columns else []) + ['Remaining Balance']
+        rows = []
+        for pay_date, row, remaining_balance in zip(self.pay_dates, self.rows, self.remaining_balances):
+            amounts = [row[column] if column < len(row) else 0 for column in kept_columns]
+            if other_columns:
+                amounts.append(sum(row[column] for column in other_columns if column < len(row)))
+            rows.append([pay_date] + [from_cents(cents) for cents in amounts + [remaining_balance]])
+        return column_names, rows
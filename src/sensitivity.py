@@ -0,0 +1,307 @@
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+
+from debt_kernel import month_number, monthly_fee_vector, monthly_rate_vector, parse_rate_schedule, simulate_debt_batch
+from headless import _parse_date, build_pay_calendar, carried_over_bills, load_scenario, run_plan
+from main import _debt_simulation_window, load_bills
+from money import from_cents
+from whatif import apply_variant
+
+# --- Sensitivity (Tornado) Analysis ---
+#
+# Shows which inputs move a plan's outcome the most:
+#
+#     python src/sensitivity.py scenario.json --rank-by interest --output tornado.csv
+#
+# Each input is nudged down and up in turn, one at a time, and the plan's total interest,
+# lowest paycheck buffer and number of carried-over bills are compared with the base plan.
+# The inputs are net pay, the pay dates, every bill's amount, and every debt's interest rate
+# and minimum payment. The nudges can be set in the scenario file:
+#
+#     "sensitivity": {"deltas": {"net_pay": [-0.1, 0.1], "amount": [-0.1, 0.1],
+#                                "interest_rate": [-0.02, 0.02], "minimum_payment": [-0.1, 0.1],
+#                                "pay_date": [-3, 3]}}
+#
+# net_pay, amount and minimum_payment deltas are shares (0.1 for +10%), interest_rate deltas
+# are rate points (0.02 for +2%) and pay_date deltas are days the first payday moves. Leave an
+# input out (or give it []) to skip it.
+#
+# Interest rates and minimum payments don't change which paycheck pays which bill, so those
+# nudges reuse the base plan's payments. Every debt outcome, for every nudge, is then computed
+# in one batched debt simulation (see debt_kernel.simulate_debt_batch). Nudges that do change
+# the bill assignments (pay, pay dates, amounts) share due date expansions and pay calendars,
+# and can be spread over worker processes with --workers.
+
+DEFAULT_DELTAS = {
+    'net_pay': [-0.10, 0.10],
+    'amount': [-0.10, 0.10],
+    'interest_rate': [-0.02, 0.02],
+    'minimum_payment': [-0.10, 0.10],
+    'pay_date': [-3, 3]
+}
+OUTCOMES = ['total_interest', 'lowest_buffer', 'carry_overs']
+RANK_BY = {'interest': 'total_interest', 'buffer': 'lowest_buffer', 'carry_overs': 'carry_overs'}
+
+def _debt_templates(bills):
+    return [bill for bill in bills if bill.get('is_debt') and bill.get('initial_balance') is not None and bill['initial_balance'] > 0]
+
+def _scaled_pay(pay, share):
+    if pay.get('income_streams'):
+        return {**pay, 'income_streams': [{**stream, 'amount': float(stream['amount']) * (1 + share)} for stream in pay['income_streams']]}
+    return {**pay, 'net_pay': float(pay.get('net_pay', 0.0)) * (1 + share)}
+
+def _shifted_pay(pay, days):
+    def shift(value):
+        return (_parse_date(value, 'start_date') + timedelta(days=days)).isoformat()
+    if pay.get('income_streams'):
+        return {**pay, 'income_streams': [{**stream, 'start_date': shift(stream.get('start_date'))} for stream in pay['income_streams']]}
+    return {**pay, 'start_date': shift(pay.get('start_date'))}
+
+def _format_delta(input_name, delta):
+    if input_name == 'interest_rate':
+        return f"{delta * 100:+g} pts"
+    if input_name == 'pay_date':
+        return f"{delta:+d} days"
+    return f"{delta * 100:+g}%"
+
+def build_perturbations(bills, pay, deltas=None):
+    """
+    Lists the one-at-a-time nudges to evaluate. Each is a dict with the 'parameter' label,
+    the 'input' nudged, the 'delta' and 'label' (e.g. "+10%"), and either a what-if 'variant'
+    (see whatif.apply_variant) and 'pay' settings to plan with, or for debt-only nudges the
+    'debt' name with its 'rate_delta' or 'minimum_share'.
+    Raises ValueError for unknown inputs.
+    """
+    deltas = DEFAULT_DELTAS if deltas is None else deltas
+    unknown = set(deltas) - set(DEFAULT_DELTAS)
+    if unknown:
+        raise ValueError(f"Unknown sensitivity inputs: {', '.join(sorted(unknown))}. Use {', '.join(DEFAULT_DELTAS)}.")
+
+    perturbations = []
+    def add(parameter, input_name, delta, **fields):
+        perturbations.append({'parameter': parameter, 'input': input_name, 'delta': delta,
+                              'label': _format_delta(input_name, delta), **fields})
+
+    for share in deltas.get('net_pay', []):
+        add('Net pay', 'net_pay', share, variant={}, pay=_scaled_pay(pay, share))
+    for days in deltas.get('pay_date', []):
+        add('Pay dates', 'pay_date', int(days), variant={}, pay=_shifted_pay(pay, int(days)))
+    for bill in bills:
+        for share in deltas.get('amount', []):
+            add(f"{bill['name']} amount", 'amount', share, pay=pay,
+                variant={'overrides': {bill['id']: {'amount': round(float(bill['amount']) * (1 + share), 2)}}})
+    for debt in _debt_templates(bills):
+        for rate_delta in deltas.get('interest_rate', []):
+            add(f"{debt['name']} interest rate", 'interest_rate', rate_delta, debt=debt['name'], rate_delta=rate_delta)
+        for share in deltas.get('minimum_payment', []):
+            add(f"{debt['name']} minimum payment", 'minimum_payment', share, debt=debt['name'], minimum_share=share)
+    return perturbations
+
+def _plan_outcome(bills, pay, pay_calendar, due_date_cache):
+    """
+    Runs the plan and reduces it to what the analysis needs: the lowest remaining balance and
+    carry-overs (in cents and counts), and each debt's simulation window and assigned payments
+    by month (dollars), for the batched debt simulation.
+    """
+    bill_instances, final_pay_periods, _ = run_plan(bills, pay, pay_calendar, due_date_cache)
+    num_paydays = len(pay_calendar)
+
+    carry_overs = sum(len(bills_carried) for bills_carried in carried_over_bills(bill_instances, pay_calendar).values())
+
+    debt_names = {debt['name'] for debt in _debt_templates(bills)}
+    debt_payments = {name: {} for name in debt_names}
+    for pp in final_pay_periods:
+        for bill in pp['assigned_bills']:
+            if bill.get('is_debt', False) and bill['name'] in debt_names:
+                payments = debt_payments[bill['name']]
+                month = month_number(pp['pay_date'])
+                payments[month] = payments.get(month, 0) + bill['amount']
+
+    return {
+        'lowest_buffer': min((pp['remaining_balance'] for pp in final_pay_periods), default=0),
+        'carry_overs': carry_overs,
+        'debt_window': _debt_simulation_window(pay_calendar[0], pay_calendar[num_paydays - 1]),
+        'debt_payments': {name: {month: from_cents(cents) for month, cents in payments.items()} for name, payments in debt_payments.items()}
+    }
+
+def _run_plan_batch(base_bills, runs):
+    """
+    Plans a batch of (variant, pay settings) runs, sharing due date expansions and pay
+    calendars across the batch. Runs in a worker process when --workers is given.
+    """
+    due_date_cache = {}
+    pay_calendars = {}
+    outcomes = []
+    for variant, pay in runs:
+        key = repr(sorted(pay.items()))
+        if key not in pay_calendars:
+            pay_calendars[key] = build_pay_calendar(pay)
+        outcomes.append(_plan_outcome(apply_variant(base_bills, variant), pay, pay_calendars[key], due_date_cache))
+    return outcomes
+
+def _debt_interest(debt, rows):
+    """
+    Simulates one debt under many (window, payments by month, rate delta, minimum share) rows
+    in one batched simulation per distinct window, matching the plan's monthly steps.
+    Returns the total interest of each row in cents, each month's interest rounded to cents
+    as the plan's debt report rounds it.
+    """
+    schedule = parse_rate_schedule(debt.get('rate_schedule'))
+    totals = np.zeros(len(rows), dtype=np.int64)
+    windows = {}
+    for index, (window, _, _, _) in enumerate(rows):
+        windows.setdefault(window, []).append(index)
+
+    for (first_month, end_month), indexes in windows.items():
+        months = end_month - first_month
+        if months <= 0:
+            continue
+        payments = np.zeros((len(indexes), months))
+        for row, index in enumerate(indexes):
+            for month, amount in rows[index][1].items():
+                if first_month <= month < end_month: # The plan ignores payments outside its window
+                    payments[row, month - first_month] += amount
+        rate_deltas = np.array([rows[index][2] for index in indexes]).reshape(-1, 1)
+        minimum_shares = np.array([rows[index][3] for index in indexes])
+        base_rates = monthly_rate_vector(schedule, float(debt['interest_rate']), first_month, months)
+        result = simulate_debt_batch(
+            np.full(len(indexes), float(debt['initial_balance'])),
+            np.maximum(base_rates + rate_deltas / 12.0, 0.0),
+            np.maximum(float(debt['minimum_payment']) * (1 + minimum_shares), 0.0),
+            payments,
+            monthly_fee_vector(debt, first_month, months)
+        )
+        totals[indexes] = result['total_interest_cents']
+    return totals
+
+def run_sensitivity(base_bills, pay, deltas=None, workers=None):
+    """
+    Evaluates every nudge from build_perturbations() against the base plan.
+
+    Args:
+        base_bills (list): Base bill templates (not modified).
+        pay (dict): Base pay settings, as a scenario's "pay" section.
+        deltas (dict): Nudges per input (see DEFAULT_DELTAS).
+        workers (int): Worker processes for the plan runs (None runs them in this process).
+
+    Returns:
+        dict: 'base' outcomes, and 'rows': one tornado row per parameter with, per nudge,
+              its outcomes and their changes from the base. Interest and buffers are in dollars.
+    """
+    perturbations = build_perturbations(base_bills, pay, deltas)
+    runs = [({}, pay)] + [(p['variant'], p['pay']) for p in perturbations if 'variant' in p] # The base plan first
+
+    if workers and workers > 1 and len(runs) > 1:
+        batch_size = -(-len(runs) // workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batches = pool.map(_run_plan_batch, [base_bills] * workers, [runs[i:i + batch_size] for i in range(0, len(runs), batch_size)])
+            outcomes = [outcome for batch in batches for outcome in batch]
+    else:
+        outcomes = _run_plan_batch(base_bills, runs)
+
+    base = outcomes[0]
+    planned = iter(outcomes[1:])
+    results = [base] + [next(planned) if 'variant' in p else base for p in perturbations] # Debt-only nudges keep the base plan
+
+    # Every run's debts, including the debt-only nudges, in one batched simulation per debt
+    total_interest = np.zeros(len(results), dtype=np.int64) # Cents
+    for debt in _debt_templates(base_bills):
+        rows = []
+        for index, outcome in enumerate(results):
+            perturbation = perturbations[index - 1] if index else {}
+            own_debt = perturbation.get('debt') == debt['name']
+            rows.append((outcome['debt_window'], outcome['debt_payments'].get(debt['name'], {}),
+                         perturbation.get('rate_delta', 0.0) if own_debt else 0.0,
+                         perturbation.get('minimum_share', 0.0) if own_debt else 0.0))
+        total_interest += _debt_interest(debt, rows)
+
+    def outcome_values(index):
+        return {
+            'total_interest': from_cents(int(total_interest[index])),
+            'lowest_buffer': from_cents(results[index]['lowest_buffer']),
+            'carry_overs': results[index]['carry_overs']
+        }
+
+    base_values = outcome_values(0)
+    rows = {}
+    for index, perturbation in enumerate(perturbations, start=1):
+        values = outcome_values(index)
+        row = rows.setdefault(perturbation['parameter'], {'parameter': perturbation['parameter'], 'input': perturbation['input'], 'nudges': []})
+        row['nudges'].append({
+            'delta': perturbation['delta'],
+            'label': perturbation['label'],
+            **values,
+            **{f"{outcome}_change": round(values[outcome] - base_values[outcome], 2) for outcome in OUTCOMES}
+        })
+    for row in rows.values():
+        for outcome in OUTCOMES:
+            changes = [nudge[f"{outcome}_change"] for nudge in row['nudges']]
+            row[f"{outcome}_swing"] = round(max(changes + [0]) - min(changes + [0]), 2)
+    return {'base': base_values, 'runs': len(runs), 'nudges': len(perturbations), 'rows': list(rows.values())}
+
+def rank_rows(report, rank_by='interest'):
+    """
+    Returns the tornado rows ordered by the swing of one outcome (largest first), breaking
+    ties with the other outcomes.
+    """
+    outcome = RANK_BY[rank_by]
+    others = [name for name in OUTCOMES if name != outcome]
+    return sorted(report['rows'], key=lambda row: tuple(-row[f"{name}_swing"] for name in [outcome] + others))
+
+def print_tornado(report, rank_by='interest', limit=None):
+    """
+    Prints the ranked tornado table.
+    """
+    base = report['base']
+    print(f"\n--- Sensitivity Analysis ({report['nudges']} nudges, {report['runs']} plan runs) ---")
+    print(f"  Base plan: interest ${base['total_interest']:.2f} | lowest buffer ${base['lowest_buffer']:.2f} | carry-overs {base['carry_overs']}")
+    print(f"  Ranked by {rank_by} swing:")
+    for rank, row in enumerate(rank_rows(report, rank_by)[:limit], start=1):
+        changes = "; ".join(
+            f"{nudge['label']}: interest {nudge['total_interest_change']:+.2f}, buffer {nudge['lowest_buffer_change']:+.2f}, "
+            f"carry-overs {nudge['carry_overs_change']:+d}"
+            for nudge in row['nudges']
+        )
+        print(f"  {rank}. {row['parameter']} ({changes})")
+
+def write_tornado_csv(report, output_file, rank_by='interest'):
+    """
+    Writes the ranked tornado table to a CSV file, one row per nudge.
+    """
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['rank', 'parameter', 'delta', 'total_interest', 'total_interest_change', 'lowest_buffer',
+                         'lowest_buffer_change', 'carry_overs', 'carry_overs_change', f"{RANK_BY[rank_by]}_swing"])
+        for rank, row in enumerate(rank_rows(report, rank_by), start=1):
+            for nudge in row['nudges']:
+                writer.writerow([rank, row['parameter'], nudge['label'], nudge['total_interest'], nudge['total_interest_change'],
+                                 nudge['lowest_buffer'], nudge['lowest_buffer_change'], nudge['carry_overs'],
+                                 nudge['carry_overs_change'], row[f"{RANK_BY[rank_by]}_swing"]])
+    print(f"\nSensitivity table written to: {output_file}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank which inputs move a MonteBuster plan the most.")
+    parser.add_argument('scenario', help="Scenario file (see headless.py), optionally with a 'sensitivity' section.")
+    parser.add_argument('--rank-by', choices=sorted(RANK_BY), default='interest', help="Outcome to rank by (default interest).")
+    parser.add_argument('--top', type=int, help="Only print the top N parameters.")
+    parser.add_argument('--workers', type=int, help="Worker processes for the plan runs (default: none).")
+    parser.add_argument('--output', help="Write the ranked table to this CSV file.")
+    args = parser.parse_args()
+
+    try:
+        scenario = load_scenario(args.scenario)
+        report = run_sensitivity(load_bills(scenario['bills']), scenario.get('pay', {}),
+                                 scenario.get('sensitivity', {}).get('deltas'), args.workers)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print_tornado(report, args.rank_by, args.top)
+    if args.output:
+        write_tornado_csv(report, args.output, args.rank_by)
@@ -0,0 +1,382 @@
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait
+from urllib.parse import parse_qs, urlsplit
+
+from bill_index import BillIndex, page_of, parse_bill_query
+from headless import json_default, build_pay_calendar, run_plan
+from main import (
+    build_bill_template, compare_debt_strategies, expand_debt_history, generate_spreadsheet_output,
+    load_bills, save_bills, snapshot_in_dollars, update_bill_template
+)
+from money import from_cents
+from rollups import CategoryRollup, PaycheckChartData
+
+# --- Local Plan Service ---
+#
+# A small HTTP/JSON service so dashboards and scripts can drive MonteBuster without the
+# interactive menu. Run it with:
+#
+#     python src/service.py --port 8765
+#
+# Endpoints:
+#     GET   /health             Liveness check
+#     GET   /bills              List bill templates (?q=visa category:Debt due:15&page=1&page_size=50
+#                                 searches and pages them, see bill_index.py)
+#     POST  /bills              Add a bill template (same fields as bills.json)
+#     PATCH /bills/<id>         Edit fields of a bill template
+#     POST  /plan               Run a financial plan (parameters as a scenario's "pay" settings, see headless.py)
+#     POST  /optimize           Compare a debt payment strategy against minimum payments
+#     POST  /export             Run a plan and write the spreadsheet (output_file is a file name
+#                                 in the export directory, data/exports by default)
+#
+# Plans, optimizations and exports run in a process pool. Identical requests that arrive
+# while one is running share its computation, and finished plans are cached per bills revision.
+# POST and PATCH requests must be sent as application/json and, from a browser, from the
+# service's own origin, so other web pages can't drive it.
+
+PLAN_CACHE_SIZE = 64
+MAX_BODY_BYTES = 1024 * 1024
+EXPORT_DIR = os.path.join('data', 'exports')
+EXPORT_FILE_NAME = 'financial_plan.xlsx'
+
+class HTTPError(Exception):
+    """
+    An error that maps to an HTTP status code and a JSON error message.
+    """
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+HTTP_REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 415: 'Unsupported Media Type', 500: 'Internal Server Error'}
+
+def _plan_to_json(bill_instances, final_pay_periods, debt_progress_report, category_rollup):
+    """
+    Converts plan engine results to a JSON-ready dict.
+    """
+    return {
+        'bill_instances': len(bill_instances),
+        'paychecks': [
+            {
+                'pay_date': pp['pay_date'],
+                'source': pp.get('source'),
+                'net_pay': from_cents(pp['net_pay']),
+                'remaining_balance': from_cents(pp['remaining_balance']),
+                'assigned_bills': [
+                    {'name': bill['name'], 'due_date': bill['due_date'], 'amount': from_cents(bill['amount']), 'category': bill['category']}
+                    for bill in pp['assigned_bills']
+                ]
+            }
+            for pp in final_pay_periods
+        ],
+        'debts': {
+            debt_name: {
+                'current_balance': round(debt_data['current_balance'], 2),
+                'payoff_date': debt_data['payoff_date'],
+                'history': [snapshot_in_dollars(row) for row in expand_debt_history(debt_data)]
+            }
+            for debt_name, debt_data in debt_progress_report.items()
+        },
+        'spending_by_category': category_rollup.to_dict()
+    }
+
+# --- Worker Jobs (run in the process pool) ---
+
+def _warm_worker():
+    """
+    Process pool initializer: pays for the heavy imports once per worker, not per request.
+    """
+    import pandas # noqa: F401
+    import xlsxwriter # noqa: F401
+
+def _ready_job():
+    return os.getpid()
+
+def plan_job(bills, params):
+    category_rollup = CategoryRollup()
+    plan = run_plan(bills, params, aggregators=(category_rollup,))
+    return json.loads(json.dumps(_plan_to_json(*plan, category_rollup), default=json_default))
+
+def optimize_job(debt_template, params):
+    return compare_debt_strategies(debt_template, params.get('payment_strategy', 'extra'), float(params.get('amount', 0.0)))
+
+def export_job(bills, params):
+    category_rollup, chart_data = CategoryRollup(), PaycheckChartData()
+    bill_instances, final_pay_periods, debt_progress_report = run_plan(bills, params, aggregators=(category_rollup, chart_data))
+    output_file = params['output_file']
+    # Different exports to the same file can run at once in separate workers, so each
+    # writes its own temp file (still .xlsx, for the Excel writer) and swaps it in whole
+    export_dir, file_name = os.path.split(output_file)
+    temp_path = os.path.join(export_dir, f".{os.getpid()}.{file_name}")
+    try:
+        generate_spreadsheet_output(final_pay_periods, debt_progress_report, temp_path, bills, category_rollup, chart_data)
+        os.replace(temp_path, output_file)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return {'output_file': output_file, 'paychecks': len(final_pay_periods)}
+
+# --- Service ---
+
+class PlanService:
+    """
+    Holds the bill store, the worker pool, in-flight computations and the plan cache.
+    """
+
+    def __init__(self, bills_path, workers=None, export_dir=EXPORT_DIR):
+        self.bills_path = bills_path
+        self.export_dir = export_dir
+        self.bills = load_bills(bills_path)
+        self.bill_index = BillIndex(self.bills)
+        self.bills_revision = self._bills_digest()
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        self._warm_pool()
+        self.in_flight = {} # request key -> asyncio.Future shared by identical concurrent requests
+        self.plan_cache = OrderedDict() # request key -> result, least recently used first
+
+    def _warm_pool(self):
+        """
+        Starts every worker now, so the first requests don't wait for processes to spawn and
+        import. Workers only start when jobs are submitted, so submit one per worker and wait.
+        """
+        wait([self.pool.submit(_ready_job) for _ in range(self.workers)])
+
+    def _bills_digest(self):
+        return hashlib.sha256(json.dumps(self.bills, default=json_default, sort_keys=True).encode()).hexdigest()
+
+    def _bills_changed(self):
+        save_bills(self.bills, self.bills_path)
+        self.bills_revision = self._bills_digest()
+
+    def _find_bill(self, bill_id):
+        bill = self.bill_index.get(bill_id)
+        if bill is None:
+            raise HTTPError(404, f"No bill with id {bill_id}")
+        return bill
+
+    def _export_path(self, output_file):
+        """
+        Places a requested export file name in the export directory. Only the file name is
+        kept, so requests can't write anywhere else.
+        """
+        if output_file is not None and not isinstance(output_file, str):
+            raise HTTPError(400, "output_file must be a file name.")
+        file_name = os.path.basename(output_file or EXPORT_FILE_NAME)
+        if not file_name.endswith('.xlsx'):
+            raise HTTPError(400, "output_file must be an .xlsx file name.")
+        return os.path.join(self.export_dir, file_name)
+
+    def _list_bills(self, query_string):
+        """
+        Returns the bills matching a ?q= query, a page at a time if page or page_size is given.
+        """
+        params = {key: values[-1] for key, values in parse_qs(query_string).items()}
+        try:
+            matches = self.bill_index.find(**parse_bill_query(params.get('q', '')))
+            if 'page' not in params and 'page_size' not in params:
+                return {'bills': matches, 'total': len(matches)}
+            page_size = int(params.get('page_size', 50))
+            if page_size <= 0:
+                raise ValueError("page_size must be positive.")
+            page_bills, page, pages = page_of(matches, int(params.get('page', 1)), page_size)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        return {'bills': page_bills, 'total': len(matches), 'page': page, 'pages': pages}
+
+    async def _compute(self, kind, params, job, *args, cache=False):
+        """
+        Runs job(*args) in the worker pool. Identical requests (same kind, parameters and
+        bills revision) that arrive while it runs await the same result instead of
+        starting another computation.
+        """
+        key = (kind, self.bills_revision, json.dumps(params, sort_keys=True, default=json_default))
+        if cache and key in self.plan_cache:
+            self.plan_cache.move_to_end(key)
+            return self.plan_cache[key]
+        if key in self.in_flight:
+            return await asyncio.shield(self.in_flight[key])
+
+        # The pool pickles the arguments later, so copy them now: bills edited in the meantime
+        # must not end up in a result cached under this revision
+        args = copy.deepcopy(args)
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.pool, job, *args)
+        self.in_flight[key] = future
+        try:
+            result = await future
+        finally:
+            del self.in_flight[key]
+
+        if cache:
+            self.plan_cache[key] = result
+            if len(self.plan_cache) > PLAN_CACHE_SIZE:
+                self.plan_cache.popitem(last=False)
+        return result
+
+    async def handle(self, method, path, body):
+        """
+        Routes a request and returns (status, response_dict).
+        """
+        path, _, query_string = path.partition('?')
+        parts = [part for part in path.split('/') if part]
+
+        if parts == ['health']:
+            return 200, {'status': 'ok', 'bills': len(self.bills), 'cached_plans': len(self.plan_cache)}
+
+        if parts == ['bills']:
+            if method == 'GET':
+                return 200, self._list_bills(query_string)
+            if method == 'POST':
+                try:
+                    bill = build_bill_template(body)
+                except ValueError as e:
+                    raise HTTPError(400, str(e))
+                self.bill_index.add(bill)
+                self._bills_changed()
+                return 201, bill
+
+        if len(parts) == 2 and parts[0] == 'bills':
+            bill = self._find_bill(parts[1])
+            if method == 'GET':
+                return 200, bill
+            if method == 'PATCH':
+                try:
+                    update_bill_template(bill, body)
+                except ValueError as e:
+                    raise HTTPError(400, str(e))
+                self.bill_index.update(bill)
+                self._bills_changed()
+                return 200, bill
+
+        if method == 'POST' and parts == ['plan']:
+            self._check_plan_params(body)
+            return 200, await self._compute('plan', body, plan_job, self.bills, body, cache=True)
+
+        if method == 'POST' and parts == ['optimize']:
+            debt = next((b for b in self.bills if b.get('is_debt') and body.get('debt') in (b['id'], b['name'])), None)
+            if debt is None:
+                raise HTTPError(404, f"No debt with id or name {body.get('debt')!r}")
+            try:
+                return 200, await self._compute('optimize', body, optimize_job, debt, body, cache=True)
+            except ValueError as e:
+                raise HTTPError(400, str(e))
+
+        if method == 'POST' and parts == ['export']:
+            self._check_plan_params(body)
+            params = dict(body, output_file=self._export_path(body.get('output_file')))
+            return 200, await self._compute('export', params, export_job, self.bills, params)
+
+        if parts and parts[0] in ('health', 'bills', 'plan', 'optimize', 'export'):
+            raise HTTPError(405, f"{method} is not supported on /{'/'.join(parts)}")
+        raise HTTPError(404, f"Unknown endpoint: {path}")
+
+    def _check_plan_params(self, params):
+        try:
+            build_pay_calendar(params)
+        except (KeyError, TypeError, ValueError) as e:
+            raise HTTPError(400, f"Invalid plan parameters: {e}")
+
+    def _check_request(self, method, headers):
+        """
+        Rejects requests a web page on another site could send: a browser makes a
+        cross-origin POST without asking first only if it isn't JSON, so changes must be
+        JSON, and any Origin a browser adds must be the service's own.
+        """
+        origin = headers.get('origin')
+        if origin is not None and urlsplit(origin).netloc != headers.get('host'):
+            raise HTTPError(403, f"Requests from {origin} are not allowed.")
+        if method in ('POST', 'PATCH'):
+            content_type = headers.get('content-type', '').partition(';')[0].strip().lower()
+            if content_type != 'application/json':
+                raise HTTPError(415, "Request body must be sent as application/json.")
+
+    async def serve_connection(self, reader, writer):
+        """
+        Serves HTTP/1.1 requests on one connection, keeping it alive between requests.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                try:
+                    length = int(headers.get('content-length', 0))
+                    if length > MAX_BODY_BYTES:
+                        raise HTTPError(413, "Request body too large.")
+                    raw_body = await reader.readexactly(length) if length else b''
+                    self._check_request(method.upper(), headers)
+                    try:
+                        body = json.loads(raw_body) if raw_body else {}
+                    except json.JSONDecodeError:
+                        raise HTTPError(400, "Request body must be JSON.")
+                    if not isinstance(body, dict):
+                        raise HTTPError(400, "Request body must be a JSON object.")
+                    status, response = await self.handle(method.upper(), path, body)
+                except HTTPError as e:
+                    status, response = e.status, {'error': e.message}
+                except Exception as e: # Keep the service up; report the failure to the caller
+                    status, response = 500, {'error': f"{type(e).__name__}: {e}"}
+
+                payload = json.dumps(response, default=json_default).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+async def serve(host, port, bills_path, workers=None, export_dir=EXPORT_DIR):
+    service = PlanService(bills_path, workers, export_dir)
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    print(f"MonteBuster plan service listening on http://{host}:{port} (bills: {bills_path})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the MonteBuster plan service.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--bills', default=os.path.join('data', 'bills.json'), help="Path to the bills JSON file.")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes for plan runs (default: CPU count).")
+    parser.add_argument('--export-dir', default=EXPORT_DIR, help="Directory POST /export writes spreadsheets to.")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.bills, args.workers, args.export_dir))
+    except KeyboardInterrupt:
+        print("Plan service stopped.")
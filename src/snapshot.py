@@ -0,0 +1,383 @@
+import argparse
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+from main import _normalize_bill_fields, expand_debt_history, generate_spreadsheet_output
+from money import from_cents
+
+# --- Plan Snapshots ---
+#
+# A snapshot stores a finished plan's paychecks, paid and unpaid bills and monthly debt
+# history as fixed-width NumPy structured arrays in one binary file:
+#
+#     python src/snapshot.py report plan.mbsnap
+#     python src/snapshot.py diff base.mbsnap variant.mbsnap
+#     python src/snapshot.py export plan.mbsnap financial_plan.xlsx
+#
+# Snapshots are written by headless runs with "output": {"snapshot": "plan.mbsnap"}, or
+# from Python with write_snapshot(). Reading one memory-maps the file: every array is a
+# view into the mapping, so reports and diffs run without parsing or copying the plan.
+#
+# File layout (all integers little-endian):
+#
+#     magic (8 bytes) | version (uint32) | header length (uint32) | JSON header
+#     | arrays, each starting on a 64-byte boundary
+#
+# The JSON header holds the plan name, the string table (bill names, categories, income
+# sources and debt names are stored as indexes into it), the bill templates and each
+# array's offset and length. Money is in integer cents (see money.py).
+
+SNAPSHOT_MAGIC = b'MBSNAP\x00\x00'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_ALIGNMENT = 64
+_PREAMBLE = struct.Struct('<8sII')
+
+PAYCHECK_DTYPE = np.dtype([
+    ('pay_date', '<M8[D]'),
+    ('source', '<i4'), # String index, -1 for a single paycheck schedule
+    ('net_pay', '<i8'),
+    ('initial_balance', '<i8'),
+    ('remaining_balance', '<i8'),
+    ('first_bill', '<i8'), # The paycheck's bills are bills[first_bill:first_bill + bill_count]
+    ('bill_count', '<i4')
+])
+
+BILL_DTYPE = np.dtype([
+    ('paycheck', '<i4'), # Index of the paying paycheck, -1 for unpaid bills
+    ('name', '<i4'),
+    ('category', '<i4'),
+    ('due_date', '<M8[D]'),
+    ('amount', '<i8'),
+    ('is_debt', '?')
+])
+
+DEBT_DTYPE = np.dtype([
+    ('name', '<i4'),
+    ('current_balance', '<f8'), # Dollars, as the debt simulation keeps it
+    ('credit_limit', '<f8'),
+    ('payoff_date', '<M8[D]'), # NaT when not paid off
+    ('first_row', '<i8'), # The debt's months are history[first_row:first_row + row_count]
+    ('row_count', '<i8')
+])
+
+HISTORY_DTYPE = np.dtype([
+    ('debt', '<i4'), # Index into debts
+    ('date', '<M8[D]'),
+    ('balance_start_of_month', '<i8'),
+    ('total_fees_charged', '<i8'),
+    ('payments_made', '<i8'),
+    ('interest_accrued', '<i8'),
+    ('principal_paid', '<i8'),
+    ('balance_end_of_month', '<i8')
+])
+
+SNAPSHOT_ARRAYS = {'paychecks': PAYCHECK_DTYPE, 'bills': BILL_DTYPE, 'debts': DEBT_DTYPE, 'history': HISTORY_DTYPE}
+
+def _padding(offset):
+    return -offset % SNAPSHOT_ALIGNMENT
+
+def _data_start(header_length):
+    end_of_header = _PREAMBLE.size + header_length
+    return end_of_header + _padding(end_of_header)
+
+def _build_arrays(bill_instances, final_pay_periods, debt_progress_report, string_index):
+    """
+    Converts plan results to the snapshot's structured arrays.
+    """
+    def string(value):
+        return string_index.setdefault(value, len(string_index))
+
+    paychecks = np.zeros(len(final_pay_periods), dtype=PAYCHECK_DTYPE)
+    bill_rows = []
+    for index, pp in enumerate(final_pay_periods):
+        source = pp.get('source')
+        paychecks[index] = (pp['pay_date'], -1 if source is None else string(source), pp['net_pay'],
+                            pp['initial_balance_for_period'], pp['remaining_balance'], len(bill_rows), len(pp['assigned_bills']))
+        bill_rows.extend((index, string(bill['name']), string(bill['category']), bill['due_date'], bill['amount'],
+                          bill.get('is_debt', False)) for bill in pp['assigned_bills'])
+    bill_rows.extend((-1, string(bill['name']), string(bill['category']), bill['due_date'], bill['amount'], bill.get('is_debt', False))
+                     for bill in bill_instances if bill['paid_by_paycheck_date'] is None)
+    bills = np.array(bill_rows, dtype=BILL_DTYPE)
+
+    debts = np.zeros(len(debt_progress_report), dtype=DEBT_DTYPE)
+    history_rows = []
+    for index, debt_data in enumerate(debt_progress_report.values()):
+        first_row = len(history_rows)
+        history_rows.extend(
+            (index, row['date'], row['balance_start_of_month'], row['total_fees_charged'], row['payments_made'],
+             row['interest_accrued'], row['principal_paid'], row['balance_end_of_month'])
+            for row in expand_debt_history(debt_data)
+        )
+        debts[index] = (string(debt_data['name']), debt_data['current_balance'], debt_data['credit_limit'],
+                        debt_data['payoff_date'] or np.datetime64('NaT'), first_row, len(history_rows) - first_row)
+    history = np.array(history_rows, dtype=HISTORY_DTYPE)
+    return {'paychecks': paychecks, 'bills': bills, 'debts': debts, 'history': history}
+
+def write_snapshot(path, bill_instances, final_pay_periods, debt_progress_report, bill_templates, name=None):
+    """
+    Writes a plan (the outputs of run_plan_engine() and the bill templates it was built
+    from) to a snapshot file. The file is written next to path and then moved into place,
+    so readers never map a half-written snapshot.
+    """
+    string_index = {}
+    arrays = _build_arrays(bill_instances, final_pay_periods, debt_progress_report, string_index)
+
+    # Offsets depend on the header length, so lay the arrays out relative to the data start first
+    layout = {}
+    data_size = 0
+    for array_name in SNAPSHOT_ARRAYS:
+        data_size += _padding(data_size)
+        layout[array_name] = [data_size, len(arrays[array_name])]
+        data_size += arrays[array_name].nbytes
+
+    header = {
+        'name': name,
+        'strings': list(string_index),
+        'bill_templates': bill_templates,
+        'arrays': layout # [offset from the start of the array data, length]
+    }
+    header_bytes = json.dumps(header, default=str).encode('utf-8') # Template due dates as YYYY-MM-DD
+    data_start = _data_start(len(header_bytes))
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = path + '.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            for array_name in SNAPSHOT_ARRAYS:
+                f.write(b'\x00' * (data_start + layout[array_name][0] - f.tell()))
+                f.write(arrays[array_name].tobytes())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+class _HistoryRows:
+    """
+    A debt's monthly history rows from a snapshot, iterated as the dicts expand_debt_history()
+    yields (amounts in cents). Rows are read from the mapped file on each pass.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        for row in self.rows:
+            snapshot = {'date': row['date'].astype(object)}
+            for field in HISTORY_DTYPE.names[2:]:
+                snapshot[field] = int(row[field])
+            yield snapshot
+
+class PlanSnapshot:
+    """
+    A snapshot file mapped read-only into memory. paychecks, bills, debts and history are
+    structured array views into the file (see the dtypes above); nothing is copied until
+    rows are turned back into plan dicts by pay_periods() or debt_progress_report().
+    Raises ValueError for files that aren't snapshots or have an unsupported version.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._data = np.memmap(path, dtype=np.uint8, mode='r')
+        if len(self._data) < _PREAMBLE.size:
+            raise ValueError(f"{path} is not a MonteBuster snapshot.")
+        magic, version, header_length = _PREAMBLE.unpack(self._data[:_PREAMBLE.size].tobytes())
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a MonteBuster snapshot.")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} is snapshot version {version}; this version of MonteBuster reads version {SNAPSHOT_VERSION}.")
+        header = json.loads(self._data[_PREAMBLE.size:_PREAMBLE.size + header_length].tobytes())
+
+        self.name = header['name']
+        self.strings = header['strings']
+        self.bill_templates = header['bill_templates']
+        for template in self.bill_templates:
+            _normalize_bill_fields(template)
+        data_start = _data_start(header_length)
+        for array_name, dtype in SNAPSHOT_ARRAYS.items():
+            offset, length = header['arrays'][array_name]
+            offset += data_start
+            setattr(self, array_name, self._data[offset:offset + length * dtype.itemsize].view(dtype))
+
+    def debt_names(self):
+        return [self.strings[index] for index in self.debts['name']]
+
+    def debt_totals(self, field):
+        """
+        Returns an int64 array with one history field (e.g. 'interest_accrued') summed per
+        debt, in cents.
+        """
+        totals = np.zeros(len(self.debts), dtype=np.int64)
+        np.add.at(totals, self.history['debt'], self.history[field])
+        return totals
+
+    def unpaid_bills(self):
+        return self.bills[self.bills['paycheck'] < 0]
+
+    def _bill_dict(self, row):
+        return {
+            'name': self.strings[row['name']],
+            'category': self.strings[row['category']],
+            'due_date': row['due_date'].astype(object),
+            'amount': int(row['amount']),
+            'is_debt': bool(row['is_debt'])
+        }
+
+    def pay_periods(self):
+        """
+        Rebuilds the plan's paycheck dicts, as returned by run_plan_engine().
+        """
+        pay_periods = []
+        for pp in self.paychecks:
+            first = int(pp['first_bill'])
+            paycheck_info = {
+                'pay_date': pp['pay_date'].astype(object),
+                'net_pay': int(pp['net_pay']),
+                'initial_balance_for_period': int(pp['initial_balance']),
+                'assigned_bills': [self._bill_dict(row) for row in self.bills[first:first + pp['bill_count']]],
+                'remaining_balance': int(pp['remaining_balance'])
+            }
+            for bill in paycheck_info['assigned_bills']:
+                bill['paid_by_paycheck_date'] = paycheck_info['pay_date']
+            if pp['source'] >= 0:
+                paycheck_info['source'] = self.strings[pp['source']]
+            pay_periods.append(paycheck_info)
+        return pay_periods
+
+    def debt_progress_report(self):
+        """
+        Rebuilds the plan's debt report. Each debt's 'history' reads its rows from the
+        mapped file, so expand_debt_history() and the spreadsheet export work unchanged.
+        """
+        report = {}
+        for debt, name in zip(self.debts, self.debt_names()):
+            first = int(debt['first_row'])
+            report[name] = {
+                'name': name,
+                'current_balance': float(debt['current_balance']),
+                'credit_limit': float(debt['credit_limit']),
+                'payoff_date': None if np.isnat(debt['payoff_date']) else debt['payoff_date'].astype(object),
+                'history': _HistoryRows(self.history[first:first + debt['row_count']])
+            }
+        return report
+
+def snapshot_summary(plan):
+    """
+    Summarizes a mapped snapshot straight from its arrays: lowest remaining balance,
+    unpaid bills and each debt's payoff date, interest and fees (dollars).
+    """
+    remaining = plan.paychecks['remaining_balance']
+    unpaid = plan.unpaid_bills()
+    interest, fees = plan.debt_totals('interest_accrued'), plan.debt_totals('total_fees_charged')
+    return {
+        'name': plan.name,
+        'paychecks': len(plan.paychecks),
+        'lowest_remaining_balance': from_cents(int(remaining.min())) if len(remaining) else 0.0,
+        'total_remaining_balance': from_cents(int(remaining.sum())),
+        'unpaid_bills': len(unpaid),
+        'unpaid_amount': from_cents(int(unpaid['amount'].sum())),
+        'debts': [
+            {
+                'name': name,
+                'payoff_date': None if np.isnat(debt['payoff_date']) else debt['payoff_date'].astype(object),
+                'current_balance': round(float(debt['current_balance']), 2),
+                'total_interest': from_cents(int(debt_interest)),
+                'total_fees': from_cents(int(debt_fees))
+            }
+            for name, debt, debt_interest, debt_fees in zip(plan.debt_names(), plan.debts, interest, fees)
+        ]
+    }
+
+def print_snapshot_summary(summary):
+    print(f"\n--- Snapshot: {summary['name'] or 'plan'} ---")
+    print(f"  Paychecks: {summary['paychecks']} | Lowest remaining balance: ${summary['lowest_remaining_balance']:.2f}"
+          f" | Unpaid bills: {summary['unpaid_bills']} (${summary['unpaid_amount']:.2f})")
+    for debt in summary['debts']:
+        payoff = debt['payoff_date'].strftime('%Y-%m') if debt['payoff_date'] else f"not paid off (${debt['current_balance']:.2f} left)"
+        print(f"  - {debt['name']}: {payoff}, interest ${debt['total_interest']:.2f}, fees ${debt['total_fees']:.2f}")
+
+def diff_snapshots(base, other):
+    """
+    Compares two mapped snapshots paycheck by paycheck (by position) and debt by debt
+    (by name). Differences are other minus base, in dollars.
+    """
+    count = min(len(base.paychecks), len(other.paychecks))
+    deltas = other.paychecks['remaining_balance'][:count] - base.paychecks['remaining_balance'][:count]
+    changed = np.flatnonzero(deltas)
+
+    base_debts = dict(zip(base.debt_names(), zip(base.debts['payoff_date'], base.debt_totals('interest_accrued'))))
+    other_debts = dict(zip(other.debt_names(), zip(other.debts['payoff_date'], other.debt_totals('interest_accrued'))))
+    debt_deltas = {}
+    for name in sorted(base_debts.keys() | other_debts.keys()):
+        base_payoff, base_interest = base_debts.get(name, (np.datetime64('NaT'), 0))
+        other_payoff, other_interest = other_debts.get(name, (np.datetime64('NaT'), 0))
+        payoff_months_delta = None
+        if not np.isnat(base_payoff) and not np.isnat(other_payoff):
+            payoff_months_delta = int(other_payoff.astype('M8[M]').astype(np.int64) - base_payoff.astype('M8[M]').astype(np.int64))
+        debt_deltas[name] = {
+            'interest_delta': from_cents(int(other_interest) - int(base_interest)),
+            'payoff_months_delta': payoff_months_delta
+        }
+
+    return {
+        'paychecks_compared': count,
+        'paychecks_added': len(other.paychecks) - count,
+        'paychecks_removed': len(base.paychecks) - count,
+        'total_remaining_delta': from_cents(int(deltas.sum())),
+        'lowest_remaining_delta': from_cents(int(other.paychecks['remaining_balance'].min(initial=0)) - int(base.paychecks['remaining_balance'].min(initial=0))),
+        'changed_paychecks': [
+            {'pay_date': base.paychecks['pay_date'][index].astype(object), 'delta': from_cents(int(deltas[index]))}
+            for index in changed
+        ],
+        'debt_deltas': debt_deltas
+    }
+
+def print_snapshot_diff(diff):
+    print("\n--- Snapshot Difference (second minus first) ---")
+    print(f"  Paychecks compared: {diff['paychecks_compared']}"
+          f" (+{diff['paychecks_added']} added, -{diff['paychecks_removed']} removed)")
+    print(f"  Remaining balance over all paychecks: {diff['total_remaining_delta']:+.2f}"
+          f" | Lowest paycheck balance: {diff['lowest_remaining_delta']:+.2f}")
+    for change in diff['changed_paychecks']:
+        print(f"  - {change['pay_date'].strftime('%m-%d-%Y')}: {change['delta']:+.2f}")
+    for name, delta in diff['debt_deltas'].items():
+        payoff = f"{delta['payoff_months_delta']:+d} months" if delta['payoff_months_delta'] is not None else "n/a"
+        print(f"  - {name}: interest {delta['interest_delta']:+.2f}, payoff {payoff}")
+
+def export_snapshot(plan, output_file):
+    """
+    Writes the spreadsheet for a mapped snapshot, without rerunning the plan.
+    """
+    generate_spreadsheet_output(plan.pay_periods(), plan.debt_progress_report(), output_file, plan.bill_templates)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report on, compare and export MonteBuster plan snapshots.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('report', help="Summarize a snapshot.").add_argument('snapshot')
+    diff_parser = commands.add_parser('diff', help="Compare two snapshots.")
+    diff_parser.add_argument('base')
+    diff_parser.add_argument('other')
+    export_parser = commands.add_parser('export', help="Write a snapshot's spreadsheet.")
+    export_parser.add_argument('snapshot')
+    export_parser.add_argument('output_file')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'report':
+            print_snapshot_summary(snapshot_summary(PlanSnapshot(args.snapshot)))
+        elif args.command == 'diff':
+            print_snapshot_diff(diff_snapshots(PlanSnapshot(args.base), PlanSnapshot(args.other)))
+        else:
+            export_snapshot(PlanSnapshot(args.snapshot), args.output_file)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
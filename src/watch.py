@@ -0,0 +1,261 @@
+import argparse
+import os
+import sys
+import time
+
+from export_pipeline import ExportError, ExportPipeline
+from headless import load_scenario, print_scenario_summary, run_scenario
+from main import load_bills
+
+# --- Watch Mode ---
+#
+# Keeps a plan up to date while you edit your bills:
+#
+#     python src/watch.py scenario.json
+#     python src/watch.py --bills data/bills.json --net-pay 2500 --start-date 2026-11-06
+#
+# The bills file (and the scenario and goals files, if any) are polled with os.stat, which
+# is cheap. Once a change has settled for the debounce time, the bills are reloaded and
+# compared with the previous version, and the plan is run again and its outputs rewritten.
+# The process stays running, so imports, the parsed scenario and bill due date expansions
+# of unchanged bills are reused from one run to the next.
+
+IGNORED_BILL_FIELDS = {'paid_by_paycheck_date'}
+
+def diff_bill_templates(old_bills, new_bills):
+    """
+    Compares two versions of the bill templates by id.
+
+    Returns:
+        dict: 'added' and 'removed' bills, and 'changed' as (bill, [changed field names]) pairs.
+    """
+    old_by_id = {bill.get('id') or bill['name']: bill for bill in old_bills} # Bills saved before ids existed go by name
+    new_by_id = {bill.get('id') or bill['name']: bill for bill in new_bills}
+    changed = []
+    for bill_id, bill in new_by_id.items():
+        old_bill = old_by_id.get(bill_id)
+        if old_bill is None:
+            continue
+        fields = sorted(key for key in set(old_bill) | set(bill)
+                        if key not in IGNORED_BILL_FIELDS and old_bill.get(key) != bill.get(key))
+        if fields:
+            changed.append((bill, fields))
+    return {
+        'added': [bill for bill_id, bill in new_by_id.items() if bill_id not in old_by_id],
+        'removed': [bill for bill_id, bill in old_by_id.items() if bill_id not in new_by_id],
+        'changed': changed
+    }
+
+def _describe_diff(diff):
+    parts = []
+    if diff['added']:
+        parts.append("added " + ", ".join(bill['name'] for bill in diff['added']))
+    if diff['removed']:
+        parts.append("removed " + ", ".join(bill['name'] for bill in diff['removed']))
+    if diff['changed']:
+        parts.append("edited " + ", ".join(f"{bill['name']} ({', '.join(fields)})" for bill, fields in diff['changed']))
+    return "; ".join(parts)
+
+def _changed_paychecks(old_result, new_result):
+    """
+    Returns the pay dates whose paycheck (bills, remaining balance, savings) differs between two runs.
+    """
+    old_paychecks = {paycheck.pay_date: paycheck for paycheck in old_result.paychecks}
+    return [paycheck.pay_date for paycheck in new_result.paychecks if old_paychecks.get(paycheck.pay_date) != paycheck]
+
+def _changed_debts(old_result, new_result):
+    """
+    Returns the names of debts whose payoff, balance, interest or fees differ between two runs.
+    """
+    def outcome(debt):
+        return (debt.payoff_date, debt.current_balance, debt.total_interest, debt.total_fees)
+    old_debts = {debt.name: outcome(debt) for debt in old_result.debts}
+    return [debt.name for debt in new_result.debts if old_debts.get(debt.name) != outcome(debt)]
+
+class PlanWatcher:
+    """
+    Watches a scenario's bills source and re-runs the scenario (see headless.run_scenario)
+    when it changes, writing its outputs again.
+
+    Changes are found by polling file sizes and modification times. A change is acted on
+    once the files have stayed the same for `debounce` seconds, so an editor's save (or a
+    burst of saves) triggers one run. If the bills can't be read, say mid-write, the
+    previous plan is kept and the next change is waited for.
+    """
+
+    def __init__(self, scenario_path=None, scenario=None, interval=1.0, debounce=0.5, export=True):
+        self.scenario_path = scenario_path
+        self.scenario = scenario
+        self.interval = interval
+        self.debounce = debounce
+        self.export = export
+        self.export_pipeline = ExportPipeline()
+        self.bills = None
+        self.result = None
+        self.due_date_cache = {} # Due date expansions of unchanged bills are reused
+        self.runs = 0
+        self._seen_signature = None
+        self._seen_at = None
+        self._processed_signature = None
+        self._scenario_signature = None
+        self._goals_signature = None
+        if scenario_path is not None:
+            self._load_scenario()
+
+    def _load_scenario(self):
+        self.scenario = load_scenario(self.scenario_path)
+        self._scenario_signature = self._stat(self.scenario_path)
+        self.due_date_cache = {} # Pay settings may have changed
+
+    def watched_paths(self):
+        """
+        Returns the files whose changes trigger a new run.
+        """
+        paths = [self.scenario['bills']]
+        if self.scenario_path is not None:
+            paths.append(self.scenario_path)
+        if self._goals_path() is not None:
+            paths.append(self._goals_path())
+        return paths
+
+    @staticmethod
+    def _stat(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None # Missing, e.g. while an editor replaces the file
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _goals_path(self):
+        goals = self.scenario.get('goals')
+        return goals if isinstance(goals, str) else None
+
+    def _signature(self):
+        return tuple(self._stat(path) for path in self.watched_paths())
+
+    def refresh(self):
+        """
+        Reloads the bills and, if anything changed since the last run, runs the plan again.
+        Returns True if the plan was run.
+        """
+        scenario_changed = goals_changed = False
+        if self.scenario_path is not None and self._stat(self.scenario_path) != self._scenario_signature:
+            try:
+                self._load_scenario()
+            except (OSError, ValueError) as e:
+                print(f"Could not read scenario {self.scenario_path}: {e}. Keeping the previous plan.")
+                return False
+            scenario_changed = True
+        if self._goals_path() is not None:
+            goals_signature = self._stat(self._goals_path())
+            goals_changed, self._goals_signature = goals_signature != self._goals_signature, goals_signature
+
+        try:
+            bills = load_bills(self.scenario['bills'])
+        except (OSError, ValueError) as e:
+            print(f"Could not read bills from {self.scenario['bills']}: {e}. Keeping the previous plan.")
+            return False
+
+        if self.bills is not None:
+            diff = diff_bill_templates(self.bills, bills)
+            description = _describe_diff(diff)
+            if not description and not scenario_changed and not goals_changed:
+                print(f"[{time.strftime('%H:%M:%S')}] {self.scenario['bills']} was saved without changes.")
+                self.bills = bills
+                return False
+            print(f"\n[{time.strftime('%H:%M:%S')}] Changed: {description or ('scenario changed' if scenario_changed else 'goals changed')}")
+
+        started = time.perf_counter()
+        try:
+            result = run_scenario(self.scenario, bills, export=self.export, export_pipeline=self.export_pipeline,
+                                  due_date_cache=self.due_date_cache)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error running the plan: {e}. Keeping the previous plan.")
+            return False
+        elapsed = time.perf_counter() - started
+
+        if self.result is not None and not scenario_changed:
+            changed_paychecks = _changed_paychecks(self.result, result)
+            changed_debts = _changed_debts(self.result, result)
+            first_changed = f", from {changed_paychecks[0].strftime('%m-%d-%Y')}" if changed_paychecks else ""
+            print(f"  {len(changed_paychecks)} of {len(result.paychecks)} pay periods changed{first_changed}; "
+                  f"debts changed: {', '.join(changed_debts) or 'none'}")
+        print_scenario_summary(result)
+        print(f"  Re-planned in {elapsed * 1000:.0f} ms" + (f"; writing {result.output_file}" if result.output_file else ""))
+
+        self.bills = bills
+        self.result = result
+        self.runs += 1
+        return True
+
+    def poll(self):
+        """
+        Checks the watched files once and runs the plan if a change has settled.
+        Returns True if the plan was run.
+        """
+        try:
+            self.export_pipeline.raise_failures()
+        except ExportError as e:
+            print(f"Error writing spreadsheet: {e}")
+
+        signature = self._signature()
+        now = time.monotonic()
+        if signature != self._seen_signature:
+            self._seen_signature, self._seen_at = signature, now
+            return False
+        if signature == self._processed_signature or now - self._seen_at < self.debounce or None in signature:
+            return False
+        self._processed_signature = signature
+        return self.refresh()
+
+    def run(self, max_runs=None):
+        """
+        Runs the plan, then watches for changes until interrupted (or max_runs plans have run).
+        """
+        self._seen_signature = self._processed_signature = self._signature()
+        self.refresh()
+        print(f"\nWatching {', '.join(self.watched_paths())} for changes (Ctrl+C to stop)...")
+        try:
+            while max_runs is None or self.runs < max_runs:
+                time.sleep(self.interval)
+                self.poll()
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+        finally:
+            try:
+                self.export_pipeline.close() # Finish writing the last outputs
+            except ExportError as e:
+                print(f"Error writing spreadsheet: {e}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-run a MonteBuster plan whenever its bills change.")
+    parser.add_argument('scenario', nargs='?', help="Scenario JSON file (see headless.py).")
+    parser.add_argument('--bills', default=os.path.join('data', 'bills.json'), help="Bills file to watch without a scenario.")
+    parser.add_argument('--num-paychecks', type=int, default=26)
+    parser.add_argument('--net-pay', type=float)
+    parser.add_argument('--start-date', help="First payday (YYYY-MM-DD).")
+    parser.add_argument('--pay-frequency', default='bi-weekly')
+    parser.add_argument('--output', default=os.path.join('data', 'financial_plan.xlsx'), help="Spreadsheet to write without a scenario.")
+    parser.add_argument('--interval', type=float, default=1.0, help="Seconds between checks (default 1).")
+    parser.add_argument('--debounce', type=float, default=0.5, help="Seconds a change must settle before re-planning (default 0.5).")
+    parser.add_argument('--no-export', action='store_true', help="Skip writing the outputs.")
+    args = parser.parse_args()
+
+    try:
+        if args.scenario:
+            watcher = PlanWatcher(args.scenario, interval=args.interval, debounce=args.debounce, export=not args.no_export)
+        elif args.net_pay is not None and args.start_date:
+            scenario = {
+                'name': os.path.basename(args.bills),
+                'bills': args.bills,
+                'pay': {'num_paychecks': args.num_paychecks, 'net_pay': args.net_pay,
+                        'start_date': args.start_date, 'pay_frequency': args.pay_frequency},
+                'output': {'spreadsheet': args.output}
+            }
+            watcher = PlanWatcher(scenario=scenario, interval=args.interval, debounce=args.debounce, export=not args.no_export)
+        else:
+            parser.error("Give a scenario file, or --net-pay and --start-date.")
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    watcher.run()
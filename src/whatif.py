@@ -0,0 +1,284 @@
+import argparse
+import os
+
+import pandas as pd
+
+from headless import build_pay_calendar, load_scenario, run_plan
+from main import build_bill_template, expand_debt_history, load_bills
+from money import from_cents
+
+# --- What-If Scenario Comparison ---
+#
+# Compares variants of a base plan, e.g. "rent goes up $200" or "drop the gym membership":
+#
+#     python src/whatif.py whatif.json
+#
+# The file is a scenario file (see headless.py) with a list of variants:
+#
+#     "variants": [
+#         {"name": "Rent +200", "overrides": {"Rent": {"amount": 1200}}},
+#         {"name": "No gym", "remove": ["Gym"]},
+#         {"name": "New car", "add": [{"name": "Car 2", "due_date": "2026-11-15", "amount": 350,
+#                                      "is_recurring": true}]},
+#         {"name": "Raise", "pay": {"net_pay": 2700}}
+#     ]
+#
+# The comparison workbook goes to the scenario's output.whatif, or next to the plan workbook
+# as <spreadsheet>_whatif.xlsx; the plan workbook itself is never overwritten.
+#
+# Bills are matched by id or name. A variant shares every template it doesn't override with
+# the base list, and all plans reuse one due date expansion cache, so comparing N variants
+# costs far less than N full runs.
+
+def _matches(template, keys):
+    return template['id'] in keys or template['name'] in keys
+
+def apply_variant(base_bills, variant):
+    """
+    Returns the bill templates for a variant without copying the base list's templates:
+    overridden templates are rebuilt as new dicts, removed ones are left out, added ones
+    appended, and every other template is the base template object itself.
+    Raises ValueError for overrides or removals that match no bill, or invalid fields.
+    """
+    overrides = variant.get('overrides', {})
+    removals = set(variant.get('remove', []))
+    unmatched = (set(overrides) | removals) - {key for template in base_bills for key in (template['id'], template['name'])}
+    if unmatched:
+        raise ValueError(f"Variant '{variant.get('name')}' refers to unknown bills: {', '.join(sorted(unmatched))}")
+
+    bills = []
+    for template in base_bills:
+        if _matches(template, removals):
+            continue
+        fields = overrides.get(template['id'], overrides.get(template['name']))
+        if fields:
+            # id stays the same so the variant's bill lines up with the base bill
+            template = build_bill_template({**template, **fields, 'id': template['id']})
+        bills.append(template)
+    bills.extend(build_bill_template(fields) for fields in variant.get('add', []))
+    return bills
+
+def _months_between(base_date, variant_date):
+    if base_date is None or variant_date is None:
+        return None
+    return (variant_date.year - base_date.year) * 12 + variant_date.month - base_date.month
+
+def _plan_summary(final_pay_periods, debt_progress_report):
+    """
+    Reduces a plan to what the comparison reports on, with amounts in cents.
+    """
+    debts = {}
+    for debt_name, debt_data in debt_progress_report.items():
+        debts[debt_name] = {
+            'total_interest': sum(row['interest_accrued'] for row in expand_debt_history(debt_data)),
+            'payoff_date': debt_data['payoff_date'],
+            'final_balance': debt_data['current_balance']
+        }
+    return {
+        'paychecks': [(pp['pay_date'], pp.get('source'), pp['remaining_balance']) for pp in final_pay_periods],
+        'debts': debts
+    }
+
+def _paychecks_by_key(paychecks):
+    """
+    Keys each (pay_date, source, balance) paycheck by its pay date and income source, so
+    plans with different pay calendars line up by paycheck rather than by position.
+    A repeated pay date and source is told apart by its occurrence number.
+    """
+    keyed = {}
+    occurrences = {}
+    for pay_date, source, balance in paychecks:
+        occurrence = occurrences[pay_date, source] = occurrences.get((pay_date, source), -1) + 1
+        keyed[pay_date, source, occurrence] = balance
+    return keyed
+
+def _summary_in_dollars(summary):
+    return {
+        'paychecks': [(pay_date, source, from_cents(balance)) for pay_date, source, balance in summary['paychecks']],
+        'debts': {debt_name: {**debt, 'total_interest': from_cents(debt['total_interest'])} for debt_name, debt in summary['debts'].items()}
+    }
+
+def compare_variants(base_bills, pay, variants):
+    """
+    Runs the base plan and each variant, and reports how each variant differs from the base.
+
+    Args:
+        base_bills (list): Base bill templates (not modified).
+        pay (dict): Base pay settings, as a scenario's "pay" section.
+        variants (list): Variant dicts with optional 'name', 'overrides', 'remove', 'add'
+            and 'pay' (pay settings merged over the base ones).
+
+    Returns:
+        dict: {'base': base summary, 'variants': [comparison per variant]}. Each comparison holds
+              'paycheck_deltas' (remaining balance per paycheck), 'debt_deltas' (interest and
+              payoff month changes per debt) and the change in the lowest remaining balance.
+              Paychecks are matched by pay date and income source; 'paychecks_added' and
+              'paychecks_removed' count the ones only in the variant or only in the base plan
+              (e.g. when a variant changes the pay frequency), which have no per-paycheck delta.
+              Deltas are taken exactly in cents and reported in dollars.
+    """
+    due_date_cache = {}
+    pay_calendars = {} # Variants that don't touch pay share the base calendar
+
+    def plan(bills, pay_settings):
+        key = repr(sorted(pay_settings.items()))
+        if key not in pay_calendars:
+            pay_calendars[key] = build_pay_calendar(pay_settings)
+        _, final_pay_periods, debt_progress_report = run_plan(bills, pay_settings, pay_calendars[key], due_date_cache)
+        return _plan_summary(final_pay_periods, debt_progress_report)
+
+    base = plan(base_bills, pay)
+    base_lowest = min((balance for _, _, balance in base['paychecks']), default=0)
+    base_paychecks = _paychecks_by_key(base['paychecks'])
+    comparisons = []
+    for index, variant in enumerate(variants):
+        name = variant.get('name') or f"Variant {index + 1}"
+        result = plan(apply_variant(base_bills, variant), {**pay, **variant.get('pay', {})})
+
+        variant_paychecks = _paychecks_by_key(result['paychecks'])
+        paycheck_deltas = [
+            {
+                'pay_date': pay_date,
+                'source': source,
+                'base_remaining': base_paychecks[pay_date, source, occurrence],
+                'variant_remaining': variant_balance,
+                'delta': variant_balance - base_paychecks[pay_date, source, occurrence]
+            }
+            for (pay_date, source, occurrence), variant_balance in variant_paychecks.items()
+            if (pay_date, source, occurrence) in base_paychecks
+        ]
+
+        debt_deltas = {}
+        for debt_name in base['debts'].keys() | result['debts'].keys():
+            base_debt = base['debts'].get(debt_name, {'total_interest': 0, 'payoff_date': None, 'final_balance': 0.0})
+            variant_debt = result['debts'].get(debt_name, {'total_interest': 0, 'payoff_date': None, 'final_balance': 0.0})
+            debt_deltas[debt_name] = {
+                'base_interest': base_debt['total_interest'],
+                'variant_interest': variant_debt['total_interest'],
+                'interest_delta': variant_debt['total_interest'] - base_debt['total_interest'],
+                'base_payoff_date': base_debt['payoff_date'],
+                'variant_payoff_date': variant_debt['payoff_date'],
+                'payoff_months_delta': _months_between(base_debt['payoff_date'], variant_debt['payoff_date'])
+            }
+
+        variant_lowest = min((balance for _, _, balance in result['paychecks']), default=0)
+        comparisons.append({
+            'name': name,
+            'paycheck_deltas': [
+                {**delta, 'base_remaining': from_cents(delta['base_remaining']), 'variant_remaining': from_cents(delta['variant_remaining']),
+                 'delta': from_cents(delta['delta'])}
+                for delta in paycheck_deltas
+            ],
+            'debt_deltas': {
+                debt_name: {**delta, 'base_interest': from_cents(delta['base_interest']), 'variant_interest': from_cents(delta['variant_interest']),
+                            'interest_delta': from_cents(delta['interest_delta'])}
+                for debt_name, delta in debt_deltas.items()
+            },
+            'paychecks_compared': len(paycheck_deltas),
+            'paychecks_added': len(variant_paychecks) - len(paycheck_deltas),
+            'paychecks_removed': len(base_paychecks) - len(paycheck_deltas),
+            'total_remaining_delta': from_cents(sum(delta['delta'] for delta in paycheck_deltas)),
+            'lowest_remaining_delta': from_cents(variant_lowest - base_lowest),
+            'interest_delta': from_cents(sum(delta['interest_delta'] for delta in debt_deltas.values()))
+        })
+
+    return {'base': _summary_in_dollars(base), 'variants': comparisons}
+
+def print_comparison(report):
+    """
+    Prints a one-screen comparison of each variant against the base plan.
+    """
+    print("\n--- What-If Comparison (variant minus base) ---")
+    for comparison in report['variants']:
+        print(f"\n{comparison['name']}:")
+        if comparison['paychecks_added'] or comparison['paychecks_removed']:
+            print(f"  Paychecks compared: {comparison['paychecks_compared']}"
+                  f" (+{comparison['paychecks_added']} added, -{comparison['paychecks_removed']} removed)")
+        print(f"  Remaining balance over all paychecks: {comparison['total_remaining_delta']:+.2f}"
+              f" | Lowest paycheck balance: {comparison['lowest_remaining_delta']:+.2f}"
+              f" | Interest: {comparison['interest_delta']:+.2f}")
+        for debt_name, delta in comparison['debt_deltas'].items():
+            if delta['payoff_months_delta'] is not None:
+                payoff = f"{delta['payoff_months_delta']:+d} months"
+            else:
+                payoff = f"{delta['base_payoff_date'] or 'not paid off'} -> {delta['variant_payoff_date'] or 'not paid off'}"
+            print(f"  - {debt_name}: interest {delta['interest_delta']:+.2f}, payoff {payoff}")
+
+def comparison_output_file(output):
+    """
+    Returns the file to write a scenario's comparison workbook to, or None: output.whatif,
+    or the plan spreadsheet's name with a _whatif suffix (also used if output.whatif names
+    the plan spreadsheet itself).
+    """
+    if output.get('whatif') and output['whatif'] != output.get('spreadsheet'):
+        return output['whatif']
+    if output.get('spreadsheet'):
+        stem, extension = os.path.splitext(output['spreadsheet'])
+        return f"{stem}_whatif{extension or '.xlsx'}"
+    return None
+
+def generate_comparison_spreadsheet(report, output_file):
+    """
+    Writes the comparison report to an Excel workbook: a summary sheet plus the paycheck
+    and debt deltas of every variant.
+    """
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    summary_rows = []
+    paycheck_rows = []
+    debt_rows = []
+    for comparison in report['variants']:
+        summary_rows.append({
+            'Variant': comparison['name'],
+            'Total Remaining Delta': comparison['total_remaining_delta'],
+            'Lowest Remaining Delta': comparison['lowest_remaining_delta'],
+            'Interest Delta': comparison['interest_delta'],
+            'Paychecks Compared': comparison['paychecks_compared'],
+            'Paychecks Added': comparison['paychecks_added'],
+            'Paychecks Removed': comparison['paychecks_removed']
+        })
+        for delta in comparison['paycheck_deltas']:
+            paycheck_rows.append({
+                'Variant': comparison['name'],
+                'Pay Date': delta['pay_date'],
+                'Income Source': delta['source'] or 'Paycheck',
+                'Base Remaining': delta['base_remaining'],
+                'Variant Remaining': delta['variant_remaining'],
+                'Delta': delta['delta']
+            })
+        for debt_name, delta in comparison['debt_deltas'].items():
+            debt_rows.append({
+                'Variant': comparison['name'],
+                'Debt Name': debt_name,
+                'Base Interest': delta['base_interest'],
+                'Variant Interest': delta['variant_interest'],
+                'Interest Delta': delta['interest_delta'],
+                'Base Payoff': delta['base_payoff_date'],
+                'Variant Payoff': delta['variant_payoff_date'],
+                'Payoff Months Delta': delta['payoff_months_delta']
+            })
+
+    with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
+        currency_format = writer.book.add_format({'num_format': '$#,##0.00'})
+        for sheet_name, rows, currency_columns in [
+            ('What-If Summary', summary_rows, 'B:D'),
+            ('Paycheck Deltas', paycheck_rows, 'D:F'),
+            ('Debt Deltas', debt_rows, 'C:E')
+        ]:
+            pd.DataFrame(rows).to_excel(writer, sheet_name=sheet_name, index=False)
+            worksheet = writer.sheets[sheet_name]
+            worksheet.set_column('A:A', 20)
+            worksheet.set_column('B:H', 16)
+            worksheet.set_column(currency_columns, 16, currency_format)
+    print(f"\nWhat-if comparison written to: {output_file}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare what-if variants of a MonteBuster plan.")
+    parser.add_argument('scenario', help="Scenario file with a 'variants' list.")
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.scenario)
+    report = compare_variants(load_bills(scenario['bills']), scenario.get('pay', {}), scenario.get('variants', []))
+    print_comparison(report)
+    output_file = comparison_output_file(scenario['output'])
+    if output_file:
+        generate_comparison_spreadsheet(report, output_file)
@@ -0,0 +1,31 @@
+import copy
+import os
+import sys
+from datetime import date
+
+import pytest
+
+# The modules in src/ import each other as top-level modules, as when run with python src/main.py
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+sys.path.insert(0, SRC_DIR)
+
+from main import load_bills # noqa: E402
+
+BILLS_FILE = os.path.join(os.path.dirname(SRC_DIR), 'data', 'bills.json')
+PLAN_START = date(2025, 6, 6) # A payday shortly after the sample bills' first due dates
+
+_sample_bills = load_bills(BILLS_FILE)
+
+@pytest.fixture
+def bills():
+    """
+    A fresh copy of the sample bill templates in data/bills.json.
+    """
+    return copy.deepcopy(_sample_bills)
+
+@pytest.fixture
+def pay():
+    """
+    Scenario pay settings for a year of bi-weekly paychecks.
+    """
+    return {'num_paychecks': 26, 'net_pay': 1500.0, 'start_date': PLAN_START.isoformat()}
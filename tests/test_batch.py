@@ -0,0 +1,60 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import batch
+from batch import discover_profiles, iter_batch_results, run_batch, run_profile
+from conftest import BILLS_FILE
+from headless import run_scenario
+
+def _profiles(tmp_path, names):
+    for name in names:
+        (tmp_path / name).mkdir()
+        shutil.copy(BILLS_FILE, tmp_path / name / 'bills.json')
+    return tmp_path
+
+def test_run_profile_reports_short_paychecks(tmp_path, pay):
+    profiles = _profiles(tmp_path, ['tight', 'roomy'])
+    tight = run_profile(str(profiles / 'tight'), {'pay': {**pay, 'net_pay': 1000.0}}, export=False)
+    roomy = run_profile(str(profiles / 'roomy'), {'pay': {**pay, 'net_pay': 5000.0}}, export=False)
+    assert tight['name'] == 'tight' and tight['paychecks'] == pay['num_paychecks']
+    assert 0 < tight['shortfall_paychecks'] <= tight['carried_over_bills']
+    assert roomy['shortfall_paychecks'] == roomy['carried_over_bills'] == 0
+
+def test_short_paychecks_count_carried_over_bills(bills, pay):
+    result = run_scenario({'name': 'tight', 'pay': {**pay, 'net_pay': 1000.0}}, bills=bills, export=False)
+    short = [paycheck for paycheck in result.paychecks if paycheck.carried_over_bills]
+    assert result.shortfall_paychecks == len(short) > 0
+    for paycheck in short:
+        # Each carried-over bill was due in this paycheck's window but wasn't paid by it
+        assert all(bill not in paycheck.assigned_bills for bill in paycheck.carried_over_bills)
+    roomy = run_scenario({'name': 'roomy', 'pay': {**pay, 'net_pay': 5000.0}}, bills=bills, export=False)
+    assert roomy.shortfall_paychecks == 0
+
+def test_failing_profiles_do_not_stop_the_batch(tmp_path, pay):
+    profiles = _profiles(tmp_path, ['a', 'b', 'broken'])
+    (profiles / 'broken' / 'bills.json').write_text('[]')
+    summary_file = tmp_path / 'summary.jsonl'
+    assert discover_profiles(str(profiles)) == [str(profiles / name) for name in ('a', 'b', 'broken')]
+
+    totals = run_batch(str(profiles), {'pay': pay}, workers=2, summary_file=str(summary_file), export=False)
+    assert totals['profiles'] == 3 and totals['failed'] == 1
+    summaries = {summary['profile']: summary for summary in map(json.loads, summary_file.read_text().splitlines())}
+    assert 'No bills loaded' in summaries[str(profiles / 'broken')]['error']
+    assert summaries[str(profiles / 'a')]['lowest_remaining_balance'] == summaries[str(profiles / 'b')]['lowest_remaining_balance']
+
+def _run_or_crash(profile_dir, base_scenario, export):
+    if os.path.basename(profile_dir) == 'crash':
+        os._exit(1) # The worker dies, as when it is killed for running out of memory
+    return run_profile(profile_dir, base_scenario, export)
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_a_dead_worker_fails_only_its_profile(tmp_path, pay, monkeypatch, workers):
+    monkeypatch.setattr(batch, 'run_profile', _run_or_crash)
+    profiles = _profiles(tmp_path, ['a', 'b', 'crash', 'd', 'e', 'f'])
+    summaries = {summary['profile']: summary for summary in iter_batch_results(discover_profiles(str(profiles)), {'pay': pay}, workers, export=False)}
+    assert len(summaries) == 6
+    assert [name for name in ('a', 'b', 'crash', 'd', 'e', 'f') if 'error' in summaries[str(profiles / name)]] == ['crash']
+    assert 'BrokenProcessPool' in summaries[str(profiles / 'crash')]['error']
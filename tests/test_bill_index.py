@@ -0,0 +1,58 @@
+import pytest
+
+from bill_index import BillIndex, page_of, parse_bill_query
+
+def _names(bills):
+    return [bill['name'] for bill in bills]
+
+def test_find_combines_filters(bills):
+    index = BillIndex(bills)
+    assert _names(index.find()) == _names(bills)
+    assert _names(index.find(search='car')) == ['Car Payment', 'Scottys Credit Card'] # "Card" starts with "car"
+    assert _names(index.find(search='car pay')) == ['Car Payment']
+    assert _names(index.find(search='sc cr')) == ['Scottys Credit Card'] # Each word starts a word of the name
+    assert _names(index.find(due_day=20)) == ['Pool Dues', 'Car Payment']
+    assert _names(index.find(is_debt=True)) == ['Scottys Credit Card']
+    assert 'Scottys Credit Card' not in _names(index.find(is_debt=False))
+    assert _names(index.find(category='utilities')) == ['Phone']
+    assert _names(index.find(min_amount=100, max_amount=800)) == ['Car Payment', 'Phone']
+    assert index.find(search='car pay', due_day=1) == []
+
+def test_parse_bill_query():
+    assert parse_bill_query('visa cat:credit_card due:15 debt:yes amount:50-200') == {
+        'category': 'credit card', 'due_day': 15, 'is_debt': True, 'min_amount': 50.0, 'max_amount': 200.0, 'search': 'visa'
+    }
+    assert parse_bill_query('amount:75') == {'min_amount': 75.0, 'max_amount': 75.0}
+    assert parse_bill_query('amount:-75') == {'max_amount': 75.0}
+    for text in ('due:32', 'debt:maybe', 'amount:lots'):
+        with pytest.raises(ValueError):
+            parse_bill_query(text)
+
+def test_edited_and_replaced_bills_are_reindexed(bills):
+    index = BillIndex(bills)
+    phone = index.get(bills[3]['id'])
+    phone['category'] = 'Phone Plan'
+    index.update(phone)
+    assert index.find(category='utilities') == []
+    assert _names(index.find(category='phone plan')) == ['Phone']
+
+    replacement = {**bills[0], 'name': 'Apartment Rent', 'amount': 1200.0}
+    index.update(replacement)
+    assert bills[0] is replacement
+    assert index.get(replacement['id']) is replacement
+    assert index.find(search='apartment') == [replacement]
+    assert index.find(min_amount=1100) == [replacement]
+
+def test_add_and_remove(bills):
+    index = BillIndex(bills)
+    index.add({**bills[1], 'id': 'gym', 'name': 'Gym', 'category': 'Hobby'})
+    assert _names(index.find(category='hobby')) == ['Pool Dues', 'Gym']
+    removed = index.remove(bills[1]['id'])
+    assert removed['name'] == 'Pool Dues'
+    assert _names(index.find(category='hobby')) == ['Gym']
+    assert index.get('gym') is bills[-1] and len(index) == 5
+
+def test_page_of():
+    assert page_of(list(range(7)), 2, 3) == ([3, 4, 5], 2, 3)
+    assert page_of(list(range(7)), 9, 3) == ([6], 3, 3)
+    assert page_of([], 1, 3) == ([], 1, 1)
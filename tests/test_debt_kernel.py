@@ -0,0 +1,60 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from debt_kernel import (
+    annual_rate_for_month, month_number, monthly_fee_vector, monthly_rate_vector, parse_rate_schedule, simulate_debt_batch
+)
+from main import _debt_month_step
+from money import to_cents
+
+DEBTS = [ # (balance, annual rate, monthly fee, payment, minimum payment)
+    (750.0, 0.2999, 0.0, 35.0, 35.0),
+    (5000.0, 0.1899, 5.0, 150.0, 100.0),
+    (120.0, 0.0, 0.0, 0.0, 40.0), # Paid off by the minimum in the third month
+    (2500.0, 0.2499, 0.0, 10.0, 25.0) # Payment below the minimum
+]
+
+def _scalar_run(balance, annual_rate, fee, payment, minimum_payment, months):
+    total_interest, interest_cents = 0.0, 0
+    for _ in range(months):
+        if balance <= 0:
+            break
+        interest, _, _, balance = _debt_month_step(balance, annual_rate / 12.0, fee, payment, minimum_payment)
+        total_interest += interest
+        interest_cents += to_cents(interest)
+    return total_interest, interest_cents, balance
+
+def test_batch_matches_the_one_debt_step():
+    months = 48
+    balances, rates, fees, payments, minimums = (np.array(column) for column in zip(*DEBTS))
+    result = simulate_debt_batch(balances, np.repeat((rates / 12.0)[:, None], months, axis=1), minimums, payments, fees[:, None])
+    for row, debt in enumerate(DEBTS):
+        total_interest, interest_cents, final_balance = _scalar_run(*debt, months)
+        assert result['total_interest'][row] == pytest.approx(total_interest)
+        assert result['total_interest_cents'][row] == interest_cents # Rounded per month, like plan reports
+        assert result['final_balance'][row] == pytest.approx(final_balance, abs=1e-6)
+    assert result['payoff_month'][2] == 3
+
+def test_rate_schedule_lookup():
+    schedule = parse_rate_schedule([{'start': '2027-07', 'rate': 0.2499}, {'start': '2027-01-15', 'rate': 0.0}])
+    assert schedule == [(month_number(date(2027, 1, 1)), 0.0), (month_number(date(2027, 7, 1)), 0.2499)]
+    first_month = month_number(date(2026, 11, 1))
+    rates = monthly_rate_vector(schedule, 0.1999, first_month, 12)
+    assert rates.tolist() == [annual_rate_for_month(schedule, 0.1999, first_month + offset) / 12.0 for offset in range(12)]
+    assert rates[0] == pytest.approx(0.1999 / 12) and rates[2] == 0.0 and rates[8] == pytest.approx(0.2499 / 12)
+
+@pytest.mark.parametrize('entries', [
+    [{'start': '2027-01', 'rate': -0.1}],
+    [{'start': 'soon', 'rate': 0.1}],
+    [{'start': '2027-01'}],
+    [{'start': '2027-01', 'rate': 0.1}, {'start': '2027-01-20', 'rate': 0.2}]
+])
+def test_invalid_rate_schedules_are_rejected(entries):
+    with pytest.raises(ValueError):
+        parse_rate_schedule(entries)
+
+def test_fee_vector_charges_the_annual_fee_in_its_month():
+    fees = monthly_fee_vector({'monthly_fee': 2.0, 'annual_fee': 95.0, 'annual_fee_month': 3}, month_number(date(2026, 1, 1)), 15)
+    assert fees.tolist() == [2.0, 2.0, 97.0] + [2.0] * 11 + [97.0]
@@ -0,0 +1,52 @@
+from datetime import date
+
+import pytest
+
+from main import (
+    _balance_after_months, _debt_month_step, _init_live_debt_accounts, _month_index, _months_until_payoff, _simulate_debt_events,
+    expand_debt_history
+)
+from money import to_cents
+
+def _step_months(balance, monthly_interest_rate, fees, payment, months):
+    for _ in range(months):
+        _, _, _, balance = _debt_month_step(balance, monthly_interest_rate, fees, 0.0, payment)
+    return balance
+
+@pytest.mark.parametrize('monthly_interest_rate, fees', [(0.2499 / 12, 0.0), (0.1899 / 12, 5.0), (0.0, 2.0)])
+def test_closed_form_matches_stepping_month_by_month(monthly_interest_rate, fees):
+    balance, payment = 2000.0, 90.0
+    months = _months_until_payoff(balance, monthly_interest_rate, fees, payment, 240)
+    assert 0 < months < 240
+    assert _balance_after_months(balance, monthly_interest_rate, fees, payment, months) == \
+           pytest.approx(_step_months(balance, monthly_interest_rate, fees, payment, months))
+    assert _step_months(balance, monthly_interest_rate, fees, payment, months) > 0 # Still owing before the payoff month
+    assert _step_months(balance, monthly_interest_rate, fees, payment, months + 1) == 0
+
+def test_minimum_below_interest_never_pays_off():
+    assert _months_until_payoff(10000.0, 0.2999 / 12, 0.0, 100.0, 60) == 60
+    assert _months_until_payoff(500.0, 0.0, 25.0, 25.0, 60) == 60 # The payment only covers the fee
+
+def test_sparse_history_expands_to_the_monthly_steps():
+    debt = {'name': 'Card', 'is_debt': True, 'initial_balance': 1800.0, 'minimum_payment': 60.0, 'interest_rate': 0.2299,
+            'credit_limit': 3000.0, 'monthly_fee': 3.0, 'annual_fee': 95.0, 'annual_fee_month': 4}
+    debt_data = _init_live_debt_accounts([debt])['Card']
+    first_month = _month_index(date(2026, 1, 1))
+    payments_by_month = {first_month + 2: 400.0, first_month + 7: 250.0}
+    _simulate_debt_events(debt_data, payments_by_month, first_month, first_month + 36, verbose=False)
+    assert len(debt_data['history_segments']) < 36 # Stretches of minimum payments are stored as one segment
+
+    # The same debt stepped one month at a time
+    balance, expected = 1800.0, []
+    for month in range(first_month, first_month + 36):
+        if balance <= 0:
+            break
+        fees = 3.0 + (95.0 if month % 12 + 1 == 4 else 0.0)
+        interest, payment, principal, new_balance = _debt_month_step(balance, 0.2299 / 12, fees, payments_by_month.get(month, 0.0), 60.0)
+        expected += [to_cents(balance), to_cents(payment), to_cents(interest), to_cents(new_balance)]
+        balance = new_balance
+
+    history = [row[key] for row in expand_debt_history(debt_data)
+               for key in ('balance_start_of_month', 'payments_made', 'interest_accrued', 'balance_end_of_month')]
+    assert history == expected
+    assert debt_data['current_balance'] == pytest.approx(balance, abs=1e-6)
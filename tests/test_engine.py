@@ -0,0 +1,99 @@
+import json
+import os
+from datetime import date, timedelta
+
+import pytest
+
+from conftest import PLAN_START
+from headless import run_plan
+from main import (
+    assign_bills_to_paychecks, expand_debt_history, generate_bill_instances, run_plan_engine, simulate_debt_progress
+)
+from money import to_cents
+from pay_calendar import IncomeStream, PayCalendar
+
+# Paychecks and debt history from the original planner (src/main.py as of commit c27039a, before the
+# plan engine) on data/bills.json, in float dollars. Regenerate by running that commit's
+# generate_bill_instances/assign_bills_to_paychecks/simulate_debt_progress for each net pay. The plan
+# starts in 2030 so that neither planner moves the debt simulation up to date.today().
+BASELINE_PLAN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'baseline_plan.json')
+
+def _bill_key(bill):
+    return (bill['due_date'], bill['name'], bill['amount'], bill['paid_by_paycheck_date'])
+
+def _paycheck_key(paycheck_info):
+    return (paycheck_info['pay_date'], paycheck_info.get('source'), paycheck_info['net_pay'], paycheck_info['remaining_balance'],
+            [(bill['name'], bill['due_date'], bill['amount']) for bill in paycheck_info['assigned_bills']])
+
+def _reference_plan(bills, num_paychecks, net_pay, pay_calendar=None):
+    """
+    The plan built in three passes (instances, then paychecks, then debts) instead of one event queue.
+    The passes share their bill and debt helpers with the engine, so this only checks the engine's
+    ordering; test_engine_matches_the_original_planner checks the numbers.
+    """
+    pay_calendar = pay_calendar or PayCalendar.from_schedule('bi-weekly', PLAN_START, num_paychecks)
+    end_date = pay_calendar.next_pay_date(len(pay_calendar) - 1) + timedelta(days=31)
+    bill_instances = generate_bill_instances(bills, PLAN_START, end_date)
+    paychecks = assign_bills_to_paychecks(bill_instances, num_paychecks, net_pay, PLAN_START, pay_calendar)
+    debts = simulate_debt_progress([bill for bill in bills if bill.get('is_debt')], paychecks)
+    return bill_instances, paychecks, debts
+
+def _assert_same_plan(engine_plan, reference_plan):
+    bill_instances, paychecks, debts = engine_plan
+    reference_instances, reference_paychecks, reference_debts = reference_plan
+    assert sorted(map(_bill_key, bill_instances)) == sorted(map(_bill_key, reference_instances))
+    assert [_paycheck_key(pp) for pp in paychecks] == [_paycheck_key(pp) for pp in reference_paychecks]
+    assert debts.keys() == reference_debts.keys()
+    for debt_name, debt_data in debts.items():
+        assert list(expand_debt_history(debt_data)) == list(expand_debt_history(reference_debts[debt_name]))
+        assert debt_data['current_balance'] == pytest.approx(reference_debts[debt_name]['current_balance'])
+        assert debt_data['payoff_date'] == reference_debts[debt_name]['payoff_date']
+
+@pytest.mark.parametrize('net_pay', [1500.0, 1000.0, 700.0]) # Less pay carries bills over, then leaves them unpaid
+def test_engine_matches_reference_plan(bills, net_pay):
+    engine_plan = run_plan_engine(bills, 26, net_pay, PLAN_START, verbose=False)
+    _assert_same_plan(engine_plan, _reference_plan(bills, 26, net_pay))
+
+def test_engine_matches_reference_plan_with_income_streams(bills):
+    streams = [IncomeStream('A', 600.0, 'bi-weekly', PLAN_START), IncomeStream('B', 450.0, 'semi-monthly', PLAN_START)]
+    pay_calendar = PayCalendar.from_income_streams(streams, 30)
+    engine_plan = run_plan_engine(bills, len(pay_calendar), 0.0, PLAN_START, pay_calendar, verbose=False)
+    _assert_same_plan(engine_plan, _reference_plan(bills, len(pay_calendar), 0.0, pay_calendar))
+
+def test_engine_pays_carried_over_bills_from_later_paychecks(bills):
+    bill_instances, paychecks, _ = run_plan_engine(bills, 26, 1000.0, PLAN_START, verbose=False)
+    paid_late = [bill for bill in bill_instances if bill['paid_by_paycheck_date'] is not None and bill['paid_by_paycheck_date'] > bill['due_date']]
+    assert paid_late
+    for paycheck_info in paychecks:
+        assert paycheck_info['remaining_balance'] >= 0
+        assert paycheck_info['remaining_balance'] == paycheck_info['net_pay'] - sum(bill['amount'] for bill in paycheck_info['assigned_bills'])
+
+def _dollars_to_cents(row):
+    return {key: value if key == 'date' else to_cents(value) for key, value in row.items()}
+
+@pytest.mark.parametrize('net_pay', ['1500.00', '1000.00', '700.00'])
+def test_engine_matches_the_original_planner(bills, net_pay):
+    with open(BASELINE_PLAN_FILE) as f:
+        baseline = json.load(f)
+    expected = baseline['plans'][net_pay]
+    _, paychecks, debts = run_plan_engine(bills, baseline['num_paychecks'], float(net_pay), date.fromisoformat(baseline['start_date']), verbose=False)
+
+    # The original planner kept float dollars; the engine keeps integer cents
+    assert [(pp['pay_date'].isoformat(), pp['remaining_balance'], [[bill['name'], bill['due_date'].isoformat(), bill['amount']] for bill in pp['assigned_bills']])
+            for pp in paychecks] == \
+           [(pp['pay_date'], to_cents(pp['remaining_balance']), [[name, due_date, to_cents(amount)] for name, due_date, amount in pp['assigned_bills']])
+            for pp in expected['paychecks']]
+    assert debts.keys() == expected['debts'].keys()
+    for debt_name, debt_data in debts.items():
+        assert [{**row, 'date': row['date'].isoformat()} for row in expand_debt_history(debt_data)] == \
+               [_dollars_to_cents(row) for row in expected['debts'][debt_name]['history']]
+        assert to_cents(debt_data['current_balance']) == to_cents(expected['debts'][debt_name]['current_balance'])
+
+def test_shared_due_date_cache_gives_the_same_plan(bills, pay):
+    due_date_cache = {}
+    first = run_plan(bills, pay, due_date_cache=due_date_cache)
+    again = run_plan(bills, pay, due_date_cache=due_date_cache)
+    uncached = run_plan(bills, pay)
+    assert due_date_cache
+    for plan in (again, uncached):
+        assert [_paycheck_key(pp) for pp in plan[1]] == [_paycheck_key(pp) for pp in first[1]]
@@ -0,0 +1,30 @@
+import threading
+
+import pytest
+
+from export_pipeline import ExportError, ExportPipeline
+
+def test_exports_run_in_order_off_the_calling_thread():
+    written = []
+    def write(name):
+        written.append((name, threading.current_thread().name))
+    with ExportPipeline(max_pending=1) as pipeline:
+        for index in range(5):
+            pipeline.submit(write, index)
+    assert [name for name, _ in written] == list(range(5))
+    assert {thread for _, thread in written} == {'export-writer'}
+
+def test_failures_are_reported_and_later_exports_still_run():
+    written = []
+    def fail():
+        raise OSError("disk full")
+    pipeline = ExportPipeline()
+    pipeline.submit(fail, description='plan.xlsx')
+    pipeline.submit(written.append, 'next')
+    with pytest.raises(ExportError) as error:
+        pipeline.flush()
+    assert error.value.failures[0][0] == 'plan.xlsx' and 'disk full' in str(error.value)
+    assert written == ['next']
+    pipeline.close()
+    with pytest.raises(RuntimeError):
+        pipeline.submit(written.append, 'too late')
@@ -0,0 +1,50 @@
+from datetime import date
+
+import pytest
+
+from goals import GoalAllocator, build_goal
+from headless import build_pay_calendar, run_plan
+from money import from_cents
+
+def test_goals_take_only_the_surplus(bills, pay):
+    pay_calendar = build_pay_calendar(pay)
+    goals = [build_goal({'name': 'Emergency fund', 'target': 3000, 'saved': 500, 'min_buffer': 100, 'priority': 1}),
+             build_goal({'name': 'Vacation', 'target': 20000, 'priority': 2})]
+    allocator = GoalAllocator(goals, pay_calendar)
+    _, final_pay_periods, _ = run_plan(bills, pay, pay_calendar, goal_allocator=allocator)
+
+    contributed = {}
+    for paycheck_info in final_pay_periods:
+        assert paycheck_info['remaining_balance'] >= 0
+        for contribution in paycheck_info.get('goal_contributions', []):
+            contributed[contribution['name']] = contributed.get(contribution['name'], 0) + contribution['amount']
+        surplus = paycheck_info['net_pay'] - sum(bill['amount'] for bill in paycheck_info['assigned_bills'])
+        emergency = sum(c['amount'] for c in paycheck_info.get('goal_contributions', []) if c['name'] == 'Emergency fund')
+        assert emergency <= max(surplus - 10000, 0) # The goal's min_buffer stays in the paycheck
+
+    emergency, vacation = allocator.progress()
+    assert emergency['saved'] == 3000.0 and emergency['contributed'] == from_cents(contributed['Emergency fund']) == 2500.0
+    assert emergency['completion_date'] is not None and not emergency['projected']
+    assert vacation['contributed'] == from_cents(contributed['Vacation'])
+    assert vacation['projected'] and vacation['completion_date'] > final_pay_periods[-1]['pay_date']
+
+def test_deadline_goals_are_paced(bills, pay):
+    pay_calendar = build_pay_calendar(pay)
+    deadline = pay_calendar[9]
+    allocator = GoalAllocator([build_goal({'name': 'Car', 'target': 1000, 'deadline': deadline.isoformat()})], pay_calendar)
+    run_plan(bills, pay, pay_calendar, goal_allocator=allocator)
+    (car,) = allocator.progress()
+    assert car['saved'] == 1000.0 and car['on_track']
+    assert car['completion_date'] <= deadline
+
+@pytest.mark.parametrize('fields', [{'target': 100}, {'name': 'X', 'target': 0}, {'name': 'X', 'target': 100, 'saved': -1},
+                                    {'name': 'X', 'target': 100, 'deadline': 'June'}])
+def test_invalid_goals_are_rejected(fields):
+    with pytest.raises(ValueError):
+        build_goal(fields)
+
+def test_build_goal_defaults():
+    assert build_goal({'name': ' Fund ', 'target': '250'}) == {
+        'name': 'Fund', 'target': 250.0, 'saved': 0.0, 'min_buffer': 0.0, 'priority': 1, 'deadline': None
+    }
+    assert build_goal({'name': 'Trip', 'target': 1, 'deadline': '2027-05-01'})['deadline'] == date(2027, 5, 1)
@@ -0,0 +1,71 @@
+import json
+import shutil
+
+import pytest
+
+from calendar_export import export_scenario_calendar
+from conftest import BILLS_FILE
+from headless import build_pay_calendar, load_scenario, run_scenario
+from snapshot import PlanSnapshot, snapshot_summary
+
+@pytest.fixture
+def scenario_file(tmp_path, pay):
+    shutil.copy(BILLS_FILE, tmp_path / 'bills.json')
+    path = tmp_path / 'scenario.json'
+    path.write_text(json.dumps({
+        'pay': pay,
+        'goals': [{'name': 'Buffer', 'target': 500}],
+        'output': {'spreadsheet': 'out/plan.xlsx', 'summary': 'out/summary.json', 'snapshot': 'out/plan.mbsnap', 'calendar': 'out/plan.ics'}
+    }))
+    return path
+
+def test_load_scenario_resolves_paths(scenario_file, tmp_path):
+    scenario = load_scenario(str(scenario_file))
+    assert scenario['name'] == 'scenario'
+    assert scenario['bills'] == str(tmp_path / 'bills.json')
+    assert scenario['output']['spreadsheet'] == str(tmp_path / 'out' / 'plan.xlsx')
+    assert scenario['output']['whatif'] is None
+
+def test_run_scenario_writes_every_output(scenario_file, tmp_path):
+    scenario = load_scenario(str(scenario_file))
+    result = run_scenario(scenario)
+    assert result.output_file == scenario['output']['spreadsheet'] and (tmp_path / 'out' / 'plan.xlsx').exists()
+    assert result.goals[0].saved == 500.0
+
+    with open(scenario['output']['summary']) as f:
+        summary = json.load(f)
+    assert summary == result.to_dict()
+    assert len(summary['paychecks']) == 26 and 'carried_over_bills' in summary['paychecks'][0]
+
+    snapshot = snapshot_summary(PlanSnapshot(scenario['output']['snapshot']))
+    assert snapshot['lowest_remaining_balance'] == result.lowest_remaining_balance
+
+def test_calendar_export(scenario_file):
+    scenario = load_scenario(str(scenario_file))
+    events = export_scenario_calendar(scenario, scenario['output']['calendar'])
+    with open(scenario['output']['calendar'], newline='') as f:
+        text = f.read()
+    assert text.startswith('BEGIN:VCALENDAR\r\n') and text.endswith('END:VCALENDAR\r\n')
+    assert text.count('BEGIN:VEVENT') == events > 26 # At least one "Pay bills" event per paycheck
+    assert 'RRULE:FREQ=MONTHLY' in text
+    assert all(len(line.encode()) <= 75 for line in text.split('\r\n'))
+
+def test_pay_date_lists_and_holidays(pay):
+    calendar = build_pay_calendar({'net_pay': 1500, 'pay_dates': ['2026-01-03', '2026-01-17', '2026-01-30'], 'weekend_shift': 'previous',
+                                   'holidays': ['2026-01-02']})
+    assert [pay_date.isoformat() for pay_date in calendar] == ['2026-01-01', '2026-01-16', '2026-01-30']
+    calendar = build_pay_calendar({**pay, 'start_date': '2026-01-01', 'pay_frequency': 'semi-monthly', 'weekend_shift': 'next',
+                                   'holidays': ['2026-01-15']})
+    assert [pay_date.isoformat() for pay_date in calendar.pay_dates[:2]] == ['2026-01-16', '2026-02-02']
+    streams = build_pay_calendar({'num_paychecks': 3, 'income_streams': [
+        {'name': 'Gigs', 'amount': 300, 'pay_dates': ['2026-01-10', '2026-01-24']},
+        {'name': 'Job', 'amount': 1200, 'start_date': '2026-01-02'}
+    ]})
+    assert [deposit.source for deposits in streams.deposits for deposit in deposits] == ['Job', 'Gigs', 'Job']
+
+@pytest.mark.parametrize('pay', [{'num_paychecks': 0, 'start_date': '2026-01-02'}, {'num_paychecks': 5, 'start_date': 'soon'},
+                                 {'num_paychecks': 5, 'start_date': '2026-01-02', 'pay_frequency': 'daily'},
+                                 {'pay_dates': '2026-01-02'}, {'pay_dates': ['2026-01-02'], 'holidays': ['soon']}])
+def test_invalid_pay_settings_are_rejected(pay):
+    with pytest.raises(ValueError):
+        build_pay_calendar(pay)
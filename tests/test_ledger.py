@@ -0,0 +1,57 @@
+from datetime import date
+
+from headless import run_plan
+from ledger import DailyLedger
+
+def _paycheck(pay_date, net_pay, bills=(), contributions=()):
+    return {
+        'pay_date': pay_date,
+        'net_pay': net_pay,
+        'assigned_bills': [{'due_date': due_date, 'amount': amount} for due_date, amount in bills],
+        'goal_contributions': [{'name': 'Goal', 'amount': amount} for amount in contributions]
+    }
+
+def test_bills_leave_on_their_due_date_or_the_pay_date():
+    ledger = DailyLedger([
+        _paycheck(date(2026, 1, 2), 100000, [(date(2026, 1, 5), 30000), (date(2025, 12, 30), 5000)], [10000]),
+        _paycheck(date(2026, 1, 16), 100000, [(date(2026, 1, 20), 40000)])
+    ], opening_balance=50.0)
+    assert len(ledger) == 19 # Jan 2 to Jan 20
+    assert ledger.balance_on(date(2026, 1, 1)) == 50.0 # The opening balance before the first day
+    assert ledger.balance_on(date(2026, 1, 2)) == 50.0 + 1000.0 - 50.0 - 100.0 # A late bill leaves on the pay date
+    assert ledger.balance_on(date(2026, 1, 5)) == 600.0
+    assert ledger.balance_on(date(2026, 1, 20)) == 1200.0
+    assert ledger.balance_on(date(2027, 1, 1)) == 1200.0
+
+def test_overdraft_days():
+    # The rent leaves two days before the paycheck that covers the next bill lands
+    ledger = DailyLedger([
+        _paycheck(date(2026, 1, 2), 50000, [(date(2026, 1, 10), 60000)]),
+        _paycheck(date(2026, 1, 16), 50000, [(date(2026, 1, 20), 20000)])
+    ], threshold=100.0)
+    assert ledger.first_overdraft == date(2026, 1, 10)
+    assert ledger.first_overdraft_on_or_after(date(2026, 1, 16)) is None
+    assert ledger.days_below(0) == 6 # Jan 10 to Jan 15
+    assert ledger.days_below_threshold == 6
+    assert ledger.days_below(600) == 19
+    assert ledger.lowest_balance == -100.0
+    assert ledger.lowest_date == date(2026, 1, 10)
+    assert ledger.lowest_between(date(2026, 1, 16), date(2026, 1, 31)) == (date(2026, 1, 20), 200.0)
+    assert ledger.lowest_in_month(2026, 2) is None
+
+def test_range_minimums_match_a_scan(bills, pay):
+    _, final_pay_periods, _ = run_plan(bills, {**pay, 'net_pay': 1000.0})
+    ledger = DailyLedger(final_pay_periods, opening_balance=-200.0)
+    dates = ledger.dates().tolist()
+    balances = (ledger.balances / 100).tolist()
+    for start in range(0, len(dates), 17):
+        for end in range(start, len(dates), 23):
+            lowest = min(balances[start:end + 1])
+            assert ledger.lowest_between(dates[start], dates[end]) == (dates[start + balances[start:end + 1].index(lowest)], lowest)
+    assert ledger.days_below(0) == sum(1 for balance in balances if balance < 0)
+
+def test_empty_ledger():
+    ledger = DailyLedger([])
+    assert len(ledger) == 0
+    assert ledger.first_overdraft is None
+    assert ledger.balance_on(date(2026, 1, 1)) == 0.0
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from money import from_cents, from_cents_array, to_cents, to_cents_array
+
+@pytest.mark.parametrize('amount, cents', [
+    (0, 0), (12, 1200), (19.99, 1999), (1.005, 101), (2.675, 268), (0.125, 13),
+    (-1.005, -101), (-0.005, -1), ('42.50', 4250), (0.1 + 0.2, 30)
+])
+def test_to_cents_rounds_half_away_from_zero(amount, cents):
+    assert to_cents(amount) == cents
+
+def test_to_cents_array_rounds_like_to_cents():
+    amounts = [0.0, 19.99, 1.005, 2.675, -1.005, -0.005, 1234567.895, 0.1 + 0.2]
+    assert to_cents_array(amounts).tolist() == [to_cents(amount) for amount in amounts]
+    assert to_cents_array(amounts).dtype == np.int64
+
+def test_cents_convert_back_to_dollars():
+    assert from_cents(1999) == 19.99
+    assert from_cents(-101) == -1.01
+    assert from_cents_array([1999, -101]).tolist() == [19.99, -1.01]
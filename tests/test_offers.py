@@ -0,0 +1,53 @@
+from datetime import date
+
+import pytest
+
+from debt_kernel import month_number
+from offers import build_offer, evaluate_offers
+
+FIRST_MONTH = month_number(date(2026, 11, 1))
+
+@pytest.fixture
+def debt(bills):
+    return next(bill for bill in bills if bill.get('is_debt'))
+
+def _offer(name, **fields):
+    return build_offer({'name': name, 'transfer_fee': 0, 'post_promo_rate': 0.2949, 'minimum_payment': 35, **fields})
+
+def test_same_terms_cost_the_same_as_the_status_quo(debt):
+    evaluation = evaluate_offers(debt, [_offer('Same card', post_promo_rate=debt['interest_rate'], monthly_fee=debt['monthly_fee'])], first_month=FIRST_MONTH)
+    (same,) = evaluation['offers']
+    status_quo = evaluation['status_quo']
+    assert same['total_cost'] == status_quo['total_cost']
+    assert same['payoff_month'] == status_quo['payoff_month']
+    assert same['savings'] == 0.0
+
+def test_offers_are_ranked_by_total_cost(debt):
+    offers = [
+        _offer('Costly', transfer_fee=0.05, post_promo_rate=0.35, monthly_fee=15),
+        _offer('Promo', transfer_fee=0.03, promo_rate=0.0, promo_months=18),
+        _offer('Loan', post_promo_rate=0.11)
+    ]
+    evaluation = evaluate_offers(debt, offers, payment=50.0, first_month=FIRST_MONTH)
+    ranked = evaluation['offers']
+    assert [offer['name'] for offer in ranked] == ['Promo', 'Loan', 'Costly']
+    assert [offer['total_cost'] for offer in ranked] == sorted(offer['total_cost'] for offer in ranked)
+    promo = ranked[0]
+    assert promo['transfer_fee'] == pytest.approx(0.03 * debt['initial_balance'])
+    assert promo['total_interest'] < evaluation['status_quo']['total_interest']
+    assert promo['savings'] == pytest.approx(evaluation['status_quo']['total_cost'] - promo['total_cost'], abs=0.011)
+    assert ranked[-1]['savings'] < 0 and ranked[-1]['break_even_month'] is None
+
+@pytest.mark.parametrize('fields', [
+    {'name': ''},
+    {'name': 'No rate', 'transfer_fee': 0, 'minimum_payment': 35},
+    {'name': 'Bad fee', 'transfer_fee': 'free', 'post_promo_rate': 0.1, 'minimum_payment': 35},
+    {'name': 'Negative', 'transfer_fee': -0.01, 'post_promo_rate': 0.1, 'minimum_payment': 35}
+])
+def test_invalid_offers_are_rejected(fields):
+    with pytest.raises(ValueError):
+        build_offer(fields)
+
+def test_missing_promo_rate_means_no_promo():
+    offer = build_offer({'name': 'Plain', 'transfer_fee': 0, 'post_promo_rate': 0.12, 'minimum_payment': 25})
+    assert offer['promo_rate'] == 0.12 and offer['promo_months'] == 0
@@ -0,0 +1,68 @@
+from datetime import date
+
+import pytest
+
+from pay_calendar import IncomeStream, PayCalendar
+
+def test_paying_index_uses_the_latest_payday_before_the_due_date():
+    calendar = PayCalendar.from_schedule('bi-weekly', date(2026, 1, 2), 3) # Jan 2, Jan 16, Jan 30; closes Feb 13
+    assert calendar.paying_index(date(2025, 12, 20)) == 0 # Before the first payday
+    assert calendar.paying_index(date(2026, 1, 2)) == 0
+    assert calendar.paying_index(date(2026, 1, 10)) == 0
+    assert calendar.paying_index(date(2026, 1, 16)) == 0 # Due on a payday: the previous paycheck
+    assert calendar.paying_index(date(2026, 1, 17)) == 1
+    assert calendar.paying_index(date(2026, 2, 13)) == 2 # The last window includes its closing payday
+    assert calendar.paying_index(date(2026, 2, 14)) is None
+
+def test_semi_monthly_days_clamp_to_the_end_of_the_month():
+    calendar = PayCalendar.from_schedule('semi-monthly', date(2026, 1, 1), 4, days_of_month=[15, 31])
+    assert calendar.pay_dates == [date(2026, 1, 15), date(2026, 1, 31), date(2026, 2, 15), date(2026, 2, 28)]
+
+def test_semi_monthly_days_that_collide_still_give_every_payday():
+    calendar = PayCalendar.from_schedule('semi-monthly', date(2026, 1, 1), 6, days_of_month=[30, 31])
+    assert len(calendar) == 6
+    assert calendar.pay_dates[:4] == [date(2026, 1, 30), date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 30)]
+    assert calendar.following_pay_date > calendar.pay_dates[-1]
+
+def test_weekend_shift_never_merges_paydays():
+    # Jan 17 and 18 2026 are a Saturday and a Sunday; both would move to Monday the 19th
+    calendar = PayCalendar.from_schedule('semi-monthly', date(2026, 1, 1), 6, days_of_month=[17, 18], weekend_shift='next')
+    assert len(calendar) == 6
+    assert calendar[0] == date(2026, 1, 19)
+    assert all(pay_date.weekday() < 5 for pay_date in calendar)
+
+def test_explicit_pay_dates_shift_off_weekends_and_holidays():
+    # Jan 3 2026 is a Saturday and Jan 19 is a holiday here; Jan 31 is a Saturday too
+    pay_dates = [date(2026, 1, 31), date(2026, 1, 3), date(2026, 1, 19), date(2026, 2, 13)]
+    calendar = PayCalendar.from_dates(pay_dates, 'previous', [date(2026, 1, 19)])
+    assert calendar.pay_dates == [date(2026, 1, 2), date(2026, 1, 16), date(2026, 1, 30), date(2026, 2, 13)]
+    assert PayCalendar.from_dates(pay_dates).pay_dates == sorted(pay_dates) # No shift
+    first_two = PayCalendar.from_dates(pay_dates, 'next', [date(2026, 1, 19)], num_paychecks=2)
+    assert first_two.pay_dates == [date(2026, 1, 5), date(2026, 1, 20)] and first_two.following_pay_date == date(2026, 2, 2)
+
+def test_menu_pay_date_list(monkeypatch):
+    from main import get_pay_calendar_input
+    answers = iter(['dates', '2026-01-03, 01-17-2026', 'next', '2026-01-19', 'no'])
+    monkeypatch.setattr('builtins.input', lambda prompt: next(answers))
+    calendar = get_pay_calendar_input(date(2026, 1, 3), 2, 1500.0)
+    assert calendar.pay_dates == [date(2026, 1, 5), date(2026, 1, 20)] # Saturdays, then the Monday holiday, moved on
+
+def test_invalid_schedules_are_rejected():
+    with pytest.raises(ValueError):
+        PayCalendar.from_schedule('bi-weekly', date(2026, 1, 2), 0)
+    with pytest.raises(ValueError):
+        PayCalendar.from_schedule('fortnightly', date(2026, 1, 2), 3)
+    with pytest.raises(ValueError):
+        PayCalendar.from_schedule('bi-weekly', date(2026, 1, 2), 3, weekend_shift='sideways')
+
+def test_income_streams_stop_at_exactly_num_deposits():
+    streams = [IncomeStream('A', 100.0, 'bi-weekly', date(2026, 1, 2)), IncomeStream('B', 50.0, 'bi-weekly', date(2026, 1, 2))]
+    calendar = PayCalendar.from_income_streams(streams, 3)
+    assert [len(deposits) for deposits in calendar.deposits] == [2, 1]
+    assert [deposit.source for deposit in calendar.deposits[1]] == ['A'] # Same-day deposits in stream order
+    assert calendar.following_pay_date == date(2026, 1, 30)
+
+def test_income_streams_merge_in_date_order():
+    streams = [IncomeStream('Job', 1000.0, 'bi-weekly', date(2026, 1, 9)), IncomeStream('Rent income', 400.0, 'monthly', date(2026, 1, 1))]
+    calendar = PayCalendar.from_income_streams(streams, 5)
+    assert calendar.pay_dates == [date(2026, 1, 1), date(2026, 1, 9), date(2026, 1, 23), date(2026, 2, 1), date(2026, 2, 6)]
@@ -0,0 +1,32 @@
+import csv
+
+import pytest
+
+from portfolio import run_portfolio_projection
+from test_debt_kernel import DEBTS, _scalar_run
+
+def test_projection_matches_the_one_debt_step(tmp_path):
+    accounts = tmp_path / 'accounts.csv'
+    with open(accounts, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'balance', 'interest_rate', 'monthly_fee', 'payment', 'minimum_payment'])
+        writer.writerows([index, *debt] for index, debt in enumerate(DEBTS))
+    monthly, per_account = tmp_path / 'monthly.csv', tmp_path / 'per_account.csv'
+
+    result = run_portfolio_projection(str(accounts), str(monthly), months=48, start_month=24310, chunk_size=3,
+                                      accounts_file=str(per_account))
+    assert result['accounts'] == len(DEBTS)
+
+    with open(per_account, newline='') as f:
+        rows = {int(row['id']): row for row in csv.DictReader(f)}
+    for index, debt in enumerate(DEBTS):
+        total_interest, _, final_balance = _scalar_run(*debt, 48)
+        assert float(rows[index]['total_interest']) == pytest.approx(round(total_interest, 2))
+        assert float(rows[index]['final_balance']) == pytest.approx(round(final_balance, 2), abs=0.011)
+
+    with open(monthly, newline='') as f:
+        months = list(csv.DictReader(f))
+    assert len(months) == 48 and months[0]['month'] == '2025-11'
+    assert int(months[0]['open_accounts']) == len(DEBTS)
+    assert sum(float(month['interest']) for month in months) == pytest.approx(
+        sum(float(row['total_interest']) for row in rows.values()), abs=0.05)
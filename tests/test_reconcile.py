@@ -0,0 +1,89 @@
+import copy
+from datetime import datetime
+
+import pytest
+from openpyxl import load_workbook
+
+from headless import run_plan
+from main import generate_spreadsheet_output
+from reconcile import NON_BILL_CATEGORIES, reconcile_workbook
+
+@pytest.fixture
+def workbook(tmp_path, bills, pay):
+    """
+    An exported plan workbook with a few actual payments and a statement balance filled in.
+    """
+    _, final_pay_periods, debt_progress_report = run_plan(bills, pay)
+    path = str(tmp_path / 'financial_plan.xlsx')
+    generate_spreadsheet_output(final_pay_periods, debt_progress_report, path, bills)
+
+    annotated = load_workbook(path)
+    details = annotated['Paycheck Details']
+    header = [cell.value for cell in details[1]]
+    column = {name: header.index(name) + 1 for name in header}
+    bill_rows = [row[0].row for row in details.iter_rows(min_row=2) if row[column['Category'] - 1].value not in NON_BILL_CATEGORIES][:5]
+    short_row, late_row, text_row, unknown_row, invalid_row = bill_rows
+    details.cell(short_row, column['Actual Paid'], 50.0) # Paid short, no date
+    details.cell(late_row, column['Paid On'], '01-01-2099') # Paid late, as planned
+    details.cell(text_row, column['Actual Paid'], '$1,000.00') # Text amounts are accepted
+    details.cell(text_row, column['Paid On'], details.cell(text_row, column['Bill Due Date']).value)
+    details.cell(unknown_row, column['Bill Name'], 'Not A Bill')
+    details.cell(unknown_row, column['Actual Paid'], 1.0)
+    details.cell(invalid_row, column['Paid On'], 'someday')
+
+    progress = annotated['Debt Progress']
+    balance_column = [cell.value for cell in progress[1]].index('Actual Balance') + 1
+    progress.cell(2, balance_column, 700.0)
+    annotated.save(path)
+    rows = [[cell.value for cell in details[row]] for row in bill_rows]
+    return path, column, rows, [cell.value for cell in progress[2]]
+
+def test_reconcile_records_actual_payments(workbook, bills):
+    path, column, rows, debt_row = workbook
+    report = reconcile_workbook(path, bills)
+
+    assert report['payments_reconciled'] == 3
+    assert report['short_payments'] == 1
+    assert report['late_payments'] == 1
+    assert report['unknown_bills'] == ['Not A Bill']
+    assert len(report['invalid_rows']) == 1 and 'someday' in report['invalid_rows'][0]
+    assert report['balances_checked'] == 1
+
+    def history_entry(row):
+        bill = next(bill for bill in bills if bill['name'] == row[column['Bill Name'] - 1])
+        due_date = datetime.strptime(row[column['Bill Due Date'] - 1], '%m-%d-%Y').strftime('%Y-%m-%d')
+        return next(entry for entry in bill['payment_history'] if entry['due_date'] == due_date)
+
+    short = history_entry(rows[0])
+    assert short['paid_amount'] == 50.0
+    assert short['amount_difference'] == round(50.0 - rows[0][column['Amount Assigned'] - 1], 2)
+    assert short['paid_on'] is None
+
+    late = history_entry(rows[1])
+    assert late['paid_amount'] == late['planned_amount'] # Only the date was filled in
+    assert late['paid_on'] == '2099-01-01' and late['days_late'] > 0
+
+    assert history_entry(rows[2])['paid_amount'] == 1000.0
+
+    debt = next(bill for bill in bills if bill['name'] == debt_row[0])
+    (balance_entry,) = debt['balance_history']
+    assert balance_entry['actual_balance'] == 700.0
+    assert balance_entry['difference'] == round(700.0 - debt_row[7], 2)
+
+def test_reconciling_again_replaces_entries(workbook, bills):
+    path = workbook[0]
+    reconcile_workbook(path, bills)
+    once = copy.deepcopy(bills)
+    report = reconcile_workbook(path, bills)
+    assert report['payments_reconciled'] == 3
+    assert bills == once
+
+def test_a_plain_plan_workbook_changes_nothing(tmp_path, bills, pay):
+    _, final_pay_periods, debt_progress_report = run_plan(bills, pay)
+    path = str(tmp_path / 'plain.xlsx')
+    generate_spreadsheet_output(final_pay_periods, debt_progress_report, path, bills)
+    before = copy.deepcopy(bills)
+    report = reconcile_workbook(path, bills)
+    assert report['payments_reconciled'] == 0 and report['balances_checked'] == 0
+    assert report['rows_read'] > 0
+    assert bills == before
@@ -0,0 +1,45 @@
+from datetime import date
+
+import numpy as np
+
+from recurrence import clamp_to_month, due_dates_by_template, expand_due_dates, iter_due_dates_in_chunks
+
+def _template(due_date, frequency='monthly', name='Bill'):
+    return {'name': name, 'due_date': due_date, 'amount': 10.0, 'is_recurring': frequency is not None, 'recurrence_frequency': frequency}
+
+def test_clamp_to_month():
+    months = np.array(['2026-02', '2028-02', '2026-04', '2026-05'], dtype='datetime64[M]')
+    dates = clamp_to_month(months, np.array([31, 31, 31, 15]))
+    assert dates.tolist() == [date(2026, 2, 28), date(2028, 2, 29), date(2026, 4, 30), date(2026, 5, 15)]
+
+def test_monthly_due_dates_keep_their_day_after_short_months():
+    (dates,) = due_dates_by_template([_template(date(2026, 1, 31))], date(2026, 1, 1), date(2026, 5, 31))
+    assert dates == (date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30), date(2026, 5, 31))
+
+def test_annual_leap_day_bill_is_due_on_the_28th_in_other_years():
+    (dates,) = due_dates_by_template([_template(date(2024, 2, 29), 'annually')], date(2024, 1, 1), date(2028, 12, 31))
+    assert dates == (date(2024, 2, 29), date(2025, 2, 28), date(2026, 2, 28), date(2027, 2, 28), date(2028, 2, 29))
+
+def test_expand_due_dates_orders_by_date_then_template():
+    templates = [
+        _template(date(2026, 1, 15), 'bi-weekly', 'Gym'),
+        _template(date(2026, 1, 15), 'monthly', 'Rent'),
+        _template(date(2026, 2, 1), None, 'Fee'),
+        _template(date(2027, 1, 1), None, 'Later')
+    ]
+    template_indexes, due_dates = expand_due_dates(templates, date(2026, 1, 1), date(2026, 2, 15))
+    assert list(zip(template_indexes.tolist(), due_dates.tolist())) == [
+        (0, date(2026, 1, 15)), (1, date(2026, 1, 15)), (0, date(2026, 1, 29)), (2, date(2026, 2, 1)),
+        (0, date(2026, 2, 12)), (1, date(2026, 2, 15))
+    ]
+
+def test_unknown_frequency_is_treated_as_one_off(capsys):
+    (dates,) = due_dates_by_template([_template(date(2026, 1, 15), 'quarterly')], date(2026, 1, 1), date(2026, 12, 31))
+    assert dates == (date(2026, 1, 15),)
+    assert 'Unknown recurrence frequency' in capsys.readouterr().out
+
+def test_chunked_due_dates_match_the_bulk_expansion(bills):
+    start, end = date(2025, 6, 1), date(2035, 6, 1)
+    expected = due_dates_by_template(bills, start, end)
+    for template, dates in zip(bills, expected):
+        assert tuple(iter_due_dates_in_chunks(template, start, end, dates_per_chunk=5)) == dates
@@ -0,0 +1,25 @@
+import openpyxl
+
+from conftest import PLAN_START
+from main import expand_debt_history, generate_rolling_spreadsheet_output, iter_plan_engine, run_plan_engine
+
+def test_streamed_debt_months_match_the_kept_history(bills):
+    _, _, debts = run_plan_engine(bills, 26, 1500.0, PLAN_START, verbose=False)
+    streamed = {}
+    for result in iter_plan_engine(bills, 26, 1500.0, PLAN_START, keep_history=False, verbose=False):
+        if result[0] == 'debt_month':
+            streamed.setdefault(result[1], []).append(result[2])
+        elif result[0] == 'debts':
+            assert all(not debt_data['history_segments'] for debt_data in result[1].values())
+    assert streamed == {debt_name: list(expand_debt_history(debt_data)) for debt_name, debt_data in debts.items()}
+
+def test_rolling_spreadsheet_writes_every_window(bills, tmp_path):
+    output_file = str(tmp_path / 'rolling.xlsx')
+    plan_events = iter_plan_engine(bills, 60, 1500.0, PLAN_START, keep_history=False, verbose=False)
+    generate_rolling_spreadsheet_output(plan_events, bills, output_file, window_paychecks=26)
+
+    workbook = openpyxl.load_workbook(output_file, read_only=True)
+    summary_rows = list(workbook['Paycheck Summary'].iter_rows(min_row=2, values_only=True))
+    assert len(summary_rows) == 60 # Two full windows and a partial one
+    assert len(list(workbook['Chart Data'].iter_rows(min_row=2))) == 60
+    assert workbook['Debt Progress'].max_row > 1
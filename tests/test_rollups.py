@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+
+from headless import run_plan
+from money import from_cents
+from rollups import CategoryRollup, PaycheckChartData, period_key, period_label
+
+def test_period_keys_and_labels():
+    pay_date = date(2026, 11, 6)
+    assert [period_label(level, period_key(level, pay_date)) for level in ('paycheck', 'month', 'quarter', 'year')] == \
+           ['11-06-2026', '2026-11', '2026-Q4', '2026']
+    with pytest.raises(ValueError):
+        period_key('week', pay_date)
+
+def test_rollup_totals_match_the_paid_bills(bills, pay):
+    rollup = CategoryRollup()
+    _, final_pay_periods, _ = run_plan(bills, pay, aggregators=(rollup,))
+    paid = [bill for pp in final_pay_periods for bill in pp['assigned_bills']]
+
+    expected = {}
+    for bill in paid:
+        expected[bill['category']] = expected.get(bill['category'], 0) + bill['amount']
+    assert rollup.category_totals == expected
+    assert rollup.categories()[0] == max(expected, key=expected.get)
+
+    total = from_cents(sum(bill['amount'] for bill in paid))
+    for level in ('paycheck', 'month', 'quarter', 'year'):
+        assert sum(period_total for _, _, period_total in rollup.rows(level)) == pytest.approx(total)
+    assert len(list(rollup.rows('paycheck'))) == sum(1 for pp in final_pay_periods if pp['assigned_bills'])
+
+    # Built incrementally by the engine or afterwards from the paychecks, the rollup is the same
+    assert CategoryRollup.from_paychecks(final_pay_periods).to_dict() == rollup.to_dict()
+
+def test_chart_data_rows_add_up_to_each_paycheck(bills, pay):
+    chart_data = PaycheckChartData()
+    _, final_pay_periods, _ = run_plan(bills, pay, aggregators=(chart_data,))
+    assert PaycheckChartData.from_paychecks(final_pay_periods).series() == chart_data.series()
+
+    column_names, rows = chart_data.series()
+    assert column_names[-1] == 'Remaining Balance' and column_names[:-1] == sorted(column_names[:-1])
+    assert [row[0] for row in rows] == [pp['pay_date'] for pp in final_pay_periods]
+    for row, pp in zip(rows, final_pay_periods):
+        assert sum(row[1:]) == pytest.approx(from_cents(pp['net_pay']))
+
+    # Past max_series, the smallest bills are summed into 'Other'
+    folded_names, folded_rows = chart_data.series(max_series=2)
+    assert len(folded_names) == 4 and folded_names[2] == 'Other'
+    assert [sum(row[1:]) for row in folded_rows] == pytest.approx([sum(row[1:]) for row in rows])
@@ -0,0 +1,53 @@
+import pytest
+
+from headless import run_scenario
+from sensitivity import build_perturbations, rank_rows, run_sensitivity
+from whatif import apply_variant
+
+def _plan_outcomes(bills, pay):
+    result = run_scenario({'name': 'check', 'pay': pay}, bills=bills, export=False)
+    return {
+        'total_interest': round(sum(debt.total_interest for debt in result.debts), 2),
+        'lowest_buffer': result.lowest_remaining_balance,
+        'carry_overs': sum(len(paycheck.carried_over_bills) for paycheck in result.paychecks)
+    }
+
+def _nudge(report, perturbation):
+    row = next(row for row in report['rows'] if row['parameter'] == perturbation['parameter'])
+    return next(nudge for nudge in row['nudges'] if nudge['delta'] == perturbation['delta'])
+
+@pytest.fixture
+def tight_pay(pay):
+    return {**pay, 'net_pay': 1000.0} # Some bills are carried over
+
+def test_base_row_matches_the_plan(bills, tight_pay):
+    report = run_sensitivity(bills, tight_pay)
+    assert report['base'] == _plan_outcomes(bills, tight_pay)
+    assert report['base']['carry_overs'] > 0
+
+def test_every_nudge_matches_its_own_plan(bills, tight_pay):
+    report = run_sensitivity(bills, tight_pay)
+    debt = next(bill for bill in bills if bill.get('is_debt'))
+    for perturbation in build_perturbations(bills, tight_pay):
+        if 'variant' in perturbation:
+            variant_bills, variant_pay = apply_variant(bills, perturbation['variant']), perturbation['pay']
+        else: # Debt-only nudges are simulated in a batch, from the base plan's payments
+            fields = ({'interest_rate': debt['interest_rate'] + perturbation['rate_delta']} if 'rate_delta' in perturbation
+                      else {'minimum_payment': debt['minimum_payment'] * (1 + perturbation['minimum_share'])})
+            variant_bills, variant_pay = apply_variant(bills, {'overrides': {debt['id']: fields}}), tight_pay
+        nudge = _nudge(report, perturbation)
+        expected = _plan_outcomes(variant_bills, variant_pay)
+        assert {outcome: nudge[outcome] for outcome in expected} == expected, perturbation['parameter'] + ' ' + perturbation['label']
+
+def test_worker_processes_give_the_same_report(bills, tight_pay):
+    assert run_sensitivity(bills, tight_pay, workers=2) == run_sensitivity(bills, tight_pay)
+
+def test_rows_are_ranked_by_swing(bills, tight_pay):
+    report = run_sensitivity(bills, tight_pay)
+    for rank_by, outcome in (('interest', 'total_interest'), ('buffer', 'lowest_buffer')):
+        swings = [row[f"{outcome}_swing"] for row in rank_rows(report, rank_by)]
+        assert swings == sorted(swings, reverse=True)
+
+def test_unknown_inputs_are_rejected(bills, pay):
+    with pytest.raises(ValueError):
+        build_perturbations(bills, pay, {'rent': [0.1]})
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import os
+import shutil
+
+import pytest
+
+from conftest import BILLS_FILE
+from service import HTTPError, PlanService
+
+@pytest.fixture
+def service(tmp_path):
+    bills_path = tmp_path / 'bills.json'
+    shutil.copy(BILLS_FILE, bills_path)
+    service = PlanService(str(bills_path), workers=1)
+    yield service
+    service.close()
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+def test_bills_can_be_listed_added_and_edited(service):
+    status, listing = _run(service.handle('GET', '/bills?q=car%20pay', {}))
+    assert status == 200 and [bill['name'] for bill in listing['bills']] == ['Car Payment']
+
+    status, bill = _run(service.handle('POST', '/bills', {'name': 'Gym', 'due_date': '2025-06-10', 'amount': 40, 'category': 'Hobby'}))
+    assert status == 201
+    status, bill = _run(service.handle('PATCH', f"/bills/{bill['id']}", {'amount': 45}))
+    assert status == 200 and bill['amount'] == 45
+    with open(service.bills_path) as f:
+        assert next(saved for saved in json.load(f) if saved['name'] == 'Gym')['amount'] == 45
+
+    with pytest.raises(HTTPError) as error:
+        _run(service.handle('GET', '/bills/nope', {}))
+    assert error.value.status == 404
+
+def test_plans_are_cached_per_bills_revision(service, pay):
+    status, plan = _run(service.handle('POST', '/plan', pay))
+    assert status == 200 and len(plan['paychecks']) == pay['num_paychecks']
+    assert _run(service.handle('POST', '/plan', pay))[1] is plan # Served from the cache
+
+    phone = service.bills[3]
+    _run(service.handle('PATCH', f"/bills/{phone['id']}", {'amount': 214}))
+    _, replanned = _run(service.handle('POST', '/plan', pay))
+    assert replanned is not plan
+    assert replanned['paychecks'][0]['remaining_balance'] == plan['paychecks'][0]['remaining_balance'] - 100
+
+def test_edits_during_a_plan_do_not_leak_into_it(service, pay):
+    async def plan_then_edit():
+        planning = asyncio.ensure_future(service.handle('POST', '/plan', pay))
+        await asyncio.sleep(0) # The plan is submitted to the pool before the edit lands
+        await service.handle('PATCH', f"/bills/{service.bills[3]['id']}", {'amount': 214})
+        return await planning
+    _, plan = _run(plan_then_edit())
+    _, replanned = _run(service.handle('POST', '/plan', pay))
+    assert replanned['paychecks'][0]['remaining_balance'] == plan['paychecks'][0]['remaining_balance'] - 100
+
+def test_invalid_plan_parameters(service):
+    with pytest.raises(HTTPError) as error:
+        _run(service.handle('POST', '/plan', {'num_paychecks': 0}))
+    assert error.value.status == 400
+
+def _http(service, method, path, body=b'', headers=None):
+    """
+    Sends one request to the service over a real connection and returns (status, response).
+    """
+    async def exchange():
+        server = await asyncio.start_server(service.serve_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        request_headers = {'Host': f'127.0.0.1:{port}', 'Content-Length': str(len(body)), 'Connection': 'close', **(headers or {})}
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(f"{method} {path} HTTP/1.1\r\n".encode() +
+                         ''.join(f"{name}: {value}\r\n" for name, value in request_headers.items()).encode() + b'\r\n' + body)
+            response = await reader.read()
+            writer.close()
+        head, _, payload = response.partition(b'\r\n\r\n')
+        return int(head.split()[1]), json.loads(payload)
+    return _run(exchange())
+
+JSON = {'Content-Type': 'application/json'}
+
+def test_requests_other_sites_could_send_are_refused(service, pay):
+    body = json.dumps(pay).encode()
+    assert _http(service, 'POST', '/plan', body, {'Content-Type': 'text/plain'})[0] == 415
+    assert _http(service, 'POST', '/plan', body, {**JSON, 'Origin': 'https://example.com'})[0] == 403
+    assert _http(service, 'POST', '/bills', b'[]', JSON) == (400, {'error': 'Request body must be a JSON object.'})
+    assert _http(service, 'GET', '/health')[0] == 200
+
+def test_exports_stay_in_the_export_directory(service, pay, tmp_path):
+    service.export_dir = str(tmp_path / 'exports')
+    status, result = _http(service, 'POST', '/export', json.dumps({**pay, 'output_file': '../../escape.xlsx'}).encode(), JSON)
+    assert status == 200 and result['output_file'] == str(tmp_path / 'exports' / 'escape.xlsx')
+    assert sorted(os.listdir(tmp_path / 'exports')) == ['escape.xlsx'] # The temp file was swapped into place
+    assert not (tmp_path / 'escape.xlsx').exists()
+    assert _http(service, 'POST', '/export', json.dumps({**pay, 'output_file': 'bills.json'}).encode(), JSON)[0] == 400
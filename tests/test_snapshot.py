@@ -0,0 +1,69 @@
+import pytest
+
+from headless import run_plan, run_scenario
+from main import expand_debt_history
+from snapshot import PlanSnapshot, diff_snapshots, snapshot_summary, write_snapshot
+
+BILL_FIELDS = ['name', 'category', 'due_date', 'amount', 'paid_by_paycheck_date']
+
+def _write(tmp_path, bills, pay, name='plan'):
+    bill_instances, final_pay_periods, debt_progress_report = run_plan(bills, pay)
+    path = str(tmp_path / f"{name}.mbsnap")
+    write_snapshot(path, bill_instances, final_pay_periods, debt_progress_report, bills, name)
+    return path, (bill_instances, final_pay_periods, debt_progress_report)
+
+def test_snapshot_round_trip(tmp_path, bills, pay):
+    path, (bill_instances, final_pay_periods, debt_progress_report) = _write(tmp_path, bills, {**pay, 'net_pay': 1000.0})
+    plan = PlanSnapshot(path)
+
+    assert plan.name == 'plan'
+    assert [template['id'] for template in plan.bill_templates] == [template['id'] for template in bills]
+    assert plan.bill_templates[0]['due_date'] == bills[0]['due_date']
+
+    pay_periods = plan.pay_periods()
+    assert len(pay_periods) == len(final_pay_periods)
+    for restored, original in zip(pay_periods, final_pay_periods):
+        for field in ('pay_date', 'net_pay', 'initial_balance_for_period', 'remaining_balance'):
+            assert restored[field] == original[field]
+        assert restored.get('source') == original.get('source')
+        assert [[bill[field] for field in BILL_FIELDS] for bill in restored['assigned_bills']] == \
+               [[bill[field] for field in BILL_FIELDS] for bill in original['assigned_bills']]
+        assert [bill['is_debt'] for bill in restored['assigned_bills']] == [bool(bill.get('is_debt')) for bill in original['assigned_bills']]
+
+    unpaid = [bill for bill in bill_instances if bill['paid_by_paycheck_date'] is None]
+    assert len(plan.unpaid_bills()) == len(unpaid)
+
+    report = plan.debt_progress_report()
+    assert report.keys() == debt_progress_report.keys()
+    for debt_name, debt_data in debt_progress_report.items():
+        assert list(expand_debt_history(report[debt_name])) == list(expand_debt_history(debt_data))
+        assert report[debt_name]['payoff_date'] == debt_data['payoff_date']
+        assert report[debt_name]['current_balance'] == pytest.approx(debt_data['current_balance'])
+
+def test_snapshot_summary_matches_the_headless_result(tmp_path, bills, pay):
+    path, _ = _write(tmp_path, bills, pay)
+    summary = snapshot_summary(PlanSnapshot(path))
+    result = run_scenario({'name': 'plan', 'pay': pay}, bills=bills, export=False)
+    assert summary['lowest_remaining_balance'] == result.lowest_remaining_balance
+    assert summary['unpaid_bills'] == len(result.unpaid_bills)
+    for debt_summary, debt in zip(summary['debts'], result.debts):
+        assert (debt_summary['name'], debt_summary['total_interest'], debt_summary['total_fees']) == \
+               (debt.name, debt.total_interest, debt.total_fees)
+
+def test_diff_snapshots(tmp_path, bills, pay):
+    base_path, _ = _write(tmp_path, bills, pay, 'base')
+    raise_path, _ = _write(tmp_path, bills, {**pay, 'net_pay': pay['net_pay'] + 100}, 'raise')
+    base, raise_plan = PlanSnapshot(base_path), PlanSnapshot(raise_path)
+
+    same = diff_snapshots(base, base)
+    assert same['changed_paychecks'] == [] and same['total_remaining_delta'] == 0.0
+
+    diff = diff_snapshots(base, raise_plan)
+    assert diff['paychecks_compared'] == pay['num_paychecks']
+    assert diff['total_remaining_delta'] == pytest.approx(100.0 * pay['num_paychecks'])
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / 'not_a_snapshot.mbsnap'
+    path.write_bytes(b'{"bills": []}' * 4)
+    with pytest.raises(ValueError):
+        PlanSnapshot(str(path))
@@ -0,0 +1,35 @@
+import json
+import shutil
+
+from conftest import BILLS_FILE
+from main import load_bills, save_bills
+from watch import PlanWatcher, diff_bill_templates
+
+def test_diff_bill_templates(bills):
+    edited = [dict(bill) for bill in bills[1:]] + [{**bills[0], 'id': 'gym', 'name': 'Gym'}]
+    edited[0]['amount'] = 60.0
+    edited[1]['paid_by_paycheck_date'] = '2025-06-06' # Not a change to the template
+    diff = diff_bill_templates(bills, edited)
+    assert [bill['name'] for bill in diff['added']] == ['Gym']
+    assert [bill['name'] for bill in diff['removed']] == ['Rent']
+    assert [(bill['name'], fields) for bill, fields in diff['changed']] == [('Pool Dues', ['amount'])]
+
+def test_refresh_runs_only_when_bills_change(tmp_path, pay):
+    bills_path = tmp_path / 'bills.json'
+    shutil.copy(BILLS_FILE, bills_path)
+    watcher = PlanWatcher(scenario={'name': 'watch', 'bills': str(bills_path), 'pay': pay, 'output': {}}, export=False)
+    try:
+        assert watcher.refresh() and watcher.runs == 1
+        first_result = watcher.result
+
+        bills_path.write_text(json.dumps(json.loads(bills_path.read_text()), indent=2)) # Saved without changes
+        assert not watcher.refresh() and watcher.runs == 1
+
+        bills = load_bills(str(bills_path))
+        bills[3]['amount'] = 214.0
+        save_bills(bills, str(bills_path))
+        assert watcher.refresh() and watcher.runs == 2
+        assert watcher.result.lowest_remaining_balance <= first_result.lowest_remaining_balance
+        assert watcher.due_date_cache # Reused between runs
+    finally:
+        watcher.export_pipeline.close()
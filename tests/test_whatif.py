@@ -0,0 +1,51 @@
+import pytest
+
+from whatif import apply_variant, compare_variants, comparison_output_file
+
+def test_apply_variant_shares_untouched_templates(bills):
+    variant = apply_variant(bills, {
+        'overrides': {'Rent': {'amount': 1200}},
+        'remove': ['Pool Dues'],
+        'add': [{'name': 'Gym', 'due_date': '2025-06-10', 'amount': 40, 'is_recurring': True, 'recurrence_frequency': 'monthly'}]
+    })
+    assert [bill['name'] for bill in variant] == ['Rent', 'Car Payment', 'Phone', 'Scottys Credit Card', 'Gym']
+    assert variant[0] is not bills[0] and variant[0]['amount'] == 1200 and variant[0]['id'] == bills[0]['id']
+    assert all(variant_bill is base_bill for variant_bill, base_bill in zip(variant[1:4], bills[2:]))
+    assert bills[0]['amount'] == 1000.0 # The base list is untouched
+
+def test_unknown_bills_are_rejected(bills):
+    with pytest.raises(ValueError, match='Nope'):
+        apply_variant(bills, {'name': 'Bad', 'remove': ['Nope']})
+
+def test_compare_variants(bills, pay):
+    report = compare_variants(bills, pay, [
+        {'name': 'Same'},
+        {'name': 'Raise', 'pay': {'net_pay': pay['net_pay'] + 100}},
+        {'name': 'Costlier phone', 'overrides': {'Phone': {'amount': 124}}}
+    ])
+    same, raise_, phone = report['variants']
+    assert same['total_remaining_delta'] == 0.0 and same['interest_delta'] == 0.0
+    assert raise_['total_remaining_delta'] == pytest.approx(100.0 * pay['num_paychecks'])
+    assert all(delta['delta'] == pytest.approx(100.0) for delta in raise_['paycheck_deltas'])
+    paid_phone_bills = sum(1 for delta in phone['paycheck_deltas'] if delta['delta'] == pytest.approx(-10.0))
+    assert paid_phone_bills > 0
+    assert phone['total_remaining_delta'] == pytest.approx(-10.0 * paid_phone_bills)
+
+def test_comparison_never_overwrites_the_plan_workbook():
+    assert comparison_output_file({'spreadsheet': 'out/plan.xlsx'}) == 'out/plan_whatif.xlsx'
+    assert comparison_output_file({'spreadsheet': 'out/plan.xlsx', 'whatif': 'out/plan.xlsx'}) == 'out/plan_whatif.xlsx'
+    assert comparison_output_file({'spreadsheet': 'out/plan.xlsx', 'whatif': 'out/compare.xlsx'}) == 'out/compare.xlsx'
+    assert comparison_output_file({}) is None
+
+def test_variants_with_another_pay_schedule_match_paychecks_by_date(bills, pay):
+    report = compare_variants(bills, pay, [
+        {'name': 'Later start', 'pay': {'start_date': '2025-06-20'}}, # Two weeks later: one paycheck fewer at the start
+        {'name': 'Semi-monthly', 'pay': {'pay_frequency': 'semi-monthly', 'days_of_month': [6, 20]}}
+    ])
+    later, semi_monthly = report['variants']
+    assert later['paychecks_compared'] == pay['num_paychecks'] - 1
+    assert later['paychecks_added'] == later['paychecks_removed'] == 1
+    base_dates = {pay_date for pay_date, _, _ in report['base']['paychecks']}
+    assert all(delta['pay_date'] in base_dates for delta in later['paycheck_deltas'] + semi_monthly['paycheck_deltas'])
+    assert semi_monthly['paychecks_compared'] + semi_monthly['paychecks_removed'] == pay['num_paychecks']
+    assert semi_monthly['paychecks_compared'] < pay['num_paychecks']